@@ -0,0 +1,63 @@
+"""
+Mede a limpeza do texto antes da LLM (src/llm/budget.py) nos PDFs de pdf_exemplos/: tokens estimados
+sem e com a limpeza, e com um orçamento de tokens, o tempo gasto e os cabeçalhos e rodapés detectados.
+
+A LLM não é chamada: o ganho informado é o tamanho do prompt, que determina o tempo de
+processamento da entrada pelo modelo.
+
+Uso:
+    python benchmarks/budget.py
+    python benchmarks/budget.py --token_budget 4000 --show
+"""
+import argparse, glob, logging, os, sys, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da limpeza do texto enviado à LLM.")
+    parser.add_argument("--token_budget", type=int, default=0, help="Orçamento de tokens aplicado em uma segunda medição (padrão: 0, sem).")
+    parser.add_argument("--reference_lines", type=int, default=0, help="Linhas da seção de referências mantidas (padrão: 0).")
+    parser.add_argument("--show", action="store_true", help="Lista os cabeçalhos e rodapés detectados em cada PDF.")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    from src.utils.files import open_pdf
+    from src.pdf.walker import read_document
+    from src.llm.budget import compress_text
+    from src.llm.config import SummaryConfig
+
+    configs = [("limpeza", SummaryConfig(reference_lines=args.reference_lines))]
+    if args.token_budget:
+        configs.append((f"orçamento {args.token_budget}", SummaryConfig(token_budget=args.token_budget, reference_lines=args.reference_lines)))
+
+    print(f"{'PDF':<40} {'modo':<16} {'antes':>8} {'depois':>8} {'economia':>9} {'tempo (ms)':>11}")
+    total_before = total_after = 0
+    for pdf in sorted(glob.glob(os.path.join(ROOT, "pdf_exemplos", "*.pdf"))):
+        doc = open_pdf(pdf)
+        data = read_document(doc, text=True)
+        doc.close()
+        boilerplate = data["edges"].boilerplate()
+
+        for name, config in configs:
+            start = time.perf_counter()
+            _, report = compress_text(data["text"], boilerplate, config)
+            seconds = time.perf_counter() - start
+
+            if name == "limpeza":
+                total_before += report["tokens_before"]
+                total_after += report["tokens_after"]
+            print(
+                f"{os.path.basename(pdf)[:40]:<40} {name:<16} {report['tokens_before']:>8} {report['tokens_after']:>8} "
+                f"{report['tokens_saved'] / max(report['tokens_before'], 1):>9.1%} {seconds * 1000:>11.1f}"
+            )
+
+        if args.show:
+            for line in sorted(boilerplate):
+                print(f"    {line}")
+
+    print(f"Total (limpeza): {total_before} -> {total_after} tokens ({(total_before - total_after) / max(total_before, 1):.1%} a menos).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Compara as formas de entregar ao pdf_cli um PDF que chega em memória (download, fila, entrada padrão):
+gravar um arquivo temporário e abri-lo pelo caminho (o caminho antigo), passar os bytes direto
+(PdfSource.from_bytes) e, para arquivos já em disco, abrir pelo caminho ou mapear em memória
+(--mmap). Cada modo abre o documento, calcula o hash do cache e lê o texto de todas as páginas.
+
+Uso:
+    python benchmarks/input.py
+    python benchmarks/input.py --repeat 20
+"""
+import argparse, glob, logging, os, sys, tempfile, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def consume(source) -> int:
+    """Abre o PDF da origem, calcula o hash e lê o texto, como a etapa de extração."""
+    source.digest()
+    doc = source.open()
+    try:
+        return sum(len(page.get_text()) for page in doc)
+    finally:
+        doc.close()
+        source.close()
+
+def via_temp_file(data: bytes) -> int:
+    """Caminho antigo: grava os bytes em um arquivo temporário só para abrir pelo caminho."""
+    from src.utils.source import PdfSource
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(data)
+    try:
+        return consume(PdfSource.from_path(f.name))
+    finally:
+        os.remove(f.name)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das formas de entrada do PDF.")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetições de cada medição (padrão: 5).")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    from src.utils.source import PdfSource
+
+    modes = {
+        "arquivo temporário": lambda path, data: via_temp_file(data),
+        "bytes em memória": lambda path, data: consume(PdfSource.from_bytes(data)),
+        "caminho": lambda path, data: consume(PdfSource.from_path(path)),
+        "mmap": lambda path, data: consume(PdfSource.from_path(path, use_mmap=True)),
+    }
+
+    print(f"{'PDF':<40} {'modo':<20} {'tempo (ms)':>11}")
+    for pdf in sorted(glob.glob(os.path.join(ROOT, "pdf_exemplos", "*.pdf"))):
+        with open(pdf, "rb") as f:
+            data = f.read()
+        for mode, run in modes.items():
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                run(pdf, data)
+                timings.append(time.perf_counter() - start)
+            print(f"{os.path.basename(pdf)[:40]:<40} {mode:<20} {min(timings) * 1000:>11.1f}")
+
+if __name__ == "__main__":
+    main()
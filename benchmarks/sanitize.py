@@ -0,0 +1,65 @@
+"""
+Compara o sanitize_latex_text antigo (uma passada por regra) com a versão compilada:
+fuzzing de equivalência em textos aleatórios e tempo nos PDFs LaTeX de pdf_exemplos/. A implementação
+antiga e o fuzzing ficam em tests/test_sanitize.py, que roda a mesma verificação com o pytest.
+
+Uso:
+    python benchmarks/sanitize.py                      # fuzzing + PDFs LaTeX
+    python benchmarks/sanitize.py --cases 100000 --scale 10
+"""
+import argparse, glob, os, sys, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fitz
+from src.utils.text import is_latex_pdf, sanitize_latex_text
+from tests.test_sanitize import legacy_sanitize_latex_text, fuzz
+
+def best_time(func, texts: list, repeat: int = 5) -> float:
+    """Menor tempo entre algumas execuções sobre todos os textos."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do sanitize_latex_text.")
+    parser.add_argument("--cases", type=int, default=20000, help="Quantidade de textos aleatórios no fuzzing (padrão: 20000).")
+    parser.add_argument("--seed", type=int, default=0, help="Semente do fuzzing (padrão: 0).")
+    parser.add_argument("--scale", type=int, default=1, help="Quantas vezes repetir o texto de cada PDF (padrão: 1).")
+    args = parser.parse_args()
+
+    failures = fuzz(args.cases, args.seed)
+    print(f"Fuzzing: {args.cases} textos, {failures} divergências.\n")
+
+    # O WordCounter sanitiza página a página: os tempos são medidos no texto inteiro e por página.
+    print(f"{'PDF':<45} {'MB':>6} {'texto antigo (s)':>17} {'texto novo (s)':>15} {'páginas antigo (s)':>19} {'páginas novo (s)':>17}  resultado")
+    for pdf in sorted(glob.glob(os.path.join(ROOT, "pdf_exemplos", "*.pdf"))):
+        doc = fitz.open(pdf)
+        if not is_latex_pdf(doc):
+            doc.close()
+            continue
+        pages = [page.get_text() + "\n" for page in doc] * args.scale
+        text = "".join(pages)
+        doc.close()
+
+        same = legacy_sanitize_latex_text(text) == sanitize_latex_text(text)
+        same = same and all(legacy_sanitize_latex_text(page) == sanitize_latex_text(page) for page in pages)
+        failures += not same
+
+        print(
+            f"{os.path.basename(pdf)[:45]:<45} {len(text) / 1024 / 1024:>6.2f} "
+            f"{best_time(legacy_sanitize_latex_text, [text]):>17.4f} {best_time(sanitize_latex_text, [text]):>15.4f} "
+            f"{best_time(legacy_sanitize_latex_text, pages):>19.4f} {best_time(sanitize_latex_text, pages):>17.4f}  "
+            f"{'igual' if same else 'DIFERENTE'}"
+        )
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Mede o índice de busca (src/utils/index.py) em um corpus sintético: palavras sorteadas com frequência
+de Zipf a partir do vocabulário dos PDFs de pdf_exemplos/, com várias páginas por documento. Informa
+o tempo de indexação, o tamanho do arquivo e a latência das consultas (mediana e p95).
+
+Uso:
+    python benchmarks/search.py
+    python benchmarks/search.py --docs 50000 --pages 4 --queries 200
+"""
+import argparse, glob, logging, os, random, shutil, statistics, sys, tempfile, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def load_vocabulary() -> list:
+    """Vocabulário dos PDFs de exemplo, do termo mais frequente ao menos frequente."""
+    from collections import Counter
+    from src.utils.files import open_pdf
+    from src.pdf.walker import read_document
+
+    counter = Counter()
+    for pdf in sorted(glob.glob(os.path.join(ROOT, "pdf_exemplos", "*.pdf"))):
+        doc = open_pdf(pdf)
+        data = read_document(doc, tokens=True)
+        doc.close()
+        for page in data["tokens"]:
+            counter.update(page.split())
+
+    return [word for word, _ in counter.most_common()]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do índice de busca.")
+    parser.add_argument("--docs", type=int, default=10000, help="Documentos do corpus sintético (padrão: 10000).")
+    parser.add_argument("--pages", type=int, default=4, help="Páginas por documento (padrão: 4).")
+    parser.add_argument("--words", type=int, default=300, help="Palavras por página (padrão: 300).")
+    parser.add_argument("--queries", type=int, default=100, help="Consultas medidas (padrão: 100).")
+    parser.add_argument("--seed", type=int, default=0, help="Semente do sorteio (padrão: 0).")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    from src.utils.index import SearchIndex
+
+    vocabulary = load_vocabulary()
+    rng = random.Random(args.seed)
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    directory = tempfile.mkdtemp(prefix="pdf_cli_search_")
+    path = os.path.join(directory, "index.sqlite")
+
+    try:
+        start = time.perf_counter()
+        with SearchIndex(path) as index:
+            for number in range(args.docs):
+                pages = [" ".join(rng.choices(vocabulary, weights, k=args.words)) for _ in range(args.pages)]
+                titles = [" ".join(rng.choices(vocabulary, weights, k=4))] + [""] * (args.pages - 1)
+                entry = {"pages": pages, "titles": titles}
+                index.write(f"/corpus/doc_{number}.pdf", f"doc_{number}", str(number), entry, " ".join(rng.choices(vocabulary, weights, k=80)))
+        elapsed = time.perf_counter() - start
+        size_mb = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)) / 1024 / 1024
+        print(f"{args.docs} documentos, {args.docs * args.pages} páginas, {len(vocabulary)} termos no vocabulário.")
+        print(f"Indexação: {elapsed:.1f}s ({args.docs / elapsed:.0f} docs/s), índice com {size_mb:.1f} MB.")
+
+        with SearchIndex(path, readonly=True) as index:
+            # Consultas de 1 a 3 termos, do meio da distribuição (nem stopwords do corpus, nem hápax).
+            pool = vocabulary[50:5000] or vocabulary
+            for label, size in (("1 termo", 1), ("2 termos", 2), ("3 termos", 3)):
+                timings = []
+                for _ in range(args.queries):
+                    query = " ".join(rng.sample(pool, size))
+                    start = time.perf_counter()
+                    index.search(query, 10)
+                    timings.append((time.perf_counter() - start) * 1000)
+                timings.sort()
+                print(f"Consulta ({label}): mediana {statistics.median(timings):.2f} ms, p95 {timings[int(0.95 * len(timings))]:.2f} ms.")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Mede cada etapa do pdf_cli separadamente (tempo, páginas/s e pico de memória RSS) nos PDFs de
+pdf_exemplos/ e em PDFs sintéticos de 10, 100 e 1000 páginas, e compara com stages_baseline.json.
+
+Cada medição roda em um processo próprio, para que o pico de RSS de uma etapa não contamine as
+demais. O resumo usa a LLM simulada (backend mock, sem espera), medindo apenas o custo do lado do pdf_cli.
+
+Uso:
+    python benchmarks/stages.py                         # compara com a referência
+    python benchmarks/stages.py --update                # grava uma nova referência
+    python benchmarks/stages.py --stages get_text --sizes 10 100 --no_samples
+    python benchmarks/stages.py --output resultado.json # grava as medições em JSON
+"""
+import argparse, glob, json, os, random, resource, subprocess, sys, tempfile, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BASELINE = os.path.join(ROOT, "benchmarks", "stages_baseline.json")
+CORPUS_DIR = os.path.join(tempfile.gettempdir(), "pdf_cli_benchmark_corpus")
+
+STAGES = ("open_pdf", "get_text", "detect_struct", "count_words", "sanitize_latex_text", "extract_image", "make_markdown", "summarize")
+
+# Vocabulário dos PDFs sintéticos: palavras comuns, acentuadas e com artefatos de LaTeX (´a, ˜o).
+WORDS = (
+    "análise dados resultado método pesquisa estudo modelo sistema processo desenvolvimento "
+    "informação avaliação aplicação ferramenta documento extração resumo texto página seção "
+    "conclusão introdução referência trabalho proposta experimento comparação desempenho "
+    "a o de da do em para com que uma um os as no na por se mais como"
+).split()
+TITLES = ("Introdução", "Metodologia", "Resultados", "Discussão", "Considerações finais", "Referências")
+
+def synthetic_pdf(pages: int, seed: int = 0) -> str:
+    """Gera (uma única vez) um PDF determinístico com títulos, parágrafos, links e imagens repetidas."""
+    import fitz
+
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    path = os.path.join(CORPUS_DIR, f"sintetico_{pages}p_s{seed}.pdf")
+    if os.path.exists(path):
+        return path
+
+    rng = random.Random(seed)
+    logo = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 64, 64), False)
+    logo.set_rect(logo.irect, (30, 90, 160))
+
+    doc = fitz.open()
+    for index in range(pages):
+        page = doc.new_page()
+        y = 72
+        if index % 3 == 0:
+            page.insert_text((72, y), f"{index // 3 + 1}. {TITLES[index // 3 % len(TITLES)]}", fontsize=16)
+            y += 30
+
+        for _ in range(30):
+            line = " ".join(rng.choice(WORDS) for _ in range(12))
+            page.insert_text((72, y), line, fontsize=10)
+            y += 14
+            if y > 760:
+                break
+
+        # Um logotipo em todas as páginas (mesmo xref) e uma figura própria a cada cinco páginas.
+        page.insert_image(fitz.Rect(500, 20, 540, 60), pixmap=logo)
+        if index % 5 == 0:
+            figure = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 128, 96), False)
+            figure.set_rect(figure.irect, (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+            page.insert_image(fitz.Rect(72, 640, 200, 736), pixmap=figure)
+
+        page.insert_link({"kind": fitz.LINK_URI, "from": fitz.Rect(72, 780, 200, 792), "uri": f"https://exemplo.org/{index}"})
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    doc.save(tmp_path, garbage=3, deflate=True)
+    doc.close()
+    os.replace(tmp_path, path)
+
+    return path
+
+def get_text(doc) -> str:
+    """Texto do documento inteiro em uma string, como era lido antes do resumo em fluxo."""
+    from src.utils.files import iter_text
+    return "".join(iter_text(doc))
+
+def prepare(stage: str, pdf: str):
+    """Prepara as entradas da etapa (fora da medição) e retorna a função medida e o número de páginas."""
+    from src.utils.files import open_pdf, make_markdown, format_output
+    from src.utils.text import count_words, is_latex_pdf, sanitize_latex_text
+    from src.pdf.structure import page_spans, detect_titles
+    from src.pdf.walker import TEXT_FLAGS
+    from src.pdf.image import extract_image
+    from src.pdf.extractor import extract_metadata
+
+    doc = open_pdf(pdf)
+    pages = doc.page_count
+
+    if stage == "open_pdf":
+        doc.close()
+        def run():
+            opened = open_pdf(pdf)
+            assert opened.page_count == pages
+            opened.close()
+    elif stage == "get_text":
+        def run():
+            get_text(doc)
+    elif stage == "detect_struct":
+        def run():
+            structures = []
+            for page in doc:
+                candidates, fonts = page_spans(page.get_textpage(flags=TEXT_FLAGS).extractDICT()["blocks"])
+                structures.append({"candidates": candidates, "fonts": fonts})
+            detect_titles(structures)
+    elif stage == "count_words":
+        text, is_latex = get_text(doc), is_latex_pdf(doc)
+        def run():
+            count_words(text, is_latex)
+    elif stage == "sanitize_latex_text":
+        text = get_text(doc)
+        def run():
+            sanitize_latex_text(text)
+    elif stage == "extract_image":
+        def run():
+            extract_image(pdf, "benchmark", "benchmark")
+    elif stage == "make_markdown":
+        metadata = format_output(extract_metadata(doc, pdf), show=False)
+        summary = "## **Resumo**\n\n" + " ".join(WORDS) * 20
+        def run():
+            make_markdown(summarize=summary, metadata=metadata, filename="benchmark")
+    elif stage == "summarize":
+        from src.llm.summarize import summarize_text
+        from src.llm.config import SummaryConfig, ModelConfig
+        config = SummaryConfig(model=ModelConfig(backend="mock"))
+        text = get_text(doc)
+        def run():
+            summarize_text(text, config)
+    else:
+        raise ValueError(f"[ERROR]: Etapa desconhecida: {stage}")
+
+    return run, pages
+
+def run_child(stage: str, pdf: str, repeat: int):
+    """Executa a etapa no processo atual e imprime a medição em JSON (usado por measure)."""
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    os.chdir(tempfile.mkdtemp(prefix="pdf_cli_bench_"))
+    run, pages = prepare(stage, pdf)
+
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # ru_maxrss vem em KB no Linux.
+    print(json.dumps({"seconds": min(times), "pages": pages, "peak_rss_mb": after / 1024, "stage_rss_mb": (after - before) / 1024}))
+
+def measure(stage: str, pdf: str, repeat: int) -> dict:
+    """Mede uma etapa em um processo novo."""
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", stage, pdf, "--repeat", str(repeat)],
+        capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=ROOT)
+    )
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        raise RuntimeError(f"[ERROR]: Falha ao medir {stage} em {pdf}:\n{proc.stderr[-2000:]}")
+
+    result = json.loads(lines[-1])
+    result["pages_per_s"] = result["pages"] / result["seconds"] if result["seconds"] else None
+
+    return result
+
+def compare(name: str, result: dict, reference: dict, tolerance: float, min_seconds: float, min_mb: float) -> str:
+    """Retorna a descrição da regressão em relação à referência, ou None."""
+    if not reference:
+        return None
+
+    problems = []
+    if result["seconds"] > reference["seconds"] * (1 + tolerance) and result["seconds"] - reference["seconds"] > min_seconds:
+        problems.append(f"tempo {reference['seconds'] * 1000:.1f} -> {result['seconds'] * 1000:.1f} ms")
+    if result["stage_rss_mb"] > reference["stage_rss_mb"] * (1 + tolerance) and result["stage_rss_mb"] - reference["stage_rss_mb"] > min_mb:
+        problems.append(f"memória {reference['stage_rss_mb']:.1f} -> {result['stage_rss_mb']:.1f} MB")
+
+    return "; ".join(problems) or None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das etapas do pdf_cli.")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES), help="Etapas medidas (padrão: todas).")
+    parser.add_argument("--sizes", nargs="*", type=int, default=[10, 100, 1000], help="Páginas dos PDFs sintéticos (padrão: 10 100 1000).")
+    parser.add_argument("--no_samples", action="store_true", help="Não mede os PDFs de pdf_exemplos/.")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por medição; usa a menor (padrão: 3).")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Aumento relativo aceito sobre a referência (padrão: 0.5).")
+    parser.add_argument("--min_ms", type=float, default=5.0, help="Aumento absoluto de tempo ignorado, em ms (padrão: 5).")
+    parser.add_argument("--min_mb", type=float, default=5.0, help="Aumento absoluto de memória ignorado, em MB (padrão: 5).")
+    parser.add_argument("--update", action="store_true", help="Grava as medições como nova referência (mesclando com a existente).")
+    parser.add_argument("--baseline", default=BASELINE, help="Arquivo de referência (padrão: benchmarks/stages_baseline.json).")
+    parser.add_argument("--output", help="Grava as medições em JSON neste arquivo.")
+    parser.add_argument("--child", nargs=2, metavar=("STAGE", "PDF"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child, args.repeat)
+        return
+
+    pdfs = [] if args.no_samples else sorted(glob.glob(os.path.join(ROOT, "pdf_exemplos", "*.pdf")))
+    pdfs += [synthetic_pdf(size) for size in args.sizes]
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    failures = []
+    print(f"{'etapa':<20} {'PDF':<32} {'páginas':>7} {'ms':>10} {'páginas/s':>10} {'RSS (MB)':>9} {'etapa (MB)':>10}  resultado")
+
+    for stage in args.stages:
+        for pdf in pdfs:
+            name = f"{stage}:{os.path.basename(pdf)}"
+            result = measure(stage, pdf, args.repeat)
+            results[name] = {key: round(value, 6) if isinstance(value, float) else value for key, value in result.items()}
+
+            regression = None if args.update else compare(name, result, baseline.get(name), args.tolerance, args.min_ms / 1000, args.min_mb)
+            if regression:
+                failures.append(name)
+
+            print(
+                f"{stage:<20} {os.path.basename(pdf)[:32]:<32} {result['pages']:>7} {result['seconds'] * 1000:>10.1f} "
+                f"{result['pages_per_s'] or 0:>10.0f} {result['peak_rss_mb']:>9.1f} {result['stage_rss_mb']:>10.1f}  "
+                f"{'regressão: ' + regression if regression else 'ok'}"
+            )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+            f.write("\n")
+
+    if args.update:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=4, sort_keys=True)
+            f.write("\n")
+        print(f"Referência gravada em {args.baseline}")
+
+    if failures:
+        print(f"{len(failures)} regressões sobre a referência (tolerância {args.tolerance:.0%}).")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Mede o tempo de importação (python -X importtime) do pdf_cli para cada combinação de flags
+e compara com a referência em startup_baseline.json.
+
+Uso:
+    python benchmarks/startup.py            # compara com a referência
+    python benchmarks/startup.py --update   # grava uma nova referência
+"""
+import argparse, json, os, subprocess, sys, tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "benchmarks", "startup_baseline.json")
+SAMPLE_PDF = os.path.join(ROOT, "pdf_exemplos", "24351-373-19876-1-10-20230511.pdf")
+
+# Módulos pesados que só as ações de resumo podem carregar.
+LLM_MODULES = ("langchain_core", "langchain_ollama", "ollama", "httpx")
+RENDER_MODULES = ("rich.markdown", "rich.live")
+
+COMBINATIONS = {
+    "ajuda": {"flags": [], "forbidden": LLM_MODULES + RENDER_MODULES + ("fitz",)},
+    "texto": {"flags": ["-t", "-p", SAMPLE_PDF], "forbidden": LLM_MODULES + RENDER_MODULES},
+    "imagens": {"flags": ["-i", "-p", SAMPLE_PDF], "forbidden": LLM_MODULES + RENDER_MODULES + ("rich.table",)},
+    "texto_imagens": {"flags": ["-t", "-i", "-p", SAMPLE_PDF], "forbidden": LLM_MODULES + RENDER_MODULES},
+    "resumo": {"flags": ["-s", "-p", SAMPLE_PDF], "forbidden": ()},
+    "tudo": {"flags": ["-e", "-p", SAMPLE_PDF], "forbidden": ()},
+    "lote_texto": {"flags": ["-t", "-b", SAMPLE_PDF, "--extract_jobs", "1"], "forbidden": LLM_MODULES + RENDER_MODULES},
+}
+
+def measure(flags: list) -> dict:
+    """Executa o pdf_cli com -X importtime em um diretório temporário e soma as importações."""
+    env = dict(os.environ, PYTHONPATH=ROOT, OLLAMA_HOST="http://127.0.0.1:9")
+    with tempfile.TemporaryDirectory() as cwd:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-m", "src.main", *flags, "--no_cache"] if flags else
+            [sys.executable, "-X", "importtime", "-m", "src.main"],
+            cwd=cwd, env=env, capture_output=True, text=True
+        )
+
+    total_us = 0
+    modules = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.add(name.strip())
+        # Apenas as importações de primeiro nível: as demais já estão no acumulado.
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+
+    return {"import_ms": total_us / 1000, "modules": modules}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização do pdf_cli.")
+    parser.add_argument("--update", action="store_true", help="Grava os tempos medidos como nova referência.")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Aumento relativo aceito sobre a referência (padrão: 0.5).")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por combinação; usa a menor (padrão: 3).")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(BASELINE):
+        with open(BASELINE, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    failures = []
+
+    for name, combination in COMBINATIONS.items():
+        runs = [measure(combination["flags"]) for _ in range(args.repeat)]
+        best = min(runs, key=lambda r: r["import_ms"])
+        results[name] = round(best["import_ms"], 1)
+
+        loaded = sorted(m for m in combination["forbidden"] if m in best["modules"])
+        reference = baseline.get(name)
+        status = "ok"
+
+        if loaded:
+            status = f"importou {', '.join(loaded)}"
+            failures.append(name)
+        elif reference and not args.update and best["import_ms"] > reference * (1 + args.tolerance):
+            status = f"regressão (referência {reference:.1f} ms)"
+            failures.append(name)
+
+        print(f"{name:<14} {best['import_ms']:>9.1f} ms  {status}")
+
+    if args.update:
+        with open(BASELINE, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+            f.write("\n")
+        print(f"Referência gravada em {BASELINE}")
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Compara o caminho antigo do texto para o resumo (texto completo em uma string e lista com todos os
+trechos) com o novo (TextSpool e trechos gerados em lotes): pico de memória do Python (tracemalloc),
+pico de RSS e tempo, em PDFs sintéticos grandes. Antes, confere que os trechos produzidos são os
+mesmos nos PDFs de pdf_exemplos/ e em textos aleatórios.
+
+A etapa map usa uma função falsa no lugar da LLM, medindo apenas o custo do lado do pdf_cli.
+
+Uso:
+    python benchmarks/streaming.py
+    python benchmarks/streaming.py --sizes 1000 5000 --chunk_tokens 500
+"""
+import argparse, glob, json, os, random, resource, subprocess, sys, tempfile, time, tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stages import CORPUS_DIR, synthetic_pdf
+
+MODES = ("antigo", "novo")
+
+def legacy_split_sections(text, titles=()):
+    """Implementação anterior de split_sections, mantida como referência."""
+    from src.llm.chunking import is_heading
+
+    headings = {part.strip() for title in titles if title for part in title.split(";") if part.strip()}
+    sections = []
+    current = []
+    for line in text.splitlines(keepends=True):
+        stripped = line.strip()
+        if current and stripped and is_heading(stripped, headings):
+            sections.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("".join(current))
+    return sections
+
+def legacy_split_window(text, max_chars, overlap_chars):
+    """Implementação anterior de split_window, mantida como referência."""
+    if len(text) <= max_chars:
+        return [text]
+    overlap_chars = min(overlap_chars, max_chars // 2)
+    windows = []
+    start = 0
+    while start < len(text):
+        end = min(start + max_chars, len(text))
+        if end < len(text):
+            cut = text.rfind(" ", start + max_chars // 2, end)
+            cut = max(cut, text.rfind("\n", start + max_chars // 2, end))
+            if cut > start:
+                end = cut
+        windows.append(text[start:end])
+        if end >= len(text):
+            break
+        start = max(end - overlap_chars, start + 1)
+        space = text.find(" ", start, end)
+        if space != -1:
+            start = space + 1
+    return windows
+
+def legacy_split_chunks(text, max_tokens, overlap_tokens=0, titles=()):
+    """Implementação anterior de split_chunks (lista com todos os trechos), mantida como referência."""
+    max_chars, overlap_chars = max_tokens * 4, overlap_tokens * 4
+    chunks = []
+    current = ""
+    for section in legacy_split_sections(text, titles):
+        for piece in legacy_split_window(section, max_chars, overlap_chars):
+            if current and len(current) + len(piece) > max_chars:
+                chunks.append(current)
+                current = ""
+            current += piece
+    if current.strip():
+        chunks.append(current)
+    return chunks
+
+def large_pdf(pages: int) -> str:
+    """PDF sintético com o número de páginas pedido; acima de 1000, cópias do PDF de 1000 páginas."""
+    if pages <= 1000:
+        return synthetic_pdf(pages)
+
+    import fitz
+
+    path = os.path.join(CORPUS_DIR, f"sintetico_{pages}p_copias.pdf")
+    if os.path.exists(path):
+        return path
+
+    base = fitz.open(synthetic_pdf(1000))
+    doc = fitz.open()
+    while doc.page_count < pages:
+        doc.insert_pdf(base, to_page=min(base.page_count, pages - doc.page_count) - 1)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    doc.save(tmp_path)
+    doc.close()
+    os.replace(tmp_path, path)
+
+    return path
+
+def fake_partial(chunk: str) -> str:
+    """Resumo parcial falso: as primeiras palavras do trecho."""
+    return " ".join(chunk.split()[:40])
+
+def run_legacy(pdf: str, chunk_tokens: int, overlap: int) -> int:
+    """Texto completo em memória e todos os trechos montados antes da etapa map."""
+    from src.utils.files import open_pdf
+
+    doc = open_pdf(pdf)
+    text = "".join(page.get_text() + "\n" for page in doc)
+    chunks = legacy_split_chunks(text, chunk_tokens, overlap)
+    partials = [fake_partial(chunk) for chunk in chunks]
+    doc.close()
+    return len(partials)
+
+def run_streaming(pdf: str, chunk_tokens: int, overlap: int) -> int:
+    """Texto no TextSpool e trechos gerados e resumidos em lotes."""
+    from src.utils.files import open_pdf
+    from src.pdf.walker import read_document
+    from src.llm.chunking import iter_chunks, batched, MAP_BATCH
+
+    doc = open_pdf(pdf)
+    text = read_document(doc, text=True)["text"]
+    partials = []
+    for batch in batched(iter_chunks(iter(text), chunk_tokens, overlap), MAP_BATCH):
+        partials += [fake_partial(chunk) for chunk in batch]
+    doc.close()
+    return len(partials)
+
+def run_child(mode: str, pdf: str, chunk_tokens: int, overlap: int):
+    """Executa o modo no processo atual e imprime a medição em JSON (usado por measure)."""
+    import logging
+    logging.disable(logging.CRITICAL)
+    func = run_legacy if mode == "antigo" else run_streaming
+
+    start = time.perf_counter()
+    chunks = func(pdf, chunk_tokens, overlap)
+    seconds = time.perf_counter() - start
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    # Segunda execução só para o pico de memória do Python: o tracemalloc deixa tudo mais lento.
+    tracemalloc.start()
+    func(pdf, chunk_tokens, overlap)
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+
+    print(json.dumps({"seconds": seconds, "chunks": chunks, "peak_rss_mb": rss, "python_peak_mb": peak}))
+
+def measure(mode: str, pdf: str, chunk_tokens: int, overlap: int) -> dict:
+    """Mede um modo em um processo novo."""
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", mode, pdf, "--chunk_tokens", str(chunk_tokens), "--overlap", str(overlap)],
+        capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=ROOT), cwd=tempfile.gettempdir()
+    )
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        raise RuntimeError(f"[ERROR]: Falha ao medir {mode} em {pdf}:\n{proc.stderr[-2000:]}")
+
+    return json.loads(lines[-1])
+
+def check_equal(chunk_tokens: int, overlap: int, cases: int = 2000) -> int:
+    """Confere que os trechos novos são iguais aos antigos; retorna o número de casos verificados."""
+    from src.utils.files import open_pdf, iter_text
+    from src.utils.spool import spool_text
+    from src.llm.chunking import iter_chunks
+
+    texts = []
+    for pdf in sorted(glob.glob(os.path.join(ROOT, "pdf_exemplos", "*.pdf"))):
+        texts.append(("".join(iter_text(open_pdf(pdf))), chunk_tokens, overlap, ()))
+
+    rng = random.Random(0)
+    alphabet = ["ab", "c", "  ", "\n", "\r\n", "Introdução\n", "x" * 30, " ", "Resultados", "\n\n", "Título\n"]
+    for _ in range(cases):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randrange(400)))
+        texts.append((text, rng.randrange(1, 20), rng.randrange(15), ("Título",) if rng.random() < 0.5 else ()))
+
+    for text, tokens, over, titles in texts:
+        # Spool pequeno: o texto vai para o arquivo temporário e é lido de volta em blocos.
+        spool = spool_text([text[i:i + 97] for i in range(0, len(text), 97)], max_chars=64)
+        if list(iter_chunks(iter(spool), tokens, over, titles)) != legacy_split_chunks(text, tokens, over, titles):
+            raise AssertionError(f"[ERROR]: Trechos diferentes para o texto: {text[:200]!r}")
+
+    return len(texts)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do texto em fluxo (TextSpool e trechos em lotes).")
+    parser.add_argument("--sizes", nargs="*", type=int, default=[100, 1000, 5000], help="Páginas dos PDFs sintéticos (padrão: 100 1000 5000).")
+    parser.add_argument("--chunk_tokens", type=int, default=1500, help="Tokens por trecho (padrão: 1500).")
+    parser.add_argument("--overlap", type=int, default=150, help="Tokens de sobreposição (padrão: 150).")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PDF"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child, args.chunk_tokens, args.overlap)
+        return
+
+    print(f"Trechos idênticos em {check_equal(args.chunk_tokens, args.overlap)} textos.")
+
+    print(f"{'PDF':<28} {'modo':<7} {'trechos':>7} {'tempo (s)':>10} {'Python (MB)':>12} {'RSS (MB)':>9}")
+    for size in args.sizes:
+        pdf = large_pdf(size)
+        for mode in MODES:
+            result = measure(mode, pdf, args.chunk_tokens, args.overlap)
+            print(
+                f"{os.path.basename(pdf):<28} {mode:<7} {result['chunks']:>7} {result['seconds']:>10.2f} "
+                f"{result['python_peak_mb']:>12.1f} {result['peak_rss_mb']:>9.1f}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Mede a vazão de ponta a ponta do modo lote (-b -s) com a LLM simulada (--llm_backend mock), sem
+Ollama nem outro serviço externo: para cada combinação de chamadas simultâneas (--llm_jobs) e de
+cliente (threads ou assíncrono), processa cópias dos PDFs de pdf_exemplos/ e informa documentos por
+segundo e o ganho sobre uma chamada por vez.
+
+A latência e a taxa de geração da LLM simulada representam o modelo; a extração e a divisão em
+trechos são as reais.
+
+Uso:
+    python benchmarks/throughput.py
+    python benchmarks/throughput.py --jobs 1 4 8 --latency 1.0 --rate 30 --copies 5
+"""
+import argparse, glob, os, re, shutil, subprocess, sys, tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATS_REGEX = re.compile(r"Lote finalizado: (\d+) documentos, (\d+) páginas, (\d+) falhas.* em ([\d.]+)s")
+
+def make_corpus(directory: str, copies: int) -> int:
+    """Copia os PDFs de pdf_exemplos/ para o diretório; retorna o número de documentos."""
+    count = 0
+    for pdf in sorted(glob.glob(os.path.join(ROOT, "pdf_exemplos", "*.pdf"))):
+        for copy in range(copies):
+            shutil.copy(pdf, os.path.join(directory, f"{copy}_{os.path.basename(pdf)}"))
+            count += 1
+
+    return count
+
+def run_batch(corpus: str, jobs: int, use_async: bool, args) -> dict:
+    """Processa o lote em um processo novo e lê a vazão informada pela CLI."""
+    command = [
+        sys.executable, "-m", "src.main", "-b", corpus, "-s", "--no_cache", "--no_resume",
+        "--llm_backend", "mock", "--mock_latency", str(args.latency), "--mock_rate", str(args.rate),
+        "--llm_jobs", str(jobs), "--extract_jobs", str(args.extract_jobs), "--chunk_tokens", str(args.chunk_tokens),
+    ]
+    if use_async:
+        command.append("--async_llm")
+
+    proc = subprocess.run(command, capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=ROOT), cwd=tempfile.mkdtemp(prefix="pdf_cli_throughput_"))
+    match = STATS_REGEX.search(proc.stdout + proc.stderr)
+    if proc.returncode != 0 or match is None:
+        raise RuntimeError(f"[ERROR]: Falha no lote com {jobs} chamadas simultâneas:\n{(proc.stdout + proc.stderr)[-2000:]}")
+
+    docs, pages, failures, seconds = int(match[1]), int(match[2]), int(match[3]), float(match[4])
+    return {"docs": docs, "pages": pages, "failures": failures, "seconds": seconds}
+
+def main():
+    parser = argparse.ArgumentParser(description="Vazão do modo lote com a LLM simulada.")
+    parser.add_argument("--jobs", nargs="+", type=int, default=[1, 2, 4], help="Valores de --llm_jobs medidos (padrão: 1 2 4).")
+    parser.add_argument("--latency", type=float, default=0.2, help="Espera de cada chamada à LLM simulada, em segundos (padrão: 0.2).")
+    parser.add_argument("--rate", type=float, default=200.0, help="Tokens por segundo da LLM simulada (padrão: 200).")
+    parser.add_argument("--copies", type=int, default=2, help="Cópias de cada PDF de pdf_exemplos/ no lote (padrão: 2).")
+    parser.add_argument("--extract_jobs", type=int, default=os.cpu_count() or 1, help="Processos de extração (padrão: número de CPUs).")
+    parser.add_argument("--chunk_tokens", type=int, default=1500, help="Tokens por trecho (padrão: 1500).")
+    args = parser.parse_args()
+
+    corpus = tempfile.mkdtemp(prefix="pdf_cli_corpus_")
+    try:
+        count = make_corpus(corpus, args.copies)
+        print(f"{count} documentos; LLM simulada com {args.latency}s por chamada e {args.rate} tokens/s.")
+        print(f"{'cliente':<11} {'llm_jobs':>8} {'tempo (s)':>10} {'docs/s':>8} {'ganho':>7} {'falhas':>7}")
+
+        for use_async in (False, True):
+            base = None
+            for jobs in args.jobs:
+                result = run_batch(corpus, jobs, use_async, args)
+                base = base or result["seconds"]
+                print(
+                    f"{'assíncrono' if use_async else 'threads':<11} {jobs:>8} {result['seconds']:>10.2f} "
+                    f"{result['docs'] / result['seconds']:>8.2f} {base / result['seconds']:>6.1f}x {result['failures']:>7}"
+                )
+    finally:
+        shutil.rmtree(corpus, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Compara a detecção de títulos antiga (get_text("dict") e moda das fontes por página) com a nova
+(registros compactos e fonte do corpo do documento inteiro) nos PDFs de pdf_exemplos/: tempo e
+páginas cujos títulos mudaram.
+
+As duas versões rodam com o logging da aplicação (DEBUG em app.log, em um diretório temporário),
+como na CLI.
+
+Uso:
+    python benchmarks/titles.py
+    python benchmarks/titles.py --repeat 5 --show
+"""
+import argparse, glob, logging, os, re, sys, tempfile, time
+from statistics import mode, median
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fitz
+from src.config.logging_config import setup_logging
+from src.utils.text import SECTION_REGEX
+from src.pdf.structure import page_spans, detect_titles
+from src.pdf.walker import TEXT_FLAGS
+
+logger = logging.getLogger("benchmarks.titles")
+
+def legacy_search_section_keywords(text: str) -> str:
+    """Implementação anterior de search_section_keywords, mantida como referência."""
+    logger.debug("Procurando palavras-chave de seções no texto.")
+
+    clean_text = text.strip()
+
+    if len(clean_text.split()) > 3:
+        return None
+
+    if SECTION_REGEX.search(clean_text.lower()):
+        clean = re.sub(r"^[\d.\s-]+", "", clean_text)
+        return clean.strip()
+
+    return None
+
+def legacy_detect_struct(page, blocks):
+    """Implementação anterior de detect_struct, mantida como referência."""
+    logger.debug("Detectando títulos na página do PDF.")
+    spans = [span for b in blocks if "lines" in b for line in b["lines"] for span in line["spans"]]
+
+    if not spans:
+        return None
+    font_sizes = [round(s["size"], 1) for s in spans]
+
+    try:
+        dominant_font = mode(font_sizes)
+    except Exception:
+        dominant_font = median(font_sizes)
+
+    titles = []
+    for span in spans:
+        text = span["text"].strip()
+        if not text:
+            continue
+        font = round(span["size"], 1)
+        if len(text) > 120 or text.count(" ") > 15 or text.isupper() or re.search(r"\.{5,}", text):
+            continue
+        section = legacy_search_section_keywords(text)
+        if section:
+            titles.append(section)
+            logger.debug(f"Título detectado por palavra-chave de seção: {section}")
+            continue
+        if any(p in text for p in [".", ";", ",", ":"]):
+            continue
+        if font <= dominant_font * 1.25:
+            continue
+        if dominant_font < 10 and font < 14:
+            continue
+        titles.append(text)
+        logger.debug(f"Título detectado por tamanho de fonte: {text}")
+
+    clean_titles = list(dict.fromkeys(titles))
+    return "; ".join(clean_titles) if clean_titles else None
+
+def legacy_titles(pages, textpages):
+    """Títulos por página como o walker produzia antes; retorna também o tempo gasto montando o "dict"."""
+    decode = 0.0
+    titles = []
+    for page, textpage in zip(pages, textpages):
+        start = time.perf_counter()
+        blocks = page.get_text("dict", textpage=textpage)["blocks"]
+        decode += time.perf_counter() - start
+        titles.append(legacy_detect_struct(page, blocks))
+    return titles, decode
+
+def new_titles(pages, textpages):
+    """Títulos por página como o walker produz agora; retorna também o tempo gasto montando o "dict"."""
+    decode = 0.0
+    structures = []
+    for textpage in textpages:
+        start = time.perf_counter()
+        blocks = textpage.extractDICT()["blocks"]
+        decode += time.perf_counter() - start
+        candidates, fonts = page_spans(blocks)
+        structures.append({"candidates": candidates, "fonts": fonts})
+    return detect_titles(structures), decode
+
+def best_time(func, pages, textpages, repeat: int):
+    """Menor tempo total entre as execuções, o tempo de decodificação correspondente e o resultado."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result, decode = func(pages, textpages)
+        runs.append((time.perf_counter() - start, decode, result))
+    return min(runs, key=lambda run: run[0])
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da detecção de títulos.")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por PDF; usa a menor (padrão: 3).")
+    parser.add_argument("--show", action="store_true", help="Mostra os títulos das páginas que mudaram.")
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="pdf_cli_titles_"))
+    setup_logging()
+    logging.getLogger().handlers[0].setLevel(logging.CRITICAL)
+    # O dictConfig desativa os loggers já criados; na CLI os módulos são importados depois dele.
+    for existing in logging.Logger.manager.loggerDict.values():
+        if isinstance(existing, logging.Logger):
+            existing.disabled = False
+
+    print(
+        f"{'PDF':<40} {'páginas':>7} {'antigo (ms)':>12} {'dict':>6} {'heur.':>6} "
+        f"{'novo (ms)':>10} {'dict':>6} {'heur.':>6} {'ganho':>6}  páginas alteradas"
+    )
+    for pdf in sorted(glob.glob(os.path.join(ROOT, "pdf_exemplos", "*.pdf"))):
+        doc = fitz.open(pdf)
+        pages = list(doc)
+        # A página já é decodificada para o texto: só o que vem depois conta para os títulos.
+        textpages = [page.get_textpage(flags=TEXT_FLAGS) for page in pages]
+
+        old_time, old_decode, old = best_time(legacy_titles, pages, textpages, args.repeat)
+        new_time, new_decode, new = best_time(new_titles, pages, textpages, args.repeat)
+        changed = [index for index, (a, b) in enumerate(zip(old, new)) if a != b]
+
+        print(
+            f"{os.path.basename(pdf)[:40]:<40} {doc.page_count:>7} "
+            f"{old_time * 1000:>12.1f} {old_decode * 1000:>6.1f} {(old_time - old_decode) * 1000:>6.1f} "
+            f"{new_time * 1000:>10.1f} {new_decode * 1000:>6.1f} {(new_time - new_decode) * 1000:>6.1f} "
+            f"{old_time / new_time:>5.1f}x  {changed or '-'}"
+        )
+        if args.show:
+            for index in changed:
+                print(f"    página {index}: {old[index]!r} -> {new[index]!r}")
+        doc.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Compara a contagem de palavras antiga (texto inteiro + lista + Counter) com o WordCounter
+incremental nos PDFs de pdf_exemplos/: resultado, tempo e pico de memória (tracemalloc).
+
+Uso:
+    python benchmarks/words.py                 # PDFs originais
+    python benchmarks/words.py --scale 20      # repete as páginas até ~20x o tamanho
+"""
+import argparse, glob, os, re, sys, time, tracemalloc
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fitz
+from src.utils.text import STOPWORDS, WordCounter, is_latex_pdf, normalize_text, sanitize_latex_text
+
+def legacy_count_words(text: str, is_latex: bool, top_k: int = 10):
+    """Implementação anterior de count_words, mantida como referência."""
+    if is_latex:
+        text = sanitize_latex_text(text)
+
+    text = normalize_text(text)
+    text = re.findall(r"[^\W\d_]+", text.lower(), re.UNICODE)
+    filter_words = [w for w in text if w not in STOPWORDS and len(w) > 1]
+
+    return len(filter_words), len(set(filter_words)), Counter(filter_words).most_common(top_k)
+
+def streaming_count_words(pages, is_latex: bool, top_k: int = 10):
+    """Contagem incremental, página a página."""
+    counter = WordCounter(is_latex)
+    for page in pages:
+        counter.update(page)
+
+    return counter.result(top_k)
+
+def measure(func, *args):
+    """Executa a função medindo o tempo e, em uma segunda execução, o pico de memória alocada."""
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+
+    # O tracemalloc deixa cada alocação mais lenta, por isso não participa da medição de tempo.
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da contagem de palavras.")
+    parser.add_argument("--scale", type=int, default=1, help="Quantas vezes repetir as páginas de cada PDF (padrão: 1).")
+    args = parser.parse_args()
+
+    failures = 0
+    print(f"{'PDF':<45} {'MB':>6} {'antigo (s)':>11} {'novo (s)':>9} {'antigo (MB)':>12} {'novo (MB)':>10}  resultado")
+
+    for pdf in sorted(glob.glob(os.path.join(ROOT, "pdf_exemplos", "*.pdf"))):
+        doc = fitz.open(pdf)
+        is_latex = is_latex_pdf(doc)
+        pages = [page.get_text() + "\n" for page in doc] * args.scale
+        doc.close()
+
+        # Gera o texto inteiro apenas para a versão antiga, que depende dele.
+        def legacy(pages=pages, is_latex=is_latex):
+            return legacy_count_words("".join(pages), is_latex)
+
+        old, old_time, old_peak = measure(legacy)
+        new, new_time, new_peak = measure(streaming_count_words, pages, is_latex)
+
+        # A sanitização LaTeX é forçada também nos demais PDFs para exercitar as fronteiras entre páginas.
+        same = old == new and legacy_count_words("".join(pages), True) == streaming_count_words(pages, True)
+        failures += not same
+
+        size_mb = sum(len(p) for p in pages) / 1024 / 1024
+        print(
+            f"{os.path.basename(pdf)[:45]:<45} {size_mb:>6.2f} {old_time:>11.3f} {new_time:>9.3f} "
+            f"{old_peak / 1024 / 1024:>12.2f} {new_peak / 1024 / 1024:>10.2f}  {'igual' if same else 'DIFERENTE'}"
+        )
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,5 @@
-import sys, argparse, textwrap, rich_argparse
-from src.utils.validator import validate_str, validate_path
-from src.cli.handler_extract import handle_extract
+import os, sys, argparse, textwrap, rich_argparse
+from src.utils.validator import validate_str, validate_path, validate_positive_int, validate_non_negative_int, validate_non_negative_float, validate_ratio, validate_source
 
 class ArgumentParserPT(argparse.ArgumentParser):
     """Classe personalizada para traduzir mensagens de erro para português."""
@@ -33,9 +32,20 @@ def build_parser() -> None:
                 pdf_cli -i -n nome_teste -p ./teste.pdf "Extrai as figuras do documento."
                 pdf_cli -s -p ./teste.pdf "Retorna o resumo do texto."
                 pdf_cli -e -n nome_teste -p ./teste.pdf "Extrai informações, imagens e o resumo."
+                pdf_cli -t -w 8 -p ./teste.pdf "Extrai as informações usando 8 processos."
+                curl -s https://exemplo.com/teste.pdf | pdf_cli -s -p - "Resume o PDF recebido pela entrada padrão."
+                pdf_cli -e -b ./pdfs/ --llm_jobs 2 "Processa todos os PDFs do diretório em lote."
+                pdf_cli --serve --port 8765 "Inicia o servidor local com o PyMuPDF e a LLM carregados."
+                pdf_cli -s -p ./teste.pdf --server http://127.0.0.1:8765 "Envia o PDF ao servidor já iniciado."
+                pdf_cli -e -b ./pdfs/ --index "Processa o lote e atualiza o índice de busca."
+                pdf_cli search "redes neurais" "Busca nas páginas e resumos indexados."
+                pdf_cli -s -b ./pdfs/ --dedup "Reaproveita o resumo de documentos quase idênticos."
+                pdf_cli duplicates "Lista os grupos de documentos quase idênticos."
                 
                 Observações: 
                     - Se a flag -n não for especificada, um nome padrão será usado para salvar as imagens.
+                    - No modo lote (-b), documentos em que as ações pedidas já foram concluídas são pulados (use --no_resume para refazer).
+                    - No modo servidor (--serve), as saídas são gravadas no diretório em que o servidor foi iniciado.
                     - As informações extraídas são salvas na pasta 'output/'.
                     - Todas as pastas são criadas automaticamente e salvas no diretório correspondente ao que está sendo executado.
         """), 
@@ -43,16 +53,33 @@ def build_parser() -> None:
     add_help=False
     )
 
+    source = parser.add_mutually_exclusive_group(required=True)
+
     # Caminho do arquivo
-    parser.add_argument(
+    source.add_argument(
         '-p', 
         '--path', 
         type=validate_path, 
-        help="Caminho para o arquivo PDF (obrigatório).", 
-        required=True, 
+        help="Caminho para o arquivo PDF, ou '-' para ler o PDF da entrada padrão (obrigatório, exceto com -b ou --serve).", 
         metavar="pdf_path"
     )
 
+    # Lote de arquivos
+    source.add_argument(
+        '-b',
+        '--batch',
+        type=validate_source,
+        help="Diretório, padrão glob ou manifesto (um caminho por linha) com os PDFs a processar em lote.",
+        metavar="source"
+    )
+
+    # Servidor local
+    source.add_argument(
+        '--serve',
+        action='store_true',
+        help="Inicia o servidor HTTP local que recebe jobs e mantém o PyMuPDF e a LLM carregados entre eles."
+    )
+
     # Extrair apenas o texto
     parser.add_argument(
         '-t', 
@@ -94,12 +121,540 @@ def build_parser() -> None:
         help='Executa todas as etapas (texto, imagens e resumo).'
     )
 
+    # Quantidade de palavras mais citadas
+    parser.add_argument(
+        '-k',
+        '--top_k',
+        type=validate_positive_int,
+        default=10,
+        help="Quantidade de palavras mais citadas exibidas nos metadados (padrão: 10).",
+        metavar='N'
+    )
+
+    # Resumo em streaming
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help="Exibe e grava o resumo token a token enquanto a LLM gera o texto (usado com `-s` ou `-e`)."
+    )
+
+    # Processos para a extração
+    parser.add_argument(
+        '-w',
+        '--workers',
+        type=validate_positive_int,
+        default=1,
+        help="Número de processos para extrair as páginas e as imagens em paralelo (padrão: 1).",
+        metavar='N'
+    )
+
+    # Codificador das imagens
+    parser.add_argument(
+        '--image_format',
+        choices=['png', 'original'],
+        default='png',
+        help="Formato das imagens: 'png' ou 'original' (mantém os bytes de JPEG/JPX sem recodificar; as demais viram PNG). Padrão: png."
+    )
+
+    # Compressão do PNG
+    parser.add_argument(
+        '--png_level',
+        type=int,
+        choices=range(0, 10),
+        default=None,
+        help="Nível de compressão do PNG, de 0 (mais rápido) a 9 (menor arquivo). Padrão: codificador do PyMuPDF.",
+        metavar='0-9'
+    )
+
+    # Imagens repetidas
+    parser.add_argument(
+        '--image_dedup',
+        choices=['xref', 'content'],
+        default='xref',
+        help="Como identificar imagens repetidas, salvas uma única vez: 'xref' (mesmo objeto no PDF) ou 'content' (mesmos bytes). Padrão: xref."
+    )
+
+    # OCR das páginas digitalizadas
+    parser.add_argument(
+        '--ocr',
+        action='store_true',
+        help="Passa pelo OCR (Tesseract) as páginas sem camada de texto, como as digitalizadas. Requer o Tesseract instalado ou TESSDATA_PREFIX."
+    )
+
+    # Resolução do OCR
+    parser.add_argument(
+        '--ocr_dpi',
+        type=validate_positive_int,
+        default=300,
+        help="Resolução, em DPI, das páginas enviadas ao OCR (padrão: 300).",
+        metavar='DPI'
+    )
+
+    # Idiomas do OCR
+    parser.add_argument(
+        '--ocr_language',
+        default='por+eng',
+        help="Idiomas do Tesseract, separados por '+' (padrão: por+eng).",
+        metavar='IDIOMAS'
+    )
+
+    # Processos de extração no lote
+    parser.add_argument(
+        '--extract_jobs',
+        type=validate_positive_int,
+        default=os.cpu_count() or 1,
+        help="Documentos extraídos ao mesmo tempo no modo lote (padrão: número de CPUs).",
+        metavar='N'
+    )
+
+    # Resumos simultâneos no lote
+    parser.add_argument(
+        '--llm_jobs',
+        type=validate_positive_int,
+        default=1,
+        help="Chamadas simultâneas à LLM: trechos de um documento ou, no modo lote, documentos (padrão: 1).",
+        metavar='N'
+    )
+
+    # Backend da LLM
+    parser.add_argument(
+        '--llm_backend',
+        choices=['ollama', 'llamacpp', 'mock'],
+        default='ollama',
+        help="Backend da LLM: Ollama (padrão), servidor do llama.cpp (llama-server) ou 'mock', uma LLM simulada que dispensa serviço externo."
+    )
+
+    # Modelo da LLM
+    parser.add_argument(
+        '--llm_model',
+        type=validate_str,
+        default=None,
+        help="Nome do modelo no backend (padrão: o SummLlama3.2-3B do Hugging Face).",
+        metavar='NOME'
+    )
+
+    # Endereço do backend
+    parser.add_argument(
+        '--llm_host',
+        type=validate_str,
+        default=None,
+        help="Endereço do servidor da LLM (padrão do Ollama: http://127.0.0.1:11434; do llama.cpp: http://127.0.0.1:8080).",
+        metavar='URL'
+    )
+
+    # Temperatura
+    parser.add_argument(
+        '--llm_temperature',
+        type=validate_non_negative_float,
+        default=None,
+        help="Temperatura de amostragem da LLM (padrão: a do modelo).",
+        metavar='T'
+    )
+
+    # Tamanho do contexto
+    parser.add_argument(
+        '--llm_num_ctx',
+        type=validate_positive_int,
+        default=None,
+        help="Tamanho do contexto em tokens (num_ctx do Ollama; no llama.cpp, é definido ao iniciar o servidor).",
+        metavar='N'
+    )
+
+    # Tokens gerados por resposta
+    parser.add_argument(
+        '--llm_num_predict',
+        type=validate_positive_int,
+        default=None,
+        help="Máximo de tokens gerados por resposta da LLM (padrão: o do backend).",
+        metavar='N'
+    )
+
+    # Modelo menor para documentos curtos
+    parser.add_argument(
+        '--small_model',
+        type=validate_str,
+        default=None,
+        help="Modelo usado nos documentos curtos (até --small_model_tokens); os demais usam --llm_model.",
+        metavar='NOME'
+    )
+
+    # Limite dos documentos curtos
+    parser.add_argument(
+        '--small_model_tokens',
+        type=validate_positive_int,
+        default=4000,
+        help="Tokens estimados até os quais o documento é resumido pelo --small_model (padrão: 4000).",
+        metavar='N'
+    )
+
+    # Latência da LLM simulada
+    parser.add_argument(
+        '--mock_latency',
+        type=validate_non_negative_float,
+        default=0.0,
+        help="Espera, em segundos, de cada chamada à LLM simulada (--llm_backend mock) (padrão: 0).",
+        metavar='S'
+    )
+
+    # Taxa de geração da LLM simulada
+    parser.add_argument(
+        '--mock_rate',
+        type=validate_non_negative_float,
+        default=0.0,
+        help="Tokens por segundo gerados pela LLM simulada; 0 responde sem esperar (padrão: 0).",
+        metavar='N'
+    )
+
+    # Cliente assíncrono da LLM
+    parser.add_argument(
+        '--async_llm',
+        action='store_true',
+        help="Envia os resumos (trechos ou documentos do lote) pelo cliente assíncrono, com conexão reaproveitada."
+    )
+
+    # Timeout das requisições
+    parser.add_argument(
+        '--llm_timeout',
+        type=validate_positive_int,
+        default=300,
+        help="Tempo máximo, em segundos, de cada requisição do cliente assíncrono (padrão: 300).",
+        metavar='S'
+    )
+
+    # Novas tentativas
+    parser.add_argument(
+        '--llm_retries',
+        type=validate_non_negative_int,
+        default=2,
+        help="Novas tentativas, com espera exponencial, após falhas do cliente assíncrono (padrão: 2).",
+        metavar='N'
+    )
+
+    # Orçamento de tokens por trecho
+    parser.add_argument(
+        '--chunk_tokens',
+        type=validate_positive_int,
+        default=1500,
+        help="Tokens por trecho enviado à LLM; textos maiores são resumidos em etapas (padrão: 1500).",
+        metavar='N'
+    )
+
+    # Sobreposição entre trechos
+    parser.add_argument(
+        '--chunk_overlap',
+        type=validate_non_negative_int,
+        default=150,
+        help="Tokens repetidos entre trechos quando uma seção precisa ser quebrada (padrão: 150).",
+        metavar='N'
+    )
+
+    # Resumos combinados por etapa de redução
+    parser.add_argument(
+        '--fan_out',
+        type=validate_positive_int,
+        default=4,
+        help="Resumos parciais combinados em cada etapa de redução (padrão: 4).",
+        metavar='N'
+    )
+
+    # Texto enviado à LLM sem limpeza
+    parser.add_argument(
+        '--no_compress',
+        action='store_true',
+        help="Envia o texto extraído à LLM sem remover cabeçalhos, rodapés, números de página, URLs e referências."
+    )
+
+    # Orçamento total de tokens do texto
+    parser.add_argument(
+        '--token_budget',
+        type=validate_non_negative_int,
+        default=0,
+        help="Tokens estimados do texto enviado à LLM; as seções menos importantes são cortadas primeiro (padrão: 0, sem limite).",
+        metavar='N'
+    )
+
+    # Linhas mantidas das referências
+    parser.add_argument(
+        '--reference_lines',
+        type=validate_non_negative_int,
+        default=0,
+        help="Linhas da seção de referências mantidas no texto enviado à LLM (padrão: 0).",
+        metavar='N'
+    )
+
+    # Saídas estruturadas
+    parser.add_argument(
+        '--output_format',
+        nargs='+',
+        choices=['json', 'jsonl', 'parquet'],
+        default=[],
+        help="Grava também registros estruturados em 'output/json/': 'json' (um arquivo por documento), 'jsonl' (uma linha por documento, acrescentada) e 'parquet' (requer pyarrow).",
+        metavar='FORMATO'
+    )
+
+    # Console sem formatação
+    parser.add_argument(
+        '--quiet',
+        action='store_true',
+        help="Não exibe tabelas, painéis nem animações no console; as saídas em arquivo e o log continuam."
+    )
+
+    # Índice de busca
+    parser.add_argument(
+        '--index',
+        action='store_true',
+        help="Atualiza o índice de busca (SQLite FTS5) com as páginas, os títulos e o resumo de cada documento concluído; consulte com 'pdf_cli search'."
+    )
+
+    # Caminho do índice de busca
+    parser.add_argument(
+        '--index_path',
+        default='output/index.sqlite',
+        help="Arquivo do índice de busca (padrão: output/index.sqlite).",
+        metavar='arquivo'
+    )
+
+    # Detecção de duplicatas
+    parser.add_argument(
+        '--dedup',
+        action='store_true',
+        help="Detecta documentos quase idênticos (MinHash/LSH) e reaproveita o resumo de um já resumido no lugar de chamar a LLM; consulte os grupos com 'pdf_cli duplicates'."
+    )
+
+    # Limiar de similaridade das duplicatas
+    parser.add_argument(
+        '--dedup_threshold',
+        type=validate_ratio,
+        default=0.85,
+        help="Similaridade mínima (Jaccard estimado dos trechos de 3 palavras, entre 0 e 1) para reaproveitar o resumo (padrão: 0.85).",
+        metavar='S'
+    )
+
+    # Caminho do índice de duplicatas
+    parser.add_argument(
+        '--dedup_path',
+        default='output/duplicates.sqlite',
+        help="Arquivo do índice de duplicatas (padrão: output/duplicates.sqlite).",
+        metavar='arquivo'
+    )
+
+    # Arquivos mapeados em memória
+    parser.add_argument(
+        '--mmap',
+        action='store_true',
+        help="Mapeia os PDFs em memória (mmap) e os entrega ao PyMuPDF e ao hash do cache sem cópias, em vez de cada etapa abrir o arquivo."
+    )
+
+    # Desativar o cache
+    parser.add_argument(
+        '--no_cache',
+        action='store_true',
+        help="Não lê nem grava o cache de extrações e resumos em 'output/cache/'."
+    )
+
+    # Refazer ignorando o cache
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help="Ignora as entradas existentes no cache e grava os novos resultados."
+    )
+
+    # Tamanho do cache
+    parser.add_argument(
+        '--cache_size',
+        type=validate_positive_int,
+        default=512,
+        help="Tamanho máximo do cache em MB; as entradas menos usadas são descartadas (padrão: 512).",
+        metavar='MB'
+    )
+
+    # Reprocessar documentos já concluídos
+    parser.add_argument(
+        '--no_resume',
+        action='store_true',
+        help="No modo lote, reprocessa também os documentos em que as ações pedidas já foram concluídas."
+    )
+
+    # Endereço do servidor
+    parser.add_argument(
+        '--host',
+        default='127.0.0.1',
+        help="Endereço em que o servidor (--serve) atende (padrão: 127.0.0.1).",
+        metavar='host'
+    )
+
+    # Porta do servidor
+    parser.add_argument(
+        '--port',
+        type=validate_positive_int,
+        default=8765,
+        help="Porta em que o servidor (--serve) atende (padrão: 8765).",
+        metavar='N'
+    )
+
+    # Modo cliente
+    parser.add_argument(
+        '--server',
+        help="URL de um servidor já iniciado com --serve; o PDF de -p é processado por ele (ex.: http://127.0.0.1:8765).",
+        metavar='url'
+    )
+
+    # Instrumentação por etapa
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help="Mede o tempo de cada etapa e conta páginas, spans, imagens, bytes e tokens; exibe uma tabela e grava o trace em 'output/profile/'."
+    )
+
+    # Perfil de CPU
+    parser.add_argument(
+        '--profile_cpu',
+        choices=['cprofile', 'pyinstrument'],
+        default=None,
+        help="Captura o perfil de CPU da execução com cProfile (.prof) ou pyinstrument (.html, se instalado) em 'output/profile/'."
+    )
+
     parser.set_defaults(func=handle_extract)
 
     return parser
 
+def build_search_parser() -> ArgumentParserPT:
+    """Constrói os argumentos do comando de busca (pdf_cli search)."""
+    parser = ArgumentParserPT(
+        prog="pdf_cli search",
+        description="Busca nas páginas, títulos e resumos dos documentos indexados com --index, ordenando pelo BM25.",
+        formatter_class=rich_argparse.RawDescriptionRichHelpFormatter
+    )
+
+    # Consulta
+    parser.add_argument(
+        'query',
+        nargs='+',
+        help="Termos da busca; as páginas com mais termos, e termos mais raros, aparecem primeiro."
+    )
+
+    # Número de resultados
+    parser.add_argument(
+        '-k',
+        '--limit',
+        type=validate_positive_int,
+        default=10,
+        help="Número máximo de páginas retornadas (padrão: 10).",
+        metavar='N'
+    )
+
+    # Caminho do índice de busca
+    parser.add_argument(
+        '--index_path',
+        default='output/index.sqlite',
+        help="Arquivo do índice de busca (padrão: output/index.sqlite).",
+        metavar='arquivo'
+    )
+
+    # Saída em JSON
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help="Imprime os resultados em JSON, no lugar da tabela."
+    )
+
+    parser.set_defaults(func=handle_search)
+
+    return parser
+
+def build_duplicates_parser() -> ArgumentParserPT:
+    """Constrói os argumentos do relatório de duplicatas (pdf_cli duplicates)."""
+    parser = ArgumentParserPT(
+        prog="pdf_cli duplicates",
+        description="Lista os grupos de documentos quase idênticos entre os processados com --dedup.",
+        formatter_class=rich_argparse.RawDescriptionRichHelpFormatter
+    )
+
+    # Limiar de similaridade das duplicatas
+    parser.add_argument(
+        '--dedup_threshold',
+        type=validate_ratio,
+        default=0.85,
+        help="Similaridade mínima entre documentos do mesmo grupo (padrão: 0.85).",
+        metavar='S'
+    )
+
+    # Caminho do índice de duplicatas
+    parser.add_argument(
+        '--dedup_path',
+        default='output/duplicates.sqlite',
+        help="Arquivo do índice de duplicatas (padrão: output/duplicates.sqlite).",
+        metavar='arquivo'
+    )
+
+    # Saída em JSON
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help="Imprime os grupos em JSON, no lugar da tabela."
+    )
+
+    parser.set_defaults(func=handle_duplicates)
+
+    return parser
+
+def resolve_actions(args):
+    """Define quais etapas (texto, imagens e resumo) os argumentos pedem."""
+    extract_text = args.text_only or args.everything or (args.text_only and args.summarize)
+    extract_img = args.image or args.everything or (args.text_only and args.image) or (args.summarize and args.image)
+    extract_sum = args.summarize or args.everything
+
+    return extract_text, extract_img, extract_sum
+
+def handle_extract(args):
+    """Executa a extração de um PDF; o módulo só é importado quando a ação é usada."""
+    from src.cli.handler_extract import handle_extract
+    return handle_extract(args)
+
+def handle_batch(args):
+    """Executa o processamento em lote; o módulo só é importado quando a ação é usada."""
+    from src.cli.handler_batch import handle_batch
+    return handle_batch(args)
+
+def handle_serve(args):
+    """Inicia o servidor local; o módulo só é importado quando a ação é usada."""
+    from src.cli.handler_serve import handle_serve
+    return handle_serve(args)
+
+def handle_client(args):
+    """Envia o PDF ao servidor; o módulo só é importado quando a ação é usada."""
+    from src.cli.handler_client import handle_client
+    return handle_client(args)
+
+def handle_search(args):
+    """Busca no índice; o módulo só é importado quando a ação é usada."""
+    from src.cli.handler_search import handle_search
+    return handle_search(args)
+
+def handle_duplicates(args):
+    """Lista as duplicatas; o módulo só é importado quando a ação é usada."""
+    from src.cli.handler_duplicates import handle_duplicates
+    return handle_duplicates(args)
+
+def profile_name(args) -> str:
+    """Nome dos arquivos de perfil: o documento, o lote ou o servidor."""
+    if args.path == "-":
+        from src.utils.source import STDIN_NAME
+        return STDIN_NAME
+    if args.path:
+        from src.utils.validator import define_name
+        return define_name(args.path)
+
+    return "servidor" if args.serve else "lote"
+
 def run() -> None:
     """Declara as funções necessárioas para construir a aplicação."""
+    commands = {"search": build_search_parser, "duplicates": build_duplicates_parser}
+    if sys.argv[1:2] and sys.argv[1] in commands:
+        args = commands[sys.argv[1]]().parse_args(sys.argv[2:])
+        args.func(args)
+        return
+
     parser = build_parser()
 
     if len(sys.argv) == 1:
@@ -108,9 +663,20 @@ def run() -> None:
 
     args = parser.parse_args()
 
+    if args.batch:
+        args.func = handle_batch
+    elif args.serve:
+        args.func = handle_serve
+    elif args.server:
+        args.func = handle_client
+
     if hasattr(args, 'func'):
         try:
-            args.func(args)
+            if args.profile or args.profile_cpu:
+                from src.utils.profiler import run_profiled
+                run_profiled(args.func, args, profile_name(args), args.profile, args.profile_cpu)
+            else:
+                args.func(args)
         except Exception:
             raise
     else:
@@ -0,0 +1,99 @@
+import logging
+from src.utils.batch import collect_documents, run_batch
+from src.utils.console import get_console
+from src.cli.argumments import resolve_actions
+from src.llm.config import SummaryConfig
+from src.utils.cache import ResultCache
+from src.pdf.config import ImageConfig, OcrConfig
+from src.utils.output import OutputConfig
+from src.utils.index import open_index
+from src.utils.dedup import open_duplicates
+
+logger = logging.getLogger(__name__)
+
+def handle_batch(args):
+    """Processa um diretório, padrão glob ou manifesto de PDFs."""
+
+    logger.debug(f"Argumentos recebidos: {vars(args)}")
+
+    extract_text, extract_img, extract_sum = resolve_actions(args)
+
+    if not (extract_text or extract_img or extract_sum):
+        logger.error("Nenhuma ação especificada. Consulte a ajuda com -h/--help para mais informações.")
+        return
+
+    documents = collect_documents(args.batch)
+    if not documents:
+        logger.error(f"Nenhum PDF encontrado em: {args.batch}")
+        return
+
+    output = OutputConfig.from_args(args)
+    index = duplicates = None
+
+    try:
+        index = open_index(args)
+        duplicates = open_duplicates(args)
+        stats = run_batch(
+            documents,
+            extract_text,
+            extract_img,
+            extract_sum,
+            image_name=args.image_name,
+            extract_jobs=args.extract_jobs,
+            llm_jobs=args.llm_jobs,
+            resume=not args.no_resume,
+            # No lote, a concorrência da LLM é entre documentos: os trechos de cada um seguem em série.
+            config=SummaryConfig.from_args(args, max_concurrency=1),
+            cache=ResultCache.from_args(args),
+            top_k=args.top_k,
+            # Os documentos já são extraídos em paralelo: as imagens de cada um seguem em série.
+            image_config=ImageConfig.from_args(args, workers=1),
+            ocr_config=OcrConfig.from_args(args, workers=1),
+            output=output,
+            index=index,
+            duplicates=duplicates,
+            use_mmap=args.mmap
+        )
+    except Exception as e:
+        logger.error(f"Ocorreu um erro durante o processamento em lote: {e}")
+        return
+    finally:
+        for store in (index, duplicates):
+            if store is not None:
+                store.close()
+
+    print_stats(stats, output.quiet)
+
+def print_stats(stats, quiet: bool = False):
+    """Imprime o resumo de vazão do processamento em lote."""
+    elapsed = stats["elapsed"] or 1e-9
+    docs_s = stats["docs"] / elapsed
+    pages_s = stats["pages"] / elapsed
+
+    logger.info(
+        f"Lote finalizado: {stats['docs']} documentos, {stats['pages']} páginas, "
+        f"{stats['failures']} falhas, {stats['skipped']} pulados, {stats['duplicates']} resumos reaproveitados de duplicatas em {elapsed:.2f}s "
+        f"({docs_s:.2f} docs/s, {pages_s:.2f} páginas/s)."
+    )
+
+    if quiet:
+        return
+
+    from rich.table import Table
+    from rich import box
+
+    table = Table(title="Processamento em Lote", box=box.ROUNDED, show_header=True, header_style="bold magenta")
+
+    table.add_column("Atributo", style="cyan", no_wrap=True)
+    table.add_column("Valor", style="white")
+
+    table.add_row("Documentos", str(stats['docs']))
+    table.add_row("Páginas", str(stats['pages']))
+    table.add_row("Falhas", str(stats['failures']))
+    table.add_row("Pulados (já concluídos)", str(stats['skipped']))
+    table.add_row("Resumos reaproveitados (duplicatas)", str(stats['duplicates']))
+    table.add_row("Tempo (s)", f"{elapsed:.2f}")
+    table.add_row("Documentos/s", f"{docs_s:.2f}")
+    table.add_row("Páginas/s", f"{pages_s:.2f}")
+
+    get_console().print(table)
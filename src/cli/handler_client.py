@@ -0,0 +1,62 @@
+import logging, os
+from src.utils.client import submit_job, wait_job
+from src.utils.console import get_console, print_summary
+from src.cli.argumments import resolve_actions
+
+logger = logging.getLogger(__name__)
+
+def handle_client(args):
+    """Envia o PDF a um servidor já iniciado (--serve) e exibe o resultado."""
+
+    logger.debug(f"Argumentos recebidos: {vars(args)}")
+
+    extract_text, extract_img, extract_sum = resolve_actions(args)
+
+    if not (extract_text or extract_img or extract_sum):
+        logger.error("Nenhuma ação especificada. Consulte a ajuda com -h/--help para mais informações.")
+        return
+
+    if args.path == "-":
+        # O servidor recebe o caminho do PDF, não o conteúdo.
+        logger.error("A entrada padrão (-p -) não pode ser enviada ao servidor; informe o caminho do PDF.")
+        return
+
+    try:
+        job = submit_job(args.server, {
+            # O servidor resolve o caminho no próprio sistema de arquivos.
+            "path": os.path.abspath(args.path),
+            "text": extract_text,
+            "image": extract_img,
+            "summarize": extract_sum,
+            "image_name": args.image_name,
+            "top_k": args.top_k,
+            "model": args.llm_model,
+        })
+        logger.info(f"Job {job['id'][:8]} enviado para {args.server}.")
+
+        if args.quiet:
+            job = wait_job(args.server, job["id"])
+        else:
+            with get_console().status("[bold green]Aguardando o servidor...\n\n", spinner="dots"):
+                job = wait_job(args.server, job["id"])
+    except ValueError as e:
+        logger.error(e)
+        return
+
+    if job["status"] == "failed":
+        logger.error(f"Ocorreu um erro durante o processamento no servidor: {job['error']}")
+        return
+
+    result = job["result"]
+    if not args.quiet:
+        if result["metadata"]:
+            from rich.markdown import Markdown
+            get_console().print(Markdown(result["metadata"]))
+        if result["summary"]:
+            print_summary(result["summary"])
+
+    if result["markdown"]:
+        logger.info(f"Markdown gerado pelo servidor em: {result['markdown']}")
+    if result["images"]:
+        logger.info(f"Imagens extraidas e salvas em: {result['images']}")
+    logger.info(f"Job concluído em {job['finished'] - job['created']:.2f}s.")
@@ -0,0 +1,41 @@
+import json, logging
+from src.utils.dedup import DuplicateIndex
+from src.utils.console import get_console
+
+logger = logging.getLogger(__name__)
+
+def handle_duplicates(args):
+    """Exibe os grupos de documentos quase idênticos do índice de duplicatas."""
+
+    logger.debug(f"Argumentos recebidos: {vars(args)}")
+
+    try:
+        with DuplicateIndex(args.dedup_path, args.dedup_threshold, readonly=True) as duplicates:
+            clusters = duplicates.clusters()
+    except ValueError as e:
+        logger.error(e)
+        return
+
+    logger.info(f"{len(clusters)} grupos de documentos quase idênticos ({sum(len(cluster['documents']) for cluster in clusters)} documentos).")
+
+    if args.json:
+        print(json.dumps(clusters, ensure_ascii=False, indent=2))
+        return
+
+    if not clusters:
+        return
+
+    from rich.table import Table
+    from rich import box
+
+    table = Table(title="Documentos quase idênticos", box=box.ROUNDED, show_header=True, header_style="bold magenta")
+
+    table.add_column("Grupo", style="cyan", justify="right")
+    table.add_column("Similaridade", style="green", justify="right")
+    table.add_column("Documentos", style="white")
+
+    for number, cluster in enumerate(clusters, start=1):
+        similarity = f"{cluster['similarity']:.2f}" if cluster["similarity"] is not None else "-"
+        table.add_row(str(number), similarity, "\n".join(document["path"] for document in cluster["documents"]))
+
+    get_console().print(table)
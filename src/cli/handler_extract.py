@@ -1,12 +1,18 @@
-import logging
-from rich.console import Console
-from src.utils.validator import define_name
-from src.utils.files import make_markdown
-from src.pdf.extractor import extract_pdf
-from src.pdf.image import extract_image
-from src.llm.summarize import print_summary, summarize
-
-console = Console()
+import logging, time
+from contextlib import nullcontext
+from src.utils.files import make_markdown, format_output, stream_markdown
+from src.utils.cache import ResultCache
+from src.utils.pipeline import extract_stage, summary_stage, stream_summary_stage, reuse_duplicate, register_document
+from src.utils.console import get_console, print_summary
+from src.utils.profiler import profiler
+from src.llm.config import SummaryConfig
+from src.pdf.config import ImageConfig, OcrConfig
+from src.utils.output import OutputConfig, RecordWriter, build_record, finish_record
+from src.utils.index import open_index
+from src.utils.dedup import open_duplicates
+from src.utils.source import PdfSource
+from src.cli.argumments import resolve_actions
+
 logger = logging.getLogger(__name__)
 
 def handle_extract(args):
@@ -18,15 +24,7 @@ def handle_extract(args):
         logger.error("Caminho do arquivo não foi especificado.")
         return
         
-    path_pdf = args.path
-    filename = define_name(path_pdf)
-
-    name_image = args.image_name or f"{filename}_imagem"
-    logger.debug(f"Nome base para imagens: {name_image}")
-
-    extract_text = args.text_only or args.everything or (args.text_only and args.summarize)
-    extract_img = args.image or args.everything or (args.text_only and args.image) or (args.summarize and args.image)
-    extract_sum = args.summarize or args.everything
+    extract_text, extract_img, extract_sum = resolve_actions(args)
 
     metadata = None
     summa = None
@@ -36,22 +34,98 @@ def handle_extract(args):
             logger.error("Nenhuma ação especificada. Consulte a ajuda com -h/--help para mais informações.")
             return
 
+        # "-" lê o PDF da entrada padrão; com --mmap, o arquivo é mapeado em memória.
+        source = PdfSource.from_stdin() if args.path == "-" else PdfSource.from_path(args.path, args.mmap)
+        path_pdf = source.location
+        filename = source.name
+
+        name_image = args.image_name or f"{filename}_imagem"
+        logger.debug(f"Nome base para imagens: {name_image}")
+
+        cache = ResultCache.from_args(args)
+        config = SummaryConfig.from_args(args)
+        output = OutputConfig.from_args(args)
+        writer = RecordWriter(output, filename)
+
+        start = time.perf_counter()
+        doc = source.open()
+        try:
+            logger.debug("Percorrendo o documento uma única vez para todas as etapas.")
+            with profiler.stage("extract_stage", document=str(path_pdf)):
+                result = extract_stage(
+                    doc,
+                    source.path,
+                    extract_text,
+                    extract_img,
+                    extract_sum,
+                    name_image,
+                    filename,
+                    workers=args.workers,
+                    cache=cache,
+                    config=config,
+                    top_k=args.top_k,
+                    image_config=ImageConfig.from_args(args),
+                    ocr_config=OcrConfig.from_args(args),
+                    index=bool(args.index),
+                    dedup=bool(args.dedup),
+                    source=source
+                )
+        finally:
+            doc.close()
+            source.close()
+
+        result["path"] = path_pdf
+        result["filename"] = filename
+        record = build_record(result, result["metadata"], extract_img, time.perf_counter() - start)
+
         if extract_text:
             logger.debug("Iniciando extração de texto.")
-            metadata = extract_pdf(path_pdf)
+            metadata = format_output(result["metadata"], show=not output.quiet)
+
+        streamed = extract_sum and args.stream
+        start = time.perf_counter()
+        # O índice de duplicatas fica aberto só durante o resumo e é fechado mesmo se ele falhar.
+        with open_duplicates(args) or nullcontext() as duplicates:
+            if extract_sum:
+                reuse_duplicate(result, duplicates, config)
 
-        if extract_img:
-            logger.debug("Iniciando extração de imagens.")
-            extract_image(path_pdf, name_image, filename)
+            if streamed:
+                logger.debug("Iniciando resumo do PDF em modo streaming.")
+                from src.llm.summarize import print_summary_stream, measure_stream
+                tokens = stream_markdown(stream_summary_stage(result, config, cache), filename, metadata)
+                with profiler.stage("summary_stage", document=str(path_pdf)):
+                    if output.quiet:
+                        summa = "".join(measure_stream(tokens)).strip()
+                    else:
+                        summa = print_summary_stream(tokens)
+            elif extract_sum and output.quiet:
+                logger.debug("Iniciando resumo do PDF.")
+                with profiler.stage("summary_stage", document=str(path_pdf)):
+                    summa = summary_stage(result, config, cache)
+            elif extract_sum:
+                logger.debug("Iniciando resumo do PDF.")
+                with get_console().status("[bold green]Lendo o PDF e gerando resumo com LLM...\n\n", spinner="dots"):
+                    with profiler.stage("summary_stage", document=str(path_pdf)):
+                        summa = summary_stage(result, config, cache)
+                print_summary(summa)
 
-        if extract_sum:
-            logger.debug("Iniciando resumo do PDF.")
-            with console.status("[bold green]Lendo o PDF e gerando resumo com LLM...\n\n", spinner="dots"):
-                summa = summarize(path_pdf)
-            print_summary(summa)
+            finish_record(record, summa, time.perf_counter() - start if extract_sum else None, result.get("duplicate_of"))
+            register_document(result, duplicates, config, summa)
 
-        if metadata or summa:
+        logger.info(cache.stats())
+
+        if (metadata or summa) and not streamed:
             logger.debug("Criando arquivo markdown com os resultados.")
-            make_markdown(summarize=summa, metadata=metadata, filename=filename)
+            with profiler.stage("make_markdown"):
+                make_markdown(summarize=summa, metadata=metadata, filename=filename)
+
+        with writer:
+            writer.add(record)
+
+        index = open_index(args)
+        if index is not None:
+            with index:
+                index.add(result, summa)
+                logger.info(index.stats())
     except Exception as e:
         logger.error(f"Ocorreu um erro durante o processamento: {e}")
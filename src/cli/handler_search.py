@@ -0,0 +1,45 @@
+import json, logging, time
+from src.utils.index import SearchIndex
+from src.utils.console import get_console
+
+logger = logging.getLogger(__name__)
+
+def handle_search(args):
+    """Busca os termos no índice e exibe as páginas encontradas."""
+
+    logger.debug(f"Argumentos recebidos: {vars(args)}")
+
+    query = " ".join(args.query)
+    try:
+        with SearchIndex(args.index_path, readonly=True) as index:
+            start = time.perf_counter()
+            hits = index.search(query, args.limit)
+            elapsed = time.perf_counter() - start
+    except ValueError as e:
+        logger.error(e)
+        return
+
+    logger.info(f"Busca '{query}': {len(hits)} resultados em {elapsed * 1000:.1f} ms.")
+
+    if args.json:
+        print(json.dumps(hits, ensure_ascii=False, indent=2))
+        return
+
+    if not hits:
+        logger.warning("Nenhuma página encontrada para a busca.")
+        return
+
+    from rich.table import Table
+    from rich import box
+
+    table = Table(title=f"Busca: {query}", box=box.ROUNDED, show_header=True, header_style="bold magenta")
+
+    table.add_column("Documento", style="cyan")
+    table.add_column("Página", style="green", justify="right")
+    table.add_column("Score", justify="right")
+    table.add_column("Trecho", style="white")
+
+    for hit in hits:
+        table.add_row(hit["filename"], str(hit["page"]) if hit["page"] else "resumo", f"{hit['score']:.2f}", hit["snippet"])
+
+    get_console().print(table)
@@ -0,0 +1,45 @@
+import logging
+from src.utils.server import JobQueue, serve
+from src.utils.cache import ResultCache
+from src.llm.config import SummaryConfig
+from src.pdf.config import ImageConfig, OcrConfig
+from src.utils.output import OutputConfig
+from src.utils.index import open_index
+from src.utils.dedup import open_duplicates
+
+logger = logging.getLogger(__name__)
+
+def handle_serve(args):
+    """Inicia o servidor local que mantém o PyMuPDF e a LLM carregados entre os jobs."""
+
+    logger.debug(f"Argumentos recebidos: {vars(args)}")
+
+    try:
+        index = open_index(args)
+        duplicates = open_duplicates(args)
+    except Exception as e:
+        logger.error(f"Não foi possível abrir o índice de busca ou de duplicatas - {e}")
+        return
+
+    queue = JobQueue(
+        extract_jobs=args.extract_jobs,
+        llm_jobs=args.llm_jobs,
+        # A concorrência da LLM é entre jobs: os trechos de cada documento seguem em série.
+        config=SummaryConfig.from_args(args, max_concurrency=1, use_async=False),
+        cache=ResultCache.from_args(args),
+        # Os documentos já são extraídos em paralelo: as imagens de cada um seguem em série.
+        image_config=ImageConfig.from_args(args, workers=1),
+        ocr_config=OcrConfig.from_args(args, workers=1),
+        output=OutputConfig.from_args(args),
+        index=index,
+        duplicates=duplicates,
+        use_mmap=args.mmap
+    )
+
+    try:
+        queue.warm()
+        serve(args.host, args.port, queue)
+    except KeyboardInterrupt:
+        logger.info("Servidor interrompido pelo usuário.")
+    except OSError as e:
+        logger.error(f"Não foi possível iniciar o servidor em {args.host}:{args.port} - {e}")
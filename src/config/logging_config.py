@@ -50,6 +50,12 @@ def setup_logging():
                 'encoding': 'utf8'
             }
         },
+        'loggers': {
+            # Uma linha por requisição HTTP à LLM polui o console quando há muitos trechos.
+            'httpx': {
+                'level': logging.WARNING,
+            },
+        },
         'root': {
             'handlers': ['console', 'file'],
             'level': logging.DEBUG,
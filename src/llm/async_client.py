@@ -0,0 +1,130 @@
+import asyncio, logging, time
+from typing import Iterable, List, Union
+import httpx
+from ollama import ResponseError
+from langchain_core.prompts import ChatPromptTemplate
+from .prompts import SUMMARY_TEMPLATE, PARTIAL_TEMPLATE
+from .model import build_model, route_model
+from .config import SummaryConfig, ModelConfig
+from .chunking import estimate_tokens, require_text, map_reduce_plan, MAP_BATCH
+from src.utils.cache import ResultCache
+from src.utils.profiler import profiler
+from src.utils.spool import TextSpool, as_text
+
+logger = logging.getLogger(__name__)
+
+class AsyncLLMSession:
+    """Sessão assíncrona com a LLM: conexão HTTP reaproveitada, limite de requisições simultâneas e novas tentativas."""
+
+    def __init__(self, max_in_flight: int = 4, timeout: float = 300.0, retries: int = 2, backoff: float = 1.0, model: ModelConfig = None):
+        self.max_in_flight = max_in_flight
+        self.model_config = model or ModelConfig()
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.requests = 0
+        self.failures = 0
+
+    @classmethod
+    def from_config(cls, config: SummaryConfig) -> "AsyncLLMSession":
+        """Monta a sessão a partir da configuração do resumo."""
+        return cls(
+            max_in_flight=config.max_concurrency,
+            timeout=config.request_timeout,
+            retries=config.retries,
+            model=config.model
+        )
+
+    async def __aenter__(self) -> "AsyncLLMSession":
+        self.models = {}
+        self.chains = {}
+        self.semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        return self
+
+    async def __aexit__(self, *exc):
+        for model in self.models.values():
+            client = getattr(model, "_async_client", None)
+            if client is not None:
+                # O cliente do Ollama fecha com close(); o httpx.AsyncClient (llama.cpp), com aclose().
+                await (client.aclose() if hasattr(client, "aclose") else client.close())
+
+    def chain(self, kind: str, model: ModelConfig = None) -> object:
+        """Cadeia do prompt com o modelo pedido; cada modelo é criado uma vez por sessão."""
+        model = model or self.model_config
+        if model not in self.models:
+            # O cliente HTTP pertence ao loop atual, por isso o modelo é criado dentro da sessão.
+            limits = httpx.Limits(max_connections=self.max_in_flight, max_keepalive_connections=self.max_in_flight)
+            self.models[model] = build_model(model, async_client_kwargs={"timeout": self.timeout, "limits": limits})
+            self.chains[model] = {
+                "summary": ChatPromptTemplate.from_template(SUMMARY_TEMPLATE) | self.models[model],
+                "partial": ChatPromptTemplate.from_template(PARTIAL_TEMPLATE) | self.models[model],
+            }
+
+        return self.chains[model][kind]
+
+    async def invoke(self, kind: str, text: str, model: ModelConfig = None) -> str:
+        """Envia um prompt respeitando o limite de requisições, com timeout e novas tentativas."""
+        chain = self.chain(kind, model)
+        attempt = 0
+
+        while True:
+            async with self.semaphore:
+                self.requests += 1
+                start = time.perf_counter()
+                try:
+                    with profiler.stage("llm", kind=kind, calls=1):
+                        result = await asyncio.wait_for(chain.ainvoke({"text": text}), timeout=self.timeout)
+                    logger.debug(f"Requisição '{kind}' concluída em {time.perf_counter() - start:.2f}s.")
+                    profiler.count("llm_calls")
+                    profiler.count("llm_prompt_tokens", estimate_tokens(text))
+                    profiler.count("llm_output_tokens", estimate_tokens(result))
+                    return result.strip()
+                except (asyncio.TimeoutError, httpx.HTTPError, ResponseError, ConnectionError) as e:
+                    self.failures += 1
+                    error = e
+
+            if attempt >= self.retries:
+                raise ValueError(f"[ERROR]: A LLM não respondeu após {attempt + 1} tentativas - {error!r}")
+
+            delay = self.backoff * (2 ** attempt)
+            attempt += 1
+            logger.warning(f"Falha na requisição '{kind}' ({error!r}), nova tentativa {attempt}/{self.retries} em {delay:.1f}s.")
+            await asyncio.sleep(delay)
+
+    async def invoke_many(self, kind: str, texts: List[str], cache: ResultCache = None, model: ModelConfig = None) -> List[str]:
+        """Envia vários prompts ao mesmo tempo, preservando a ordem; os já respondidos vêm do cache."""
+        cache = cache or ResultCache(enabled=False)
+        model = model or self.model_config
+        keys = [cache.llm_key(kind, text, model) for text in texts]
+        results = [cache.get("llm", key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+
+        if len(missing) < len(texts):
+            logger.info(f"{len(texts) - len(missing)} de {len(texts)} trechos reaproveitados do cache.")
+
+        fresh = await asyncio.gather(*(self.invoke(kind, texts[i], model) for i in missing))
+        for i, result in zip(missing, fresh):
+            results[i] = result
+            cache.put("llm", keys[i], result)
+
+        return results
+
+async def asummarize_text(session: AsyncLLMSession, text: Union[str, TextSpool], config: SummaryConfig = None, titles: Iterable[str] = (), cache: ResultCache = None) -> str:
+    """Versão assíncrona de summarize_text: os trechos e grupos são enviados de forma concorrente."""
+    config = config or SummaryConfig()
+    require_text(text)
+
+    tokens = estimate_tokens(text)
+    config = route_model(config, tokens)
+    if tokens <= config.chunk_tokens:
+        return (await session.invoke_many("summary", [as_text(text)], cache, config.model))[0]
+
+    plan = map_reduce_plan(text, config, titles, MAP_BATCH * session.max_in_flight)
+    try:
+        request = next(plan)
+        while True:
+            kind, texts = request
+            request = plan.send(await session.invoke_many(kind, texts, cache, config.model))
+    except StopIteration as stop:
+        return stop.value
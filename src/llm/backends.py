@@ -0,0 +1,150 @@
+import asyncio, hashlib, json, time
+from typing import Any, Dict, Iterator, List, Optional
+import httpx
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+from pydantic import PrivateAttr
+from .chunking import CHARS_PER_TOKEN
+from .config import ModelConfig
+
+# Tokens da resposta simulada quando num_predict não é informado.
+MOCK_TOKENS = 128
+
+class MockLLM(LLM):
+    """
+    LLM simulada, sem serviço externo: responde de forma determinística com as primeiras palavras do
+    texto do prompt, esperando a latência e a taxa de geração configuradas. Serve para medir a vazão
+    do lote, do servidor e das chamadas simultâneas.
+    """
+
+    latency: float = 0.0
+    token_rate: float = 0.0
+    num_predict: Optional[int] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "mock"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"latency": self.latency, "token_rate": self.token_rate, "num_predict": self.num_predict}
+
+    def reply(self, prompt: str) -> List[str]:
+        """Tokens da resposta: marca do prompt seguida das primeiras palavras do texto entre aspas."""
+        text = prompt[prompt.find('"') + 1:prompt.rfind('"')] if prompt.count('"') >= 2 else prompt
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+        tokens = [f"Resumo simulado {digest}:"]
+        budget = (self.num_predict or MOCK_TOKENS) * CHARS_PER_TOKEN
+        for word in text.split():
+            budget -= len(word) + 1
+            if budget < 0:
+                break
+            tokens.append(" " + word)
+
+        return tokens
+
+    def token_delay(self) -> float:
+        """Tempo de geração de um token."""
+        return 1 / self.token_rate if self.token_rate > 0 else 0.0
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> str:
+        tokens = self.reply(prompt)
+        time.sleep(self.latency + self.token_delay() * len(tokens))
+        return "".join(tokens)
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> str:
+        tokens = self.reply(prompt)
+        await asyncio.sleep(self.latency + self.token_delay() * len(tokens))
+        return "".join(tokens)
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> Iterator[GenerationChunk]:
+        time.sleep(self.latency)
+        for token in self.reply(prompt):
+            time.sleep(self.token_delay())
+            yield GenerationChunk(text=token)
+
+class LlamaCppServerLLM(LLM):
+    """Cliente do servidor do llama.cpp (llama-server), pela rota /completion."""
+
+    base_url: str = "http://127.0.0.1:8080"
+    temperature: Optional[float] = None
+    num_predict: Optional[int] = None
+    client_kwargs: Dict[str, Any] = {}
+    async_client_kwargs: Dict[str, Any] = {}
+
+    _client: httpx.Client = PrivateAttr(default=None)
+    _async_client: httpx.AsyncClient = PrivateAttr(default=None)
+
+    @property
+    def _llm_type(self) -> str:
+        return "llamacpp-server"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"base_url": self.base_url, "temperature": self.temperature, "num_predict": self.num_predict}
+
+    def payload(self, prompt: str, stop: Optional[List[str]], stream: bool = False) -> Dict:
+        """Corpo da requisição; os parâmetros não informados ficam com o padrão do servidor."""
+        body = {"prompt": prompt, "stream": stream}
+        if self.temperature is not None:
+            body["temperature"] = self.temperature
+        if self.num_predict is not None:
+            body["n_predict"] = self.num_predict
+        if stop:
+            body["stop"] = stop
+
+        return body
+
+    def client(self) -> httpx.Client:
+        """Cliente HTTP síncrono, criado no primeiro uso."""
+        if self._client is None:
+            self._client = httpx.Client(base_url=self.base_url, **{"timeout": None, **self.client_kwargs})
+        return self._client
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> str:
+        response = self.client().post("/completion", json=self.payload(prompt, stop))
+        response.raise_for_status()
+        return response.json()["content"]
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> str:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(base_url=self.base_url, **{"timeout": None, **self.async_client_kwargs})
+
+        response = await self._async_client.post("/completion", json=self.payload(prompt, stop))
+        response.raise_for_status()
+        return response.json()["content"]
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> Iterator[GenerationChunk]:
+        # O servidor envia eventos "data: {...}" com o texto novo em "content" até "stop": true.
+        with self.client().stream("POST", "/completion", json=self.payload(prompt, stop, stream=True)) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line.startswith("data: "):
+                    continue
+                data = json.loads(line[len("data: "):])
+                if data.get("content"):
+                    yield GenerationChunk(text=data["content"])
+                if data.get("stop"):
+                    break
+
+def build_ollama(config: ModelConfig, **kwargs) -> LLM:
+    """Modelo servido pelo Ollama."""
+    from langchain_ollama.llms import OllamaLLM
+
+    options = {"base_url": config.host, "temperature": config.temperature, "num_ctx": config.num_ctx, "num_predict": config.num_predict}
+    return OllamaLLM(model=config.name, **{key: value for key, value in options.items() if value is not None}, **kwargs)
+
+def build_llamacpp(config: ModelConfig, **kwargs) -> LLM:
+    """Modelo servido pelo llama-server; o contexto é definido ao iniciar o servidor (-c)."""
+    options = {"base_url": config.host, "temperature": config.temperature, "num_predict": config.num_predict}
+    return LlamaCppServerLLM(**{key: value for key, value in options.items() if value is not None}, **kwargs)
+
+def build_mock(config: ModelConfig, **kwargs) -> LLM:
+    """LLM simulada; as opções do cliente HTTP não se aplicam."""
+    return MockLLM(latency=config.mock_latency, token_rate=config.mock_rate, num_predict=config.num_predict)
+
+BUILDERS = {
+    "ollama": build_ollama,
+    "llamacpp": build_llamacpp,
+    "mock": build_mock,
+}
@@ -0,0 +1,178 @@
+import logging, re
+from typing import Dict, Iterable, Iterator, List, Union
+from src.utils.text import edge_key
+from src.utils.spool import TextSpool, iter_lines
+from src.utils.profiler import profiler
+from .chunking import CHARS_PER_TOKEN, estimate_tokens, is_heading
+from .config import SummaryConfig
+
+logger = logging.getLogger(__name__)
+
+# Linhas que só contêm o número da página ("12", "Página 3 de 10", "p. 4").
+PAGE_NUMBER_REGEX = re.compile(r"^((p(á|a)g(ina)?|page|p)\.?\s*)?\d{1,4}(\s*(de|of|/)\s*\d{1,4})?$", re.IGNORECASE)
+
+# Aceita o acento solto dos PDFs gerados pelo LaTeX ("Referˆencias").
+REFERENCES_REGEX = re.compile(r"\brefer.?(ê|e)ncias\b|\bbibliografia\b|\breferences\b", re.IGNORECASE)
+
+# Sumários ("Referências ........ 45") não abrem seções.
+TOC_REGEX = re.compile(r"\.{3,}|\s\d+$")
+
+URL_REGEX = re.compile(r"(https?://|www\.|doi\.org/|doi:\s*)\S+", re.IGNORECASE)
+
+SPACES_REGEX = re.compile(r"[ \t\u00a0]+")
+
+# Prioridade das seções quando o texto não cabe no orçamento (maior primeiro); as demais ficam com 1.
+SECTION_PRIORITIES = [
+    (re.compile(r"\bresumo\b|\babstract\b|\bintrodução\b|\bconclus(ão|ões)\b|\bconsiderações finais\b", re.IGNORECASE), 3),
+    (re.compile(r"\bresultados?\b|\bdiscussão\b", re.IGNORECASE), 2),
+]
+
+def section_heading(line: str) -> bool:
+    """Verifica se a linha (já limpa) abre uma seção por palavra-chave, fora de sumários."""
+    return is_heading(line, set()) and not TOC_REGEX.search(line)
+
+def references_heading(line: str) -> bool:
+    """Verifica se a linha (já limpa) é o título da seção de referências."""
+    return len(line.split()) <= 3 and REFERENCES_REGEX.search(line) is not None and not TOC_REGEX.search(line)
+
+def section_priority(heading: str) -> int:
+    """Prioridade da seção pelo título; o texto antes do primeiro título (título e resumo) tem a maior."""
+    if heading is None:
+        return 3
+
+    for regex, priority in SECTION_PRIORITIES:
+        if regex.search(heading):
+            return priority
+
+    return 1
+
+def clean_lines(lines: Iterable[str], boilerplate: set, total_chars: int, reference_lines: int = 0) -> Iterator[str]:
+    """
+    Remove cabeçalhos e rodapés repetidos, números de página e URLs, junta a hifenização, reduz
+    espaços e linhas em branco e corta a seção de referências (mantendo reference_lines linhas).
+    Só títulos de referências na segunda metade do texto contam, para não cortar o corpo por engano.
+    """
+    offset = 0
+    in_references = False
+    kept_references = 0
+    pending = None
+    blank = True
+
+    for line in lines:
+        offset += len(line)
+        stripped = line.strip()
+
+        if stripped and (PAGE_NUMBER_REGEX.match(stripped) or edge_key(stripped) in boilerplate):
+            continue
+
+        text = SPACES_REGEX.sub(" ", URL_REGEX.sub("", stripped)).strip()
+
+        if text and (section_heading(text) or references_heading(text)):
+            in_references = offset > total_chars / 2 and references_heading(text)
+            kept_references = 0
+            if in_references and reference_lines <= 0:
+                continue
+        elif in_references:
+            if kept_references >= reference_lines:
+                continue
+            if text:
+                kept_references += 1
+
+        if not text:
+            # Uma linha em branco separa parágrafos; as demais são descartadas.
+            if pending is not None:
+                yield pending + "\n"
+                pending = None
+            if not blank:
+                yield "\n"
+            blank = True
+            continue
+
+        blank = False
+        if pending is not None and pending.endswith("-") and pending[-2:-1].isalpha() and text[0].isalpha():
+            pending = pending[:-1] + text
+            continue
+
+        if pending is not None:
+            yield pending + "\n"
+        pending = text
+
+    if pending is not None:
+        yield pending + "\n"
+
+def allocate(sizes: List[int], priorities: List[int], budget: int) -> List[int]:
+    """Distribui o orçamento (em caracteres) entre as seções, das mais prioritárias para as demais."""
+    allowance = [0] * len(sizes)
+    remaining = budget
+
+    for level in sorted(set(priorities), reverse=True):
+        members = sorted((i for i, priority in enumerate(priorities) if priority == level), key=lambda i: sizes[i])
+        # Divisão igual entre as seções do nível; as menores que a cota cedem a sobra às maiores.
+        for position, index in enumerate(members):
+            share = remaining // (len(members) - position)
+            allowance[index] = min(sizes[index], share)
+            remaining -= allowance[index]
+
+    return allowance
+
+def iter_sections(lines: Iterable[str]) -> Iterator[tuple]:
+    """Produz (índice da seção, título, linha) para as linhas já limpas."""
+    index = 0
+    heading = None
+    for line in lines:
+        stripped = line.strip()
+        if stripped and section_heading(stripped):
+            index += 1
+            heading = stripped
+        yield index, heading, line
+
+def compress_text(text: Union[str, TextSpool], boilerplate: set = frozenset(), config: SummaryConfig = None) -> tuple:
+    """
+    Prepara o texto para a LLM: limpeza (clean_lines) e, com config.token_budget, corte das seções
+    menos prioritárias até caber no orçamento. Retorna o novo texto e o relatório de tokens.
+    """
+    config = config or SummaryConfig()
+    before = estimate_tokens(text)
+
+    cleaned = TextSpool()
+    sizes = []
+    priorities = []
+    with profiler.stage("compress_text", trace=False):
+        for index, heading, line in iter_sections(clean_lines(iter_lines(text), boilerplate, len(text), config.reference_lines)):
+            if index == len(sizes):
+                sizes.append(0)
+                priorities.append(section_priority(heading))
+            sizes[index] += len(line)
+            cleaned.write(line)
+
+        budget = config.token_budget * CHARS_PER_TOKEN
+        if budget and len(cleaned) > budget:
+            allowance = allocate(sizes, priorities, budget)
+            # Cada seção mantém o início, até a primeira linha que não cabe na sua parte do orçamento.
+            used = [0] * len(sizes)
+            result = TextSpool()
+            for index, _, line in iter_sections(cleaned):
+                if used[index] + len(line) <= allowance[index]:
+                    used[index] += len(line)
+                    result.write(line)
+                else:
+                    used[index] = allowance[index] + 1
+            cleaned = result
+
+    after = estimate_tokens(cleaned)
+    report = {"tokens_before": before, "tokens_after": after, "tokens_saved": before - after, "boilerplate": len(boilerplate)}
+    profiler.count("prompt_tokens_saved", before - after)
+    logger.info(
+        f"Texto para a LLM: {before} -> {after} tokens estimados "
+        f"({before - after} economizados, {(before - after) / max(before, 1):.0%})."
+    )
+
+    return cleaned, report
+
+def prepare_text(data: Dict, config: SummaryConfig = None) -> tuple:
+    """Aplica compress_text ao texto lido por read_document, usando os cabeçalhos e rodapés repetidos detectados."""
+    config = config or SummaryConfig()
+    if not config.compress:
+        return data["text"], None
+
+    return compress_text(data["text"], data["edges"].boilerplate(), config)
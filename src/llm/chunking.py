@@ -0,0 +1,210 @@
+import logging, time
+from typing import Callable, Generator, Iterable, Iterator, List, Tuple
+from src.utils.text import SECTION_REGEX
+from src.utils.spool import iter_lines
+
+logger = logging.getLogger(__name__)
+
+# Estimativa simples de caracteres por token para textos em português.
+CHARS_PER_TOKEN = 4
+
+# Trechos enviados por lote na etapa map, por chamada simultânea: só os resumos parciais ficam em memória.
+MAP_BATCH = 8
+
+def estimate_tokens(text: str) -> int:
+    """Estima o número de tokens de um texto (str ou TextSpool)."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def require_text(text: str):
+    """Interrompe o resumo de documentos sem texto, como os digitalizados lidos sem OCR."""
+    if not any(line.strip() for line in iter_lines(text)):
+        raise ValueError("[ERROR]: O documento não tem texto para resumir. Se as páginas forem digitalizadas, use --ocr.")
+
+def is_heading(line: str, headings: set) -> bool:
+    """Verifica se a linha abre uma nova seção do documento."""
+    if line in headings:
+        return True
+
+    return len(line.split()) <= 3 and SECTION_REGEX.search(line) is not None
+
+def window_step(text: str, start: int, max_chars: int, overlap_chars: int):
+    """Calcula uma janela de split_window: retorna o fim dela e o início da próxima (None na última)."""
+    end = min(start + max_chars, len(text))
+    if end < len(text):
+        cut = text.rfind(" ", start + max_chars // 2, end)
+        cut = max(cut, text.rfind("\n", start + max_chars // 2, end))
+        if cut > start:
+            end = cut
+
+    if end >= len(text):
+        return end, None
+
+    next_start = max(end - overlap_chars, start + 1)
+    space = text.find(" ", next_start, end)
+    if space != -1:
+        next_start = space + 1
+
+    return end, next_start
+
+def split_window(text: str, max_chars: int, overlap_chars: int) -> List[str]:
+    """Quebra um trecho grande em janelas com sobreposição, cortando em espaços."""
+    if len(text) <= max_chars:
+        return [text]
+
+    overlap_chars = min(overlap_chars, max_chars // 2)
+    windows = []
+    start = 0
+
+    while start is not None:
+        end, next_start = window_step(text, start, max_chars, overlap_chars)
+        windows.append(text[start:end])
+        start = next_start
+
+    return windows
+
+class SectionWindows:
+    """
+    Versão incremental de split_window para uma seção recebida linha a linha: as janelas que já não
+    dependem do restante saem logo, e só o final da seção fica em memória.
+    """
+
+    def __init__(self, max_chars: int, overlap_chars: int):
+        self.max_chars = max_chars
+        self.overlap_chars = min(overlap_chars, max_chars // 2)
+        self.parts = []
+        self.size = 0
+        self.split = False
+
+    def add(self, line: str) -> List[str]:
+        """Acrescenta uma linha à seção e retorna as janelas que já estão definidas."""
+        self.parts.append(line)
+        self.size += len(line)
+
+        # Uma janela só depende dos max_chars caracteres seguintes: junta as linhas de tempos em tempos.
+        if self.size <= 2 * self.max_chars:
+            return []
+
+        text = "".join(self.parts)
+        windows = []
+        start = 0
+        while len(text) - start > self.max_chars:
+            end, next_start = window_step(text, start, self.max_chars, self.overlap_chars)
+            windows.append(text[start:end])
+            start = next_start
+
+        self.split = True
+        self.parts = [text[start:]]
+        self.size = len(self.parts[0])
+
+        return windows
+
+    def finish(self) -> List[str]:
+        """Retorna as janelas restantes da seção."""
+        text = "".join(self.parts)
+        self.parts = []
+        self.size = 0
+
+        if not self.split:
+            return split_window(text, self.max_chars, self.overlap_chars) if text else []
+
+        self.split = False
+        windows = []
+        start = 0
+        while start is not None:
+            end, next_start = window_step(text, start, self.max_chars, self.overlap_chars)
+            windows.append(text[start:end])
+            start = next_start
+
+        return windows
+
+def iter_pieces(lines: Iterable[str], max_chars: int, overlap_chars: int, titles: Iterable[str] = ()) -> Iterator[str]:
+    """Divide as linhas nas fronteiras de seção (palavras-chave e títulos detectados) e quebra as seções grandes em janelas."""
+    headings = {part.strip() for title in titles if title for part in title.split(";") if part.strip()}
+    section = SectionWindows(max_chars, overlap_chars)
+    empty = True
+
+    for line in lines:
+        stripped = line.strip()
+        if not empty and stripped and is_heading(stripped, headings):
+            yield from section.finish()
+        empty = False
+        yield from section.add(line)
+
+    yield from section.finish()
+
+def iter_chunks(lines: Iterable[str], max_tokens: int, overlap_tokens: int = 0, titles: Iterable[str] = ()) -> Iterator[str]:
+    """Agrupa as seções em trechos que cabem no orçamento de tokens, à medida que as linhas chegam."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    overlap_chars = overlap_tokens * CHARS_PER_TOKEN
+    current = ""
+    count = 0
+
+    for piece in iter_pieces(lines, max_chars, overlap_chars, titles):
+        if current and len(current) + len(piece) > max_chars:
+            count += 1
+            yield current
+            current = ""
+        current += piece
+
+    if current.strip():
+        count += 1
+        yield current
+
+    logger.debug(f"Texto dividido em {count} trechos de até {max_tokens} tokens.")
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    """Agrupa os itens em listas de até size elementos."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+# Pedido de um plano de resumo: tipo do prompt ("partial" ou "summary") e os textos enviados juntos.
+Request = Tuple[str, List[str]]
+
+def map_reduce_plan(text, config, titles: Iterable[str] = (), batch_size: int = MAP_BATCH, final: bool = True) -> Generator[Request, List[str], str]:
+    """
+    Etapas map-reduce de um texto maior que o contexto do modelo, sem chamar a LLM: produz os pedidos
+    (tipo, textos), recebe as respostas por send e retorna o resumo (ou, sem final, o texto da etapa
+    final). Os trechos são gerados à medida que o texto é lido e enviados em lotes de batch_size;
+    run_plan e o cliente assíncrono executam o mesmo plano.
+    """
+    start = time.perf_counter()
+    partials = []
+    chunks = iter_chunks(iter_lines(text), config.chunk_tokens, config.chunk_overlap, titles)
+    for batch in batched(chunks, batch_size):
+        partials += yield ("partial", batch)
+    logger.info(f"Etapa map: {len(partials)} trechos resumidos em {time.perf_counter() - start:.2f}s.")
+
+    level = 1
+    fan_out = max(2, config.fan_out)
+    while len(partials) > fan_out:
+        start = time.perf_counter()
+        groups = ["\n\n".join(partials[i:i + fan_out]) for i in range(0, len(partials), fan_out)]
+        partials = yield ("partial", groups)
+        logger.info(f"Etapa reduce {level}: {len(groups)} grupos combinados em {time.perf_counter() - start:.2f}s.")
+        level += 1
+
+    final_text = "\n\n".join(partials)
+    if not final:
+        return final_text
+
+    start = time.perf_counter()
+    summa = (yield ("summary", [final_text]))[0]
+    logger.info(f"Etapa final: resumo gerado em {time.perf_counter() - start:.2f}s.")
+
+    return summa
+
+def run_plan(plan: Generator[Request, List[str], str], call: Callable[[str, List[str]], List[str]]):
+    """Executa o plano de forma síncrona: cada pedido vai para call(tipo, textos)."""
+    try:
+        request = next(plan)
+        while True:
+            request = plan.send(call(*request))
+    except StopIteration as stop:
+        return stop.value
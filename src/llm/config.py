@@ -0,0 +1,111 @@
+from dataclasses import dataclass, field, replace
+from .prompts import MODEL_NAME
+
+# Backends aceitos: Ollama, servidor do llama.cpp e a LLM simulada, sem serviço externo.
+BACKENDS = ("ollama", "llamacpp", "mock")
+
+@dataclass(frozen=True)
+class ModelConfig:
+    """Modelo usado no resumo: backend, nome, endereço e parâmetros de geração."""
+    # Backend da LLM: "ollama", "llamacpp" ou "mock".
+    backend: str = "ollama"
+    # Nome do modelo no backend.
+    name: str = MODEL_NAME
+    # Endereço do servidor; None usa o padrão do backend.
+    host: str = None
+    # Temperatura de amostragem; None usa a do modelo.
+    temperature: float = None
+    # Tamanho do contexto, em tokens (num_ctx do Ollama); None usa o do modelo.
+    num_ctx: int = None
+    # Tokens gerados no máximo por resposta (num_predict); None usa o padrão do backend.
+    num_predict: int = None
+    # Modelo menor para documentos curtos; None usa sempre o principal.
+    small_model: str = None
+    # Documentos com até esta estimativa de tokens vão para o small_model.
+    small_model_tokens: int = 4000
+    # Espera, em segundos, de cada chamada à LLM simulada.
+    mock_latency: float = 0.0
+    # Tokens por segundo gerados pela LLM simulada; 0 responde sem esperar.
+    mock_rate: float = 0.0
+
+    def identity(self) -> tuple:
+        """Campos que mudam as respostas do modelo (entram nas chaves do cache)."""
+        return (self.backend, self.name, self.temperature, self.num_ctx, self.num_predict, self.small_model, self.small_model_tokens if self.small_model else None)
+
+    def route(self, tokens: int) -> "ModelConfig":
+        """Modelo para um documento com a estimativa de tokens informada."""
+        if self.small_model is None:
+            return self
+
+        name = self.small_model if tokens <= self.small_model_tokens else self.name
+        return replace(self, name=name, small_model=None)
+
+    @classmethod
+    def from_args(cls, args, **overrides) -> "ModelConfig":
+        """Monta a configuração a partir dos argumentos da CLI."""
+        values = {
+            "backend": getattr(args, "llm_backend", cls.backend),
+            "name": getattr(args, "llm_model", None) or cls.name,
+            "host": getattr(args, "llm_host", cls.host),
+            "temperature": getattr(args, "llm_temperature", cls.temperature),
+            "num_ctx": getattr(args, "llm_num_ctx", cls.num_ctx),
+            "num_predict": getattr(args, "llm_num_predict", cls.num_predict),
+            "small_model": getattr(args, "small_model", cls.small_model),
+            "small_model_tokens": getattr(args, "small_model_tokens", cls.small_model_tokens),
+            "mock_latency": getattr(args, "mock_latency", cls.mock_latency),
+            "mock_rate": getattr(args, "mock_rate", cls.mock_rate),
+        }
+        values.update(overrides)
+
+        return cls(**values)
+
+@dataclass
+class SummaryConfig:
+    """Parâmetros do resumo em trechos (map-reduce)."""
+    # Orçamento de tokens por trecho enviado à LLM.
+    chunk_tokens: int = 1500
+    # Tokens repetidos entre trechos quando uma seção precisa ser quebrada.
+    chunk_overlap: int = 150
+    # Quantos resumos parciais são combinados em cada etapa de redução.
+    fan_out: int = 4
+    # Chamadas simultâneas à LLM durante as etapas map e reduce.
+    max_concurrency: int = 1
+    # Usa o cliente assíncrono (asyncio) em vez de threads para as chamadas à LLM.
+    use_async: bool = False
+    # Tempo máximo, em segundos, de cada requisição no cliente assíncrono.
+    request_timeout: float = 300.0
+    # Novas tentativas, com espera exponencial, após falhas no cliente assíncrono.
+    retries: int = 2
+    # Limpa o texto antes da LLM (cabeçalhos e rodapés repetidos, números de página, URLs, referências).
+    compress: bool = True
+    # Orçamento de tokens do texto enviado à LLM, cortando as seções menos prioritárias; 0 não limita.
+    token_budget: int = 0
+    # Linhas mantidas da seção de referências; 0 remove a seção.
+    reference_lines: int = 0
+    # Backend e modelo da LLM.
+    model: ModelConfig = field(default_factory=ModelConfig)
+
+    def for_tokens(self, tokens: int) -> "SummaryConfig":
+        """Configuração com o modelo escolhido para um documento com a estimativa de tokens informada."""
+        model = self.model.route(tokens)
+        return self if model is self.model else replace(self, model=model)
+
+    @classmethod
+    def from_args(cls, args, **overrides) -> "SummaryConfig":
+        """Monta a configuração a partir dos argumentos da CLI."""
+        values = {
+            "chunk_tokens": getattr(args, "chunk_tokens", cls.chunk_tokens),
+            "chunk_overlap": getattr(args, "chunk_overlap", cls.chunk_overlap),
+            "fan_out": getattr(args, "fan_out", cls.fan_out),
+            "max_concurrency": getattr(args, "llm_jobs", cls.max_concurrency),
+            "use_async": getattr(args, "async_llm", cls.use_async),
+            "request_timeout": getattr(args, "llm_timeout", cls.request_timeout),
+            "retries": getattr(args, "llm_retries", cls.retries),
+            "compress": not getattr(args, "no_compress", not cls.compress),
+            "token_budget": getattr(args, "token_budget", cls.token_budget),
+            "reference_lines": getattr(args, "reference_lines", cls.reference_lines),
+            "model": ModelConfig.from_args(args),
+        }
+        values.update(overrides)
+
+        return cls(**values)
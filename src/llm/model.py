@@ -1,35 +1,53 @@
-from langchain_ollama.llms import OllamaLLM
+import logging
+from langchain_core.language_models.llms import LLM
 from langchain_core.prompts import ChatPromptTemplate
+from functools import lru_cache
 from typing import Dict
+from .prompts import SUMMARY_TEMPLATE, PARTIAL_TEMPLATE
+from .config import ModelConfig, SummaryConfig, BACKENDS
+from .backends import BUILDERS
 
-model = OllamaLLM(model="hf.co/tensorblock/SummLlama3.2-3B-GGUF:Q5_K_M")
+logger = logging.getLogger(__name__)
 
-def make_prompt() -> Dict:
-    """Define o prompt que será usado e cria a cadeia."""
-    try:
-        template = """
-            Sua tarefa é resumir textos, formatar tudo em Markdown e identificar palavras-chave.
+def build_model(config: ModelConfig = None, **kwargs) -> LLM:
+    """Cria o cliente do modelo no backend configurado (Ollama, llama.cpp ou simulado)."""
+    config = config or ModelConfig()
+    if config.backend not in BUILDERS:
+        raise ValueError(f"[ERROR]: Backend da LLM desconhecido: {config.backend} (opções: {', '.join(BACKENDS)})")
 
-            ## REGRAS
-            - Responda sempre em Português-BR
-            - Baseie-se exclusivamente no texto fornecido.
-            - Mantenha a organização do documento em Markdown.
-            - Não invente informações que não existam no texto original.
+    return BUILDERS[config.backend](config, **kwargs)
 
-            ## INSTRUÇÕES DE SAÍDA
-            Você deve produzir um único documento em Markdown contendo:
-            - ## **[Título do texto]** (retirado do texto; caso não exista, gerar um título a partir do conteúdo)
-            - ## **Resumo** (claro, objetivo e fiel ao conteúdo)
-            - ## **Palavras-chave** (lista de 3 a 8 palavras relevantes)
+@lru_cache(maxsize=None)
+def get_model(config: ModelConfig = None) -> LLM:
+    """Retorna o modelo compartilhado de cada configuração, criado apenas no primeiro uso."""
+    return build_model(config)
 
-            ## TEXTO PARA RESUMO
-            "{text}"
+@lru_cache(maxsize=None)
+def make_prompt(config: ModelConfig = None) -> Dict:
+    """Define o prompt que será usado e cria a cadeia."""
+    try:
+        prompt = ChatPromptTemplate.from_template(SUMMARY_TEMPLATE)
+        chain = prompt | get_model(config)
 
-        """
+        return chain
+    except Exception as e:
+        raise ValueError(f"[ERROR]: Ocorreu um erro na montagem do prompt - {e}")
 
-        prompt = ChatPromptTemplate.from_template(template)
-        chain = prompt | model
+@lru_cache(maxsize=None)
+def make_partial_prompt(config: ModelConfig = None) -> Dict:
+    """Define o prompt dos resumos parciais (trechos e etapas de redução) e cria a cadeia."""
+    try:
+        prompt = ChatPromptTemplate.from_template(PARTIAL_TEMPLATE)
+        chain = prompt | get_model(config)
 
         return chain
     except Exception as e:
-        raise ValueError(f"[ERROR]: Ocorreu um erro na montagem do prompt - {e}")
\ No newline at end of file
+        raise ValueError(f"[ERROR]: Ocorreu um erro na montagem do prompt - {e}")
+
+def route_model(config: SummaryConfig, tokens: int) -> SummaryConfig:
+    """Escolhe o modelo do documento pelo tamanho do texto (small_model para os curtos)."""
+    routed = config.for_tokens(tokens)
+    if routed is not config:
+        logger.info(f"Modelo escolhido para {tokens} tokens estimados: {routed.model.name}")
+
+    return routed
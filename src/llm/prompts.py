@@ -0,0 +1,42 @@
+import hashlib
+
+MODEL_NAME = "hf.co/tensorblock/SummLlama3.2-3B-GGUF:Q5_K_M"
+
+SUMMARY_TEMPLATE = """
+            Sua tarefa é resumir textos, formatar tudo em Markdown e identificar palavras-chave.
+
+            ## REGRAS
+            - Responda sempre em Português-BR
+            - Baseie-se exclusivamente no texto fornecido.
+            - Mantenha a organização do documento em Markdown.
+            - Não invente informações que não existam no texto original.
+
+            ## INSTRUÇÕES DE SAÍDA
+            Você deve produzir um único documento em Markdown contendo:
+            - ## **[Título do texto]** (retirado do texto; caso não exista, gerar um título a partir do conteúdo)
+            - ## **Resumo** (claro, objetivo e fiel ao conteúdo)
+            - ## **Palavras-chave** (lista de 3 a 8 palavras relevantes)
+
+            ## TEXTO PARA RESUMO
+            "{text}"
+
+        """
+
+PARTIAL_TEMPLATE = """
+            Sua tarefa é resumir um trecho de um documento maior.
+
+            ## REGRAS
+            - Responda sempre em Português-BR
+            - Baseie-se exclusivamente no texto fornecido.
+            - Preserve os fatos, números, nomes e conclusões importantes.
+            - Não invente informações que não existam no texto original.
+            - Não adicione título nem palavras-chave, escreva apenas o resumo em texto corrido.
+
+            ## TRECHO PARA RESUMO
+            "{text}"
+
+        """
+
+def prompt_hash() -> str:
+    """Identifica a versão dos prompts usados no resumo."""
+    return hashlib.sha256((SUMMARY_TEMPLATE + PARTIAL_TEMPLATE).encode("utf-8")).hexdigest()
@@ -1,36 +1,134 @@
-import logging
-from .model import make_prompt
-from src.utils.files import open_pdf, get_text
-from rich.panel import Panel
-from rich.markdown import Markdown
-from rich.console import Console
-from rich import box
-
-console = Console()
+import logging, time
+from typing import Iterable, Iterator, List, Union
+from .model import make_prompt, make_partial_prompt, route_model
+from .config import SummaryConfig
+from .chunking import estimate_tokens, require_text, map_reduce_plan, run_plan, MAP_BATCH
+from src.utils.console import get_console, make_panel
+from src.utils.cache import ResultCache
+from src.utils.profiler import profiler
+from src.utils.spool import TextSpool, as_text
+from rich.live import Live
+
 logger = logging.getLogger(__name__)
 
 def summarize(pdf_path: str) -> str:
     """Produz e retorna o resumo feito pela LLM."""
+    from src.session import DocumentSession
+
     logger.debug(f"Resumindo o PDF: {pdf_path}")
-    doc = open_pdf(pdf_path)
-    text = get_text(doc)
-
-    chain = make_prompt()
-    summa = chain.invoke({"text": text})
-    summa = summa.strip()
-    
-    return summa
-
-def print_summary(summary: str):
-    """Imprime o resumo no console."""
-    logger.debug("Imprimindo o resumo gerado pela LLM.")
-    
-    md = Markdown(summary)
-    console.print(Panel(
-        md,
-        title="[bold yellow]Resumo do PDF[/]",
-        subtitle="[bold yellow]Fim do Resumo[/]",
-        box = box.ROUNDED,
-        border_style="green",
-        padding=(1, 2)
-    ))
\ No newline at end of file
+    with DocumentSession(pdf_path) as session:
+        return session.summary()
+
+def summarize_text(text: Union[str, TextSpool], config: SummaryConfig = None, titles: Iterable[str] = (), cache: ResultCache = None) -> str:
+    """Produz o resumo a partir do texto já extraído do documento."""
+    config = config or SummaryConfig()
+    require_text(text)
+
+    tokens = estimate_tokens(text)
+    config = route_model(config, tokens)
+    if tokens <= config.chunk_tokens:
+        return run_partials(make_prompt(config.model), [as_text(text)], config, cache, "summary")[0]
+
+    return summarize_chunks(text, config, titles, cache)
+
+def summarize_chunks(text: Union[str, TextSpool], config: SummaryConfig, titles: Iterable[str] = (), cache: ResultCache = None) -> str:
+    """Resume textos maiores que o contexto do modelo em etapas map-reduce."""
+    return run_plan(map_reduce_plan(text, config, titles, MAP_BATCH * max(1, config.max_concurrency)), partial_caller(config, cache))
+
+def reduce_chunks(text: Union[str, TextSpool], config: SummaryConfig, titles: Iterable[str] = (), cache: ResultCache = None) -> str:
+    """Executa as etapas map e reduce e retorna o texto da etapa final."""
+    return run_plan(map_reduce_plan(text, config, titles, MAP_BATCH * max(1, config.max_concurrency), final=False), partial_caller(config, cache))
+
+def partial_caller(config: SummaryConfig, cache: ResultCache = None):
+    """Executa os pedidos do plano map-reduce pelas cadeias do modelo configurado."""
+    chains = {"partial": make_partial_prompt(config.model), "summary": make_prompt(config.model)}
+
+    return lambda kind, texts: run_partials(chains[kind], texts, config, cache, kind)
+
+def stream_summary(text: Union[str, TextSpool], config: SummaryConfig = None, titles: Iterable[str] = (), cache: ResultCache = None) -> Iterator[str]:
+    """Produz o resumo token a token; em textos longos, só a etapa final é transmitida."""
+    config = config or SummaryConfig()
+    require_text(text)
+
+    tokens = estimate_tokens(text)
+    config = route_model(config, tokens)
+    if tokens > config.chunk_tokens:
+        text = reduce_chunks(text, config, titles, cache)
+    else:
+        text = as_text(text)
+
+    chain = make_prompt(config.model)
+    profiler.count("llm_calls")
+    profiler.count("llm_prompt_tokens", estimate_tokens(text))
+    started = False
+    for token in chain.stream({"text": text}):
+        if not started:
+            token = token.lstrip()
+            if not token:
+                continue
+            started = True
+        yield token
+
+def measure_stream(tokens: Iterable[str]) -> Iterator[str]:
+    """Repassa os tokens registrando o tempo até o primeiro token e a taxa de geração."""
+    start = time.perf_counter()
+    first = None
+    count = 0
+
+    for token in tokens:
+        if first is None:
+            first = time.perf_counter()
+            logger.info(f"Primeiro token recebido em {first - start:.2f}s.")
+        count += 1
+        yield token
+
+    profiler.count("llm_output_tokens", count)
+    if first is not None:
+        if profiler.enabled:
+            profiler.add_stage("llm", time.perf_counter() - start, fields={"kind": "stream"})
+        elapsed = time.perf_counter() - first
+        rate = count / elapsed if elapsed > 0 else float(count)
+        logger.info(f"Resumo transmitido: {count} tokens em {time.perf_counter() - start:.2f}s ({rate:.1f} tokens/s).")
+
+def run_partials(chain, texts: List[str], config: SummaryConfig, cache: ResultCache = None, kind: str = "partial") -> List[str]:
+    """Resume os trechos de forma concorrente, preservando a ordem; trechos já resumidos vêm do cache."""
+    cache = cache or ResultCache(enabled=False)
+    keys = [cache.llm_key(kind, text, config.model) for text in texts]
+    results = [cache.get("llm", key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    if len(missing) < len(texts):
+        logger.info(f"{len(texts) - len(missing)} de {len(texts)} trechos reaproveitados do cache.")
+
+    if missing:
+        with profiler.stage("llm", kind=kind, calls=len(missing)):
+            fresh = chain.batch(
+                [{"text": texts[i]} for i in missing],
+                config={"max_concurrency": config.max_concurrency}
+            )
+        profiler.count("llm_calls", len(missing))
+        profiler.count("llm_prompt_tokens", sum(estimate_tokens(texts[i]) for i in missing))
+        profiler.count("llm_output_tokens", sum(estimate_tokens(result) for result in fresh))
+        for i, result in zip(missing, fresh):
+            results[i] = result.strip()
+            cache.put("llm", keys[i], results[i])
+
+    return results
+
+def print_summary_stream(tokens: Iterable[str]) -> str:
+    """Imprime o resumo no console à medida que os tokens chegam e retorna o texto completo."""
+    logger.debug("Imprimindo o resumo transmitido pela LLM.")
+    parts = []
+    last_update = 0.0
+
+    with Live(make_panel("*Gerando resumo...*"), console=get_console(), refresh_per_second=8) as live:
+        for token in measure_stream(tokens):
+            parts.append(token)
+            # Reconstruir o Markdown a cada token é caro: atualiza o painel no ritmo do Live.
+            if time.perf_counter() - last_update > 0.125:
+                live.update(make_panel("".join(parts)))
+                last_update = time.perf_counter()
+
+        live.update(make_panel("".join(parts)))
+
+    return "".join(parts).strip()
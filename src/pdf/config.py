@@ -0,0 +1,51 @@
+from dataclasses import dataclass
+
+@dataclass
+class ImageConfig:
+    """Parâmetros da extração de imagens."""
+    # Codificador das imagens: "png" ou "original" (mantém os bytes de JPEG/JPX, demais viram PNG).
+    encoder: str = "png"
+    # Nível de compressão do PNG (0 a 9); None usa o codificador padrão do PyMuPDF.
+    png_level: int = None
+    # Como identificar imagens repetidas: "xref" (mesmo objeto no PDF) ou "content" (mesmos bytes).
+    dedup: str = "xref"
+    # Processos para decodificar e codificar as imagens.
+    workers: int = 1
+
+    @classmethod
+    def from_args(cls, args, **overrides) -> "ImageConfig":
+        """Monta a configuração a partir dos argumentos da CLI."""
+        values = {
+            "encoder": getattr(args, "image_format", cls.encoder),
+            "png_level": getattr(args, "png_level", cls.png_level),
+            "dedup": getattr(args, "image_dedup", cls.dedup),
+            "workers": getattr(args, "workers", cls.workers),
+        }
+        values.update(overrides)
+
+        return cls(**values)
+
+@dataclass
+class OcrConfig:
+    """Parâmetros do OCR das páginas sem camada de texto."""
+    # Passa pelo OCR as páginas digitalizadas (sem texto e com imagens).
+    enabled: bool = False
+    # Resolução, em DPI, da imagem da página enviada ao Tesseract.
+    dpi: int = 300
+    # Idiomas do Tesseract, separados por "+".
+    language: str = "por+eng"
+    # Processos que executam o OCR enquanto as demais páginas são lidas.
+    workers: int = 1
+
+    @classmethod
+    def from_args(cls, args, **overrides) -> "OcrConfig":
+        """Monta a configuração a partir dos argumentos da CLI."""
+        values = {
+            "enabled": getattr(args, "ocr", cls.enabled),
+            "dpi": getattr(args, "ocr_dpi", cls.dpi),
+            "language": getattr(args, "ocr_language", cls.language),
+            "workers": getattr(args, "workers", cls.workers),
+        }
+        values.update(overrides)
+
+        return cls(**values)
@@ -1,30 +1,258 @@
-from src.utils.files import open_pdf, pixmap
-import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Tuple
+import fitz, hashlib, json, logging, os, re, struct, zlib
+from src.utils.validator import abs_path
+from src.pdf.walker import split_pages
+from src.pdf.config import ImageConfig
+from src.utils.profiler import profiler, submit_profiled, collect_profiled
 
 logger = logging.getLogger(__name__)
 
-def extract_image(pdf: str, name_image: str, dir_name: str):
+IMAGES_DIR = "output/imagens"
+
+# Chaves do dicionário da imagem que, junto com o stream, determinam a imagem decodificada.
+IMAGE_KEYS = ("Width", "Height", "BitsPerComponent", "ColorSpace", "Filter", "DecodeParms", "Decode", "ImageMask")
+
+# Filtros cujo stream original já é um arquivo de imagem válido, com a extensão correspondente.
+ORIGINAL_FORMATS = {"/DCTDecode": "jpeg", "/JPXDecode": "jpx"}
+
+# Tipo de cor do PNG pelo número de canais da pixmap.
+PNG_COLOR_TYPES = {1: 0, 2: 4, 3: 2, 4: 6}
+
+def extract_image(pdf: str, name_image: str, dir_name: str, config: ImageConfig = None):
     """Extrair e guarda imagens do pdf."""
+    from src.session import DocumentSession, ImageSink
+
     logger.debug(f"Extraindo imagens do PDF: {pdf}")
-    pdf_extraido = open_pdf(pdf)
+    with DocumentSession(pdf, name=dir_name, image_config=config) as session:
+        session.emit(ImageSink(name_image=name_image))
+
+REFERENCE_REGEX = re.compile(r"(\d+) 0 R")
 
-    path = None
+def object_hash(doc: fitz.Document, xref: int, depth: int = 0) -> str:
+    """Hash do conteúdo de um objeto do PDF, trocando as referências indiretas pelo hash dos objetos referenciados."""
+    source = doc.xref_object(xref, compressed=True)
+    if depth < 4:
+        source = REFERENCE_REGEX.sub(lambda m: object_hash(doc, int(m.group(1)), depth + 1), source)
 
-    for page_index in range(len(pdf_extraido)):
-        page = pdf_extraido[page_index]
-        image_list = page.get_images()
+    digest = hashlib.sha256(source.encode("utf-8"))
+    if doc.xref_is_stream(xref):
+        digest.update(doc.xref_stream_raw(xref) or b"")
 
+    return digest.hexdigest()
+
+def image_key(doc: fitz.Document, xref: int, dedup: str) -> str:
+    """Identifica a imagem pelo xref ou, no modo "content", pelos bytes do stream e parâmetros de decodificação."""
+    if dedup != "content":
+        return str(xref)
+
+    digest = hashlib.sha256(doc.xref_stream_raw(xref) or b"")
+    for key in IMAGE_KEYS:
+        kind, value = doc.xref_get_key(xref, key)
+        # Valores indiretos (espaços de cor ICC, indexados) entram pelo conteúdo do objeto referenciado.
+        if kind == "xref":
+            value = object_hash(doc, int(value.split()[0]))
+        digest.update(f"{key}={value};".encode("utf-8"))
+
+    return digest.hexdigest()
+
+def collect_images(doc: fitz.Document, images: list, name_image: str, dedup: str = "xref") -> Tuple[List, List]:
+    """
+    Agrupa as ocorrências das imagens por página em imagens únicas. Cada imagem única recebe o
+    nome da primeira ocorrência; retorna as imagens únicas e, por página, os índices delas.
+    """
+    unique = []
+    keys = {}
+    xref_keys = {}
+    pages = []
+
+    for page_index, image_list in enumerate(images):
         if image_list:
             logger.debug(f"Quantidades de imagens encontradas {len(image_list)} na página {page_index}")
         else:
             logger.debug(f"Sem imagem na página: {page_index}")
 
+        page = []
         for image_index, img in enumerate(image_list, start=1):
-            xref = img[0] 
-            path = pixmap(pdf_extraido, xref, name_image, image_index, page_index, dir_name)
+            xref = img[0]
+            if xref not in xref_keys:
+                xref_keys[xref] = image_key(doc, xref, dedup)
+            key = xref_keys[xref]
+            if key not in keys:
+                keys[key] = len(unique)
+                unique.append({"xref": xref, "name": f"{name_image}_pg{page_index}_img{image_index}", "pages": []})
+            position = keys[key]
+            unique[position]["pages"].append(page_index)
+            page.append(position)
+        pages.append(page)
+
+    return unique, pages
 
-    if path:
-        logger.info(f"Imagens extraidas e salvas em: {path}")
+def encode_png(pix: fitz.Pixmap, level: int) -> bytes:
+    """Codifica a pixmap como PNG com o nível de compressão do zlib escolhido."""
+    color_type = PNG_COLOR_TYPES[pix.n]
+    samples = pix.samples
+    stride = pix.stride
+    # Filtro 0 (nenhum) em todas as linhas.
+    raw = b"".join(b"\0" + samples[y * stride:(y + 1) * stride] for y in range(pix.height))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", pix.width, pix.height, 8, color_type, 0, 0, 0)
+
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, level)) + chunk(b"IEND", b"")
+
+def save_png(doc: fitz.Document, xref: int, base_path: str, png_level: int = None) -> str:
+    """Cria o Pixmap, converte para RGB e salva como PNG."""
+    pix = fitz.Pixmap(doc, xref)
+
+    if pix.n - pix.alpha > 3:
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+
+    file_path = f"{base_path}.png"
+    if png_level is None:
+        pix.save(file_path)
     else:
+        with open(file_path, "wb") as f:
+            f.write(encode_png(pix, png_level))
+
+    return file_path
+
+def save_original(doc: fitz.Document, xref: int, base_path: str, png_level: int = None) -> str:
+    """Grava os bytes originais de imagens JPEG/JPX sem decodificar; as demais viram PNG."""
+    _, image_filter = doc.xref_get_key(xref, "Filter")
+    if image_filter not in ORIGINAL_FORMATS:
+        return save_png(doc, xref, base_path, png_level)
+
+    file_path = f"{base_path}.{ORIGINAL_FORMATS[image_filter]}"
+    with open(file_path, "wb") as f:
+        f.write(doc.xref_stream_raw(xref))
+
+    return file_path
+
+ENCODERS = {
+    "png": save_png,
+    "original": save_original,
+}
+
+def save_one(doc: fitz.Document, xref: int, base_path: str, config: ImageConfig) -> str:
+    """Salva uma imagem com o codificador configurado; retorna o nome do arquivo ou None em caso de falha."""
+    logger.debug(f"Salvando imagem xref {xref}.")
+    try:
+        with profiler.stage("save_image", trace=False):
+            file_path = ENCODERS[config.encoder](doc, xref, base_path, config.png_level)
+        logger.debug(f"Imagem salva: {file_path}")
+        return os.path.basename(file_path)
+    except Exception as e:
+        logger.error(f"Falha ao salvar imagem xref {xref}: {e}")
+        return None
+
+def save_range(pdf_path: str, jobs: List[Tuple[int, str]], config: ImageConfig) -> List[str]:
+    """Abre o próprio documento no processo trabalhador e salva um grupo de imagens."""
+    doc = fitz.open(pdf_path)
+    try:
+        return [save_one(doc, xref, base_path, config) for xref, base_path in jobs]
+    finally:
+        doc.close()
+
+def save_all(doc: fitz.Document, jobs: List[Tuple[int, str]], config: ImageConfig) -> List[str]:
+    """Salva as imagens únicas em série ou em um pool de processos, preservando a ordem."""
+    if config.workers <= 1 or len(jobs) < 2 or not doc.name:
+        return [save_one(doc, xref, base_path, config) for xref, base_path in jobs]
+
+    ranges = split_pages(len(jobs), config.workers)
+    logger.debug(f"Dividindo {len(jobs)} imagens em {len(ranges)} grupos para {config.workers} processos.")
+
+    with ProcessPoolExecutor(max_workers=min(config.workers, len(ranges))) as executor:
+        futures = [submit_profiled(executor, save_range, doc.name, jobs[r.start:r.stop], config) for r in ranges]
+        return [name for future in futures for name in collect_profiled(future, future.result())]
+
+def write_manifest(output_dir: str, doc: fitz.Document, unique: List[Dict], pages: List[List[int]], files: List[str], config: ImageConfig) -> str:
+    """Grava o manifesto que liga cada página aos arquivos das suas imagens."""
+    manifest = {
+        "pdf": os.path.basename(doc.name) if doc.name else None,
+        "encoder": config.encoder,
+        "png_level": config.png_level,
+        "dedup": config.dedup,
+        "images": [
+            {"file": file, "xref": image["xref"], "pages": sorted(set(image["pages"]))}
+            for image, file in zip(unique, files) if file
+        ],
+        "pages": [
+            {"page": page_index, "images": [files[position] for position in page if files[position]]}
+            for page_index, page in enumerate(pages) if page
+        ],
+    }
+
+    path = os.path.join(output_dir, "manifest.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+    return path
+
+def previous_files(output_dir: str, config: ImageConfig) -> Dict[str, Dict]:
+    """Imagens gravadas pela execução anterior com a mesma configuração, pelo nome do arquivo sem extensão."""
+    path = os.path.join(output_dir, "manifest.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if (manifest.get("encoder"), manifest.get("png_level"), manifest.get("dedup")) != (config.encoder, config.png_level, config.dedup):
+        return {}
+
+    return {os.path.splitext(image["file"])[0]: image for image in manifest.get("images", [])}
+
+def save_images(pdf_extraido, images: list, name_image: str, dir_name: str, config: ImageConfig = None, reused_pages: Iterable[int] = (), directory: str = IMAGES_DIR) -> List[Dict]:
+    """
+    Guarda as imagens já listadas por página, decodificando cada imagem repetida uma única vez.
+    Imagens que aparecem primeiro em páginas inalteradas (reused_pages) e já foram gravadas não são refeitas.
+    Retorna as imagens gravadas (arquivo, xref e páginas, a partir de 1), como no manifesto.
+    """
+    config = config or ImageConfig()
+
+    if config.encoder not in ENCODERS:
+        raise ValueError(f"[ERROR]: Codificador de imagens desconhecido: {config.encoder}")
+
+    unique, pages = collect_images(pdf_extraido, images, name_image, config.dedup)
+    if not unique:
         logger.info("Nenhuma imagem foi encontrada no PDF.")
-    
\ No newline at end of file
+        return []
+
+    output_dir = os.path.join(directory, dir_name)
+    os.makedirs(output_dir, exist_ok=True)
+
+    reused_pages = set(reused_pages)
+    previous = previous_files(output_dir, config) if reused_pages else {}
+    files = [None] * len(unique)
+    pending = []
+
+    for position, image in enumerate(unique):
+        old = previous.get(image["name"])
+        if image["pages"][0] in reused_pages and old and old["xref"] == image["xref"] and os.path.exists(os.path.join(output_dir, old["file"])):
+            files[position] = old["file"]
+        else:
+            pending.append(position)
+
+    if len(pending) < len(unique):
+        logger.debug(f"{len(unique) - len(pending)} imagens de páginas inalteradas reaproveitadas.")
+
+    jobs = [(unique[position]["xref"], os.path.join(output_dir, unique[position]["name"])) for position in pending]
+    for position, file in zip(pending, save_all(pdf_extraido, jobs, config)):
+        files[position] = file
+    manifest = write_manifest(output_dir, pdf_extraido, unique, pages, files, config)
+
+    occurrences = sum(len(page) for page in pages)
+    if profiler.enabled:
+        profiler.count("images", len(unique))
+        profiler.count("image_occurrences", occurrences)
+        profiler.count("images_reused", len(unique) - len(pending))
+        profiler.count("image_bytes_written", sum(os.path.getsize(os.path.join(output_dir, files[position])) for position in pending if files[position]))
+    logger.debug(f"{len(unique)} imagens únicas de {occurrences} ocorrências; manifesto em {manifest}")
+    logger.info(f"Imagens extraidas e salvas em: {abs_path(output_dir)}")
+
+    return [{"file": file, "xref": image["xref"], "pages": [page + 1 for page in sorted(set(image["pages"]))]} for image, file in zip(unique, files) if file]
@@ -0,0 +1,126 @@
+import fitz, logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator
+from src.pdf.config import OcrConfig
+from src.pdf.structure import page_spans
+from src.pdf.walker import TEXT_FLAGS, page_fingerprint
+from src.utils.cache import ResultCache, EXTRACTOR_VERSION
+from src.utils.profiler import profiler, submit_profiled, collect_profiled
+
+logger = logging.getLogger(__name__)
+
+# Campos da página substituídos pelo resultado do OCR.
+OCR_FIELDS = ("text", "candidates", "fonts")
+
+@lru_cache(maxsize=None)
+def find_tessdata() -> str:
+    """Pasta de idiomas do Tesseract (TESSDATA_PREFIX ou instalação local); None se não houver."""
+    try:
+        return fitz.get_tessdata()
+    except RuntimeError as e:
+        logger.warning(f"Tesseract não encontrado, as páginas digitalizadas ficarão sem texto - {e}")
+        return None
+
+def ocr_page(page: fitz.Page, config: OcrConfig, tessdata: str) -> Dict:
+    """Rasteriza a página na resolução configurada e extrai texto e candidatos a título pelo Tesseract."""
+    with profiler.stage("ocr_page", trace=False):
+        textpage = page.get_textpage_ocr(flags=TEXT_FLAGS, language=config.language, dpi=config.dpi, full=True, tessdata=tessdata)
+        result = {"text": page.get_text(textpage=textpage)}
+        result["candidates"], result["fonts"] = page_spans(textpage.extractDICT()["blocks"])
+
+    profiler.count("ocr_pages")
+    return result
+
+def ocr_one(pdf_path: str, index: int, config: OcrConfig, tessdata: str) -> Dict:
+    """Abre o próprio documento no processo trabalhador e passa uma página pelo OCR."""
+    doc = fitz.open(pdf_path)
+    try:
+        return ocr_page(doc[index], config, tessdata)
+    except Exception as e:
+        # As exceções do PyMuPDF nem sempre podem ser enviadas de volta ao processo principal.
+        raise RuntimeError(str(e)) from None
+    finally:
+        doc.close()
+
+def ocr_key(cache: ResultCache, doc: fitz.Document, page: fitz.Page, config: OcrConfig) -> str:
+    """Chave do OCR de uma página: conteúdo da página, versão do extrator, resolução e idiomas."""
+    if not cache.enabled:
+        return None
+
+    return cache.key(page_fingerprint(doc, page), EXTRACTOR_VERSION, config.dpi, config.language)
+
+def merge_ocr(result: Dict, data: Dict) -> Dict:
+    """Troca os campos extraídos da página pelos do OCR."""
+    result.update({field: data[field] for field in OCR_FIELDS if field in result})
+    result["ocr"] = True
+
+    return result
+
+def apply_ocr(doc: fitz.Document, results: Iterable[Dict], config: OcrConfig, cache: ResultCache = None) -> Iterator[Dict]:
+    """
+    Passa pelo OCR as páginas marcadas como digitalizadas (result["ocr"] == False), consultando o
+    cache por página, e repassa todas as páginas em ordem. Com mais de um processo, o OCR roda em um
+    pool enquanto as páginas seguintes são lidas.
+    """
+    cache = cache or ResultCache(enabled=False)
+    tessdata = find_tessdata()
+    if tessdata is None:
+        yield from results
+        return
+
+    use_pool = config.workers > 1 and bool(doc.name)
+    window = max(1, config.workers) * 4
+    executor = None
+    pending = deque()
+
+    try:
+        for result in results:
+            key = future = None
+            if result.get("ocr") is False:
+                page = doc[result["index"]]
+                key = ocr_key(cache, doc, page, config)
+                cached = cache.get("ocr", key)
+                if cached is not None:
+                    merge_ocr(result, cached)
+                    profiler.count("ocr_pages_cached")
+                elif use_pool:
+                    if executor is None:
+                        executor = ProcessPoolExecutor(max_workers=config.workers)
+                    future = submit_profiled(executor, ocr_one, doc.name, result["index"], config, tessdata)
+                else:
+                    try:
+                        data = ocr_page(page, config, tessdata)
+                    except Exception as e:
+                        logger.error(f"Falha no OCR da página {result['index'] + 1} - {e}")
+                    else:
+                        merge_ocr(result, data)
+                        cache.put("ocr", key, data)
+
+            pending.append((result, key, future))
+
+            # Libera as páginas já prontas do início da fila; com a janela cheia, espera a primeira.
+            while pending and (pending[0][2] is None or pending[0][2].done() or len(pending) > window):
+                yield finish_ocr(*pending.popleft(), cache)
+
+        while pending:
+            yield finish_ocr(*pending.popleft(), cache)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+def finish_ocr(result: Dict, key: str, future, cache: ResultCache) -> Dict:
+    """Completa a página com o OCR feito no pool e guarda o resultado no cache."""
+    if future is None:
+        return result
+
+    try:
+        data = collect_profiled(future, future.result())
+    except Exception as e:
+        logger.error(f"Falha no OCR da página {result['index'] + 1} - {e}")
+        return result
+
+    cache.put("ocr", key, data)
+
+    return merge_ocr(result, data)
@@ -0,0 +1,121 @@
+import re, logging
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+from src.utils.text import search_section_keywords
+from src.utils.profiler import profiler
+
+logger = logging.getLogger(__name__)
+
+# Sumários ("Introdução ..........") não são títulos.
+LEADER_REGEX = re.compile(r"\.{5,}")
+
+# Pontuação que desqualifica um título detectado apenas pelo tamanho da fonte.
+PUNCTUATION_REGEX = re.compile(r"[.;,:]")
+
+def span_candidate(text: str, size: float) -> list:
+    """
+    Classifica o span: [None, seção] para palavras-chave de seção (aceitas sem olhar a fonte),
+    [tamanho, texto] quando só a fonte decide, ou None quando o texto não pode ser título.
+    """
+    if len(text) > 120 or text.count(" ") > 15 or text.isupper() or LEADER_REGEX.search(text):
+        return None
+
+    section = search_section_keywords(text)
+    if section:
+        return [None, section]
+
+    if PUNCTUATION_REGEX.search(text):
+        return None
+
+    return [size, text]
+
+def page_spans(blocks) -> Tuple[List, List]:
+    """
+    Reduz os blocos da página a registros compactos: os candidatos a título, em ordem, e o
+    histograma [tamanho, caracteres, spans] das fontes, somado depois ao do documento.
+    """
+    candidates = []
+    fonts = Counter()
+    counts = Counter()
+    spans = 0
+
+    for block in blocks:
+        for line in block.get("lines", ()):
+            for span in line["spans"]:
+                spans += 1
+                text = span["text"].strip()
+                if not text:
+                    continue
+
+                size = round(span["size"], 1)
+                fonts[size] += len(text)
+                counts[size] += 1
+                candidate = span_candidate(text, size)
+                if candidate:
+                    candidates.append(candidate)
+
+    profiler.count("spans", spans)
+
+    return candidates, sorted([size, chars, counts[size]] for size, chars in fonts.items())
+
+def body_font(histograms: Iterable[List]) -> float:
+    """Fonte do corpo do texto: o tamanho com mais caracteres nos histogramas somados."""
+    total = Counter()
+    for histogram in histograms:
+        for size, chars, *_ in histogram:
+            total[size] += chars
+
+    if not total:
+        return None
+
+    # Em caso de empate, o menor tamanho: títulos costumam ser os maiores.
+    return max(total.items(), key=lambda item: (item[1], -item[0]))[0]
+
+def local_font(histogram: List) -> float:
+    """Fonte mais frequente da página, contada por span (tabelas e legendas pesam mais que no corpo)."""
+    if not histogram or len(histogram[0]) < 3:
+        return None
+
+    return max(histogram, key=lambda item: (item[2], -item[0]))[0]
+
+def is_heading_size(size: float, body: float) -> bool:
+    """O tamanho destaca o texto da fonte do corpo informada."""
+    return body is not None and size > body * 1.25 and not (body < 10 and size < 14)
+
+def select_titles(candidates: List, body: float, local: float = None) -> str:
+    """
+    Escolhe os títulos da página comparando os candidatos com a fonte do corpo do documento. Os
+    candidatos só um pouco maiores que ela (até 25%) ainda valem se destacarem da fonte mais
+    frequente da própria página (local), como um título sobre uma tabela em fonte menor.
+    """
+    titles = []
+
+    for size, text in candidates:
+        if size is not None:
+            if not is_heading_size(size, body) and not (body is not None and size > body and is_heading_size(size, local)):
+                continue
+            logger.debug(f"Título detectado por tamanho de fonte: {text}")
+        else:
+            logger.debug(f"Título detectado por palavra-chave de seção: {text}")
+
+        if text not in titles:
+            titles.append(text)
+
+    return "; ".join(titles) if titles else None
+
+def detect_titles(pages: List[Dict]) -> List[str]:
+    """Títulos de cada página, julgados contra a fonte do corpo do documento inteiro."""
+    body = body_font(page["fonts"] for page in pages)
+    logger.debug(f"Fonte do corpo do documento: {body}")
+
+    return [select_titles(page["candidates"], body, local_font(page["fonts"])) for page in pages]
+
+def detect_struct(page, blocks=None):
+    """Detecta títulos reais de uma página isolada, usando a fonte do corpo da própria página."""
+    logger.debug("Detectando títulos na página do PDF.")
+    if blocks is None:
+        blocks = page.get_text("dict")["blocks"]
+
+    candidates, fonts = page_spans(blocks)
+
+    return select_titles(candidates, body_font([fonts]), local_font(fonts))
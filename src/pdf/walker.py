@@ -0,0 +1,222 @@
+import fitz, hashlib, logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+from src.pdf.structure import page_spans, detect_titles
+from src.utils.text import get_urls, is_latex_pdf, index_words, WordCounter, EdgeCounter
+from src.utils.profiler import profiler, submit_profiled, collect_profiled
+from src.utils.spool import TextSpool
+from src.utils.state import PageState
+from src.utils.cache import ResultCache
+from src.pdf.config import OcrConfig
+
+logger = logging.getLogger(__name__)
+
+# Flags do modo "text", sem imagens: a mesma decodificação serve ao texto e ao "dict".
+TEXT_FLAGS = fitz.TEXTFLAGS_TEXT
+
+# Campos do resultado da página produzidos por cada opção de leitura.
+PAGE_FIELDS = {"text": ("text",), "titles": ("candidates", "fonts"), "links": ("links",), "images": ("images",)}
+
+def read_page(page: fitz.Page, text: bool = False, titles: bool = False, links: bool = False, images: bool = False) -> Dict:
+    """
+    Decodifica a página uma única vez e extrai os dados pedidos. Páginas sem camada de texto, mas
+    com imagens (digitalizadas), são marcadas com "ocr": False para a etapa de OCR.
+    """
+    result = {"index": page.number}
+    profiler.count("pages_read")
+
+    if text or titles:
+        with profiler.stage("decode_page", trace=False):
+            textpage = page.get_textpage(flags=TEXT_FLAGS)
+
+            page_text = page.get_text(textpage=textpage)
+            if text:
+                result["text"] = page_text
+            if titles:
+                blocks = textpage.extractDICT()["blocks"]
+        if not page_text.strip() and page.get_images():
+            result["ocr"] = False
+        if titles:
+            # Só os candidatos e o histograma de fontes: os títulos dependem da fonte do corpo do documento inteiro.
+            with profiler.stage("detect_struct", trace=False):
+                result["candidates"], result["fonts"] = page_spans(blocks)
+
+    if links:
+        result["links"] = get_urls(page.get_links())
+
+    if images:
+        result["images"] = page.get_images()
+
+    return result
+
+def page_fingerprint(doc: fitz.Document, page: fitz.Page) -> str:
+    """Hash do conteúdo da página: streams de conteúdo, recursos, anotações e geometria."""
+    digest = hashlib.sha256(page.read_contents())
+    digest.update(f"{tuple(page.rect)};{page.rotation};".encode("utf-8"))
+
+    for key in ("Resources", "Annots"):
+        kind, value = doc.xref_get_key(page.xref, key)
+        if kind == "xref":
+            value = doc.xref_object(int(value.split()[0]), compressed=True)
+        digest.update(f"{key}={value};".encode("utf-8"))
+
+    return digest.hexdigest()
+
+def read_range(pdf_path: str, indices: List[int], text: bool = False, titles: bool = False, links: bool = False, images: bool = False) -> List[Dict]:
+    """Abre o próprio documento no processo trabalhador e lê um grupo de páginas."""
+    doc = fitz.open(pdf_path)
+    try:
+        return [
+            read_page(doc[index], text=text, titles=titles, links=links, images=images)
+            for index in indices
+        ]
+    finally:
+        doc.close()
+
+def split_pages(page_count: int, workers: int) -> List[range]:
+    """Divide as páginas em intervalos contíguos, alguns por processo para equilibrar a carga."""
+    size = max(1, -(-page_count // (workers * 4)))
+    return [range(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+def iter_pages(doc: fitz.Document, workers: int = 1, indices: List[int] = None, **options):
+    """Produz os resultados das páginas (todas ou só as indicadas) em ordem, em série ou em um pool de processos."""
+    indices = list(range(doc.page_count)) if indices is None else indices
+
+    if workers <= 1 or len(indices) < 2 or not doc.name:
+        for index in indices:
+            yield read_page(doc[index], **options)
+        return
+
+    ranges = split_pages(len(indices), workers)
+    logger.debug(f"Dividindo {len(indices)} páginas em {len(ranges)} intervalos para {workers} processos.")
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as executor:
+        futures = [
+            submit_profiled(executor, read_range, doc.name, indices[r.start:r.stop], **options)
+            for r in ranges
+        ]
+        for future in futures:
+            yield from collect_profiled(future, future.result())
+
+def read_pages(doc: fitz.Document, workers: int, indices: List[int], options: Dict, ocr: OcrConfig = None, cache: ResultCache = None):
+    """Lê as páginas e, com o OCR habilitado, completa as digitalizadas."""
+    results = iter_pages(doc, workers, indices, **options)
+    if not ocr or not ocr.enabled or not (options["text"] or options["titles"]):
+        return results
+
+    from src.pdf.ocr import apply_ocr
+    return apply_ocr(doc, results, ocr, cache)
+
+def read_document(doc: fitz.Document, text: bool = False, titles: bool = False, links: bool = False, images: bool = False, workers: int = 1, words: bool = False, state: PageState = None, ocr: OcrConfig = None, cache: ResultCache = None, tokens: bool = False) -> Dict:
+    """
+    Percorre o documento uma única vez alimentando todas as etapas habilitadas.
+    O texto completo é gravado em um TextSpool, que passa para um arquivo temporário nos documentos grandes.
+    Com state (estado por página de uma execução anterior), só as páginas cuja impressão digital
+    mudou são lidas de novo; os resultados por página voltam em "pages". Com ocr, as páginas
+    digitalizadas passam pelo Tesseract (com cache por página). Com tokens, as palavras de cada
+    página (sem stopwords, como em index_tokens) voltam em "tokens", para o índice de busca; elas saem
+    da mesma passada do WordCounter que conta as palavras.
+    """
+    logger.debug(f"Percorrendo {doc.page_count} páginas do documento (texto={text}, títulos={titles}, links={links}, imagens={images}, palavras={words}).")
+    data = {"page_count": doc.page_count}
+    options = {"text": text or words or tokens, "titles": titles, "links": links, "images": images}
+    is_latex = is_latex_pdf(doc) if words or tokens else False
+
+    # As palavras são separadas uma única vez por página, para a contagem e para o índice.
+    counter = WordCounter(is_latex) if words or tokens else None
+    if words:
+        data["words"] = counter
+    if tokens:
+        data["tokens"] = []
+    if text:
+        data["text"] = TextSpool()
+        data["edges"] = EdgeCounter()
+
+    if titles:
+        structures = []
+    if links:
+        data["links"] = []
+    if images:
+        data["images"] = []
+
+    if state is None:
+        results = read_pages(doc, workers, None, options, ocr, cache)
+    else:
+        results = merge_pages(doc, state, workers, options, data, ocr, cache)
+
+    for result in results:
+        if counter is not None:
+            carried, page_words = counter.update(result["text"] + "\n")
+        if text:
+            data["text"].write(result["text"] + "\n")
+            data["edges"].update(result["text"])
+        if tokens:
+            # O final de uma página só é contado com a seguinte, mas continua com ela no índice.
+            if data["tokens"]:
+                data["tokens"][-1] += carried
+            data["tokens"].append(page_words)
+        if titles:
+            structures.append({"candidates": result["candidates"], "fonts": result["fonts"]})
+        if links:
+            data["links"].append(result["links"])
+        if images:
+            data["images"].append(result["images"])
+
+    if tokens:
+        if data["tokens"]:
+            data["tokens"][-1] += counter.flush()
+        data["tokens"] = [" ".join(index_words(page_words)) for page_words in data["tokens"]]
+    if titles:
+        with profiler.stage("detect_titles", trace=False):
+            data["titles"] = detect_titles(structures)
+
+    return data
+
+def merge_pages(doc: fitz.Document, state: PageState, workers: int, options: Dict, data: Dict, ocr: OcrConfig = None, cache: ResultCache = None):
+    """
+    Reaproveita as páginas inalteradas do estado anterior e lê as demais, produzindo tudo em ordem.
+    O texto de cada página vai para o arquivo do novo estado assim que é produzido.
+    """
+    fields = [field for option, names in PAGE_FIELDS.items() if options[option] for field in names]
+    use_ocr = bool(ocr and ocr.enabled)
+    pages = []
+    changed = []
+
+    for page in doc:
+        fingerprint = page_fingerprint(doc, page)
+        previous = state.previous(page.number)
+        # Páginas digitalizadas são relidas quando o OCR é ligado ou desligado.
+        if (
+            previous and previous.get("fingerprint") == fingerprint
+            and all(has_field(previous, field) for field in fields)
+            and previous.get("ocr", use_ocr) == use_ocr
+        ):
+            pages.append(previous)
+        else:
+            pages.append({"fingerprint": fingerprint})
+            changed.append(page.number)
+
+    data["pages"] = pages
+    data["reused"] = set(range(doc.page_count)) - set(changed)
+    profiler.count("pages_reused", len(data["reused"]))
+    logger.info(f"Estado incremental: {len(data['reused'])} de {doc.page_count} páginas reaproveitadas.")
+
+    results = read_pages(doc, workers, changed, options, ocr, cache)
+    for index, page in enumerate(pages):
+        if index in data["reused"]:
+            result = {field: page[field] for field in fields if field != "text"}
+            if "text" in fields:
+                result["text"] = state.read_text(page)
+        else:
+            result = next(results)
+            page.update({field: result[field] for field in fields if field != "text"})
+            if "ocr" in result:
+                page["ocr"] = result["ocr"]
+
+        if "text" in fields:
+            state.keep_text(page, result["text"])
+        yield result
+
+def has_field(page: Dict, field: str) -> bool:
+    """Verifica se o estado da página guarda o campo (o texto pode estar no arquivo à parte)."""
+    return field in page or field == "text" and "text_at" in page
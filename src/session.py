@@ -0,0 +1,236 @@
+import logging, time
+from pathlib import Path
+from typing import Dict, List, Union
+from src.utils.cache import ResultCache
+from src.utils.source import PdfSource
+from src.utils.profiler import profiler
+from src.utils.files import MARKDOWN_DIR, format_output, make_markdown
+from src.utils.pipeline import summary_stage
+from src.utils.output import OutputConfig, RecordWriter, build_record, finish_record
+from src.pdf.walker import read_document
+from src.pdf.extractor import extract_metadata
+from src.pdf.image import IMAGES_DIR, collect_images, save_images
+from src.pdf.config import ImageConfig, OcrConfig
+from src.llm.config import SummaryConfig
+from src.llm.budget import prepare_text
+
+logger = logging.getLogger(__name__)
+
+class DocumentSession:
+    """
+    Documento aberto uma única vez para uso como biblioteca. Metadados, texto, imagens e resumo são
+    calculados sob demanda e guardados; cada campo de read_document é lido das páginas uma só vez,
+    mesmo entre chamadas diferentes. A sessão não grava nem imprime nada: isso fica com os destinos
+    (MarkdownSink, ImageSink, RecordSink, ConsoleSink), chamados por emit. O cache vem desativado.
+    """
+
+    def __init__(self, source: Union[str, Path, bytes, bytearray, memoryview, PdfSource], name: str = None, config: SummaryConfig = None, cache: ResultCache = None, image_config: ImageConfig = None, ocr_config: OcrConfig = None, top_k: int = 10, workers: int = 1, use_mmap: bool = False):
+        if isinstance(source, PdfSource):
+            self.source = source
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            self.source = PdfSource.from_bytes(source, name or "documento")
+        else:
+            self.source = PdfSource.from_path(source, use_mmap)
+        # Os PdfSource recebidos prontos continuam com quem os criou.
+        self.owns_source = self.source is not source
+        self.name = name or self.source.name
+        self.config = config or SummaryConfig()
+        self.cache = cache or ResultCache(enabled=False)
+        self.image_config = image_config or ImageConfig()
+        self.ocr_config = ocr_config
+        self.top_k = top_k
+        self.workers = workers
+
+        self.doc = self.source.open()
+        self.data = {"page_count": self.doc.page_count}
+        self.values = {}
+        self.saved_images = None
+        self.seconds = {"extract": 0.0, "summary": None}
+        self.doc_key = None
+
+    @property
+    def page_count(self) -> int:
+        """Número de páginas do documento."""
+        return self.doc.page_count
+
+    @property
+    def location(self) -> str:
+        """Identificação do documento nos registros: o caminho absoluto ou a origem em memória."""
+        return self.source.location
+
+    def document_key(self) -> str:
+        """Chave do documento no cache (com os parâmetros do OCR), ou None com o cache desativado."""
+        if self.doc_key is None and self.cache.enabled:
+            self.doc_key = self.cache.document_key(self.source.path, self.source.digest())
+            if self.ocr_config and self.ocr_config.enabled:
+                from src.pdf.ocr import find_tessdata
+                self.doc_key = self.cache.key(self.doc_key, "ocr", self.ocr_config.dpi, self.ocr_config.language, find_tessdata())
+        return self.doc_key
+
+    def read(self, *fields: str) -> Dict:
+        """Lê das páginas, em uma única passada, só os campos ainda não lidos e os junta aos anteriores."""
+        missing = [field for field in fields if field not in self.data]
+        if missing:
+            start = time.perf_counter()
+            with profiler.stage("read_document", pages=self.doc.page_count):
+                data = read_document(self.doc, workers=self.workers, ocr=self.ocr_config, cache=self.cache, **{field: True for field in missing})
+            # As bordas (cabeçalhos e rodapés) acompanham o texto.
+            self.data.update({key: value for key, value in data.items() if key in missing or key == "edges"})
+            self.seconds["extract"] += time.perf_counter() - start
+
+        return self.data
+
+    def lazy(self, name: str, compute):
+        """Calcula o valor na primeira chamada e o guarda para as seguintes."""
+        if name not in self.values:
+            self.values[name] = compute()
+        return self.values[name]
+
+    def metadata(self) -> Dict:
+        """Títulos, links, contagem de palavras e tamanho, como em extract_metadata."""
+        return self.lazy("metadata", self.compute_metadata)
+
+    def compute_metadata(self) -> Dict:
+        """Consulta o cache ou extrai os metadados das páginas."""
+        doc_key = self.document_key()
+        key = self.cache.key(doc_key, "top_k", self.top_k) if doc_key else None
+        metadata = self.cache.get("metadata", key)
+        if metadata is None:
+            # O texto das páginas é decodificado para contar as palavras: já fica guardado para o resumo.
+            data = self.read("text", "titles", "links", "words")
+            start = time.perf_counter()
+            metadata = extract_metadata(self.doc, self.source.path, data, self.top_k, self.source.size)
+            self.seconds["extract"] += time.perf_counter() - start
+            self.cache.put("metadata", key, metadata)
+        return metadata
+
+    def text(self):
+        """Texto preparado para a LLM (limpo e dentro do orçamento de tokens), como TextSpool ou str."""
+        return self.lazy("text", self.compute_text)
+
+    def compute_text(self):
+        """Consulta o cache ou prepara o texto lido das páginas."""
+        key = self.cache.text_key(self.document_key(), self.config)
+        text = self.cache.get_text(key)
+        if text is None:
+            text, self.values["budget"] = prepare_text(self.read("text"), self.config)
+            self.cache.put_text(key, text)
+        return text
+
+    def titles(self) -> List[str]:
+        """Títulos detectados no documento, usados para dividir o texto em trechos."""
+        return self.metadata()["titles"] if "metadata" in self.values else [title for title in self.read("titles")["titles"] if title]
+
+    def images(self) -> List[Dict]:
+        """Imagens únicas do documento (xref, nome e páginas, a partir de 1), sem decodificá-las."""
+        return self.lazy("images", self.compute_images)
+
+    def compute_images(self) -> List[Dict]:
+        """Agrupa as ocorrências das imagens em imagens únicas."""
+        unique, _ = collect_images(self.doc, self.read("images")["images"], f"{self.name}_imagem", self.image_config.dedup)
+        return [{"xref": image["xref"], "name": image["name"], "pages": [page + 1 for page in sorted(set(image["pages"]))]} for image in unique]
+
+    def summary(self) -> str:
+        """Resumo da LLM, reaproveitado do cache quando possível."""
+        return self.lazy("summary", self.compute_summary)
+
+    def compute_summary(self) -> str:
+        """Consulta o cache ou resume o texto preparado pela LLM."""
+        doc_key = self.document_key()
+        summary_key = self.cache.summary_key(doc_key, self.config)
+        result = {"summary": self.cache.get("summary", summary_key), "summary_key": summary_key}
+        start = time.perf_counter()
+        if result["summary"] is None:
+            result["text"] = self.text()
+            result["titles"] = self.titles()
+        summary = summary_stage(result, self.config, self.cache)
+        self.seconds["summary"] = time.perf_counter() - start
+        return summary
+
+    def record(self) -> Dict:
+        """Registro estruturado do documento, com o resumo só se ele já tiver sido gerado."""
+        metadata = self.metadata()
+        result = {"path": self.location, "filename": self.name, "page_count": self.page_count, "budget": self.values.get("budget")}
+        record = build_record(result, metadata, False, self.seconds["extract"])
+        record["images"] = self.saved_images or []
+        summary = self.values.get("summary")
+        return finish_record(record, summary, self.seconds["summary"] if summary is not None else None)
+
+    def emit(self, *sinks) -> "DocumentSession":
+        """Entrega o documento aos destinos, na ordem dada."""
+        for sink in sinks:
+            sink.emit(self)
+        return self
+
+    def close(self):
+        """Fecha o documento e libera a origem, se ela foi criada pela sessão."""
+        if self.doc is not None:
+            self.doc.close()
+            self.doc = None
+        if self.owns_source:
+            self.source.close()
+
+    def __enter__(self) -> "DocumentSession":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class MarkdownSink:
+    """Grava o markdown do documento (resumo e/ou metadados) no diretório dado."""
+
+    def __init__(self, directory: str = MARKDOWN_DIR, metadata: bool = True, summary: bool = False):
+        self.directory = directory
+        self.metadata = metadata
+        self.summary = summary
+
+    def emit(self, session: DocumentSession):
+        """Grava o markdown do documento."""
+        metadata = format_output(session.metadata(), show=False) if self.metadata else None
+        make_markdown(summarize=session.summary() if self.summary else None, metadata=metadata, filename=session.name, directory=self.directory)
+
+class ImageSink:
+    """Decodifica e grava as imagens do documento, com o manifesto, em directory/<nome do documento>."""
+
+    def __init__(self, directory: str = IMAGES_DIR, name_image: str = None):
+        self.directory = directory
+        self.name_image = name_image
+
+    def emit(self, session: DocumentSession):
+        """Grava as imagens do documento e as guarda na sessão para o registro."""
+        images = session.read("images")["images"]
+        session.saved_images = save_images(session.doc, images, self.name_image or f"{session.name}_imagem", session.name, session.image_config, directory=self.directory)
+
+class RecordSink:
+    """Grava o registro estruturado nos formatos da configuração; o Parquet sai ao fechar o destino."""
+
+    def __init__(self, config: OutputConfig, name: str = "biblioteca"):
+        self.writer = RecordWriter(config, name)
+
+    def emit(self, session: DocumentSession):
+        """Grava o registro do documento."""
+        self.writer.add(session.record())
+
+    def close(self):
+        self.writer.close()
+
+    def __enter__(self) -> "RecordSink":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class ConsoleSink:
+    """Exibe os metadados e/ou o resumo no console com o rich."""
+
+    def __init__(self, metadata: bool = True, summary: bool = False):
+        self.metadata = metadata
+        self.summary = summary
+
+    def emit(self, session: DocumentSession):
+        """Exibe o documento no console."""
+        if self.metadata:
+            format_output(session.metadata(), show=True)
+        if self.summary:
+            from src.utils.console import print_summary
+            print_summary(session.summary())
@@ -0,0 +1,294 @@
+import asyncio, glob, json, logging, os, time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Set, Union
+from src.utils.files import MARKDOWN_DIR, format_output, make_markdown, markdown_path
+from src.utils.validator import abs_path, define_name
+from src.utils.cache import ResultCache
+from src.utils.pipeline import extract_stage, summary_stage, reuse_duplicate, register_document, claim_summary, follow_duplicate, release_summary
+from src.utils.profiler import profiler, submit_profiled, collect_profiled
+from src.utils.output import OutputConfig, RecordWriter, build_record, finish_record, write_atomic
+from src.utils.index import SearchIndex
+from src.utils.dedup import DuplicateIndex
+from src.utils.source import PdfSource
+from src.llm.config import SummaryConfig
+from src.pdf.config import ImageConfig, OcrConfig
+
+logger = logging.getLogger(__name__)
+
+def collect_documents(source: str) -> List[Path]:
+    """Lista os PDFs de um diretório, padrão glob ou arquivo de manifesto."""
+    logger.debug(f"Coletando documentos de: {source}")
+    path = Path(source)
+
+    if path.is_dir():
+        paths = sorted(p for p in path.rglob("*") if p.suffix.lower() == ".pdf")
+    elif path.is_file() and path.suffix.lower() != ".pdf":
+        with open(path, encoding="utf-8") as manifest:
+            lines = [line.strip() for line in manifest]
+        base = path.parent
+        paths = [Path(line) if os.path.isabs(line) else base / line for line in lines if line and not line.startswith("#")]
+    else:
+        paths = [Path(p) for p in sorted(glob.glob(source, recursive=True))]
+
+    documents = []
+    names = set()
+    for pdf in paths:
+        if not pdf.is_file() or pdf.suffix.lower() != ".pdf":
+            logger.warning(f"Ignorando entrada que não é um PDF: {pdf}")
+            continue
+
+        name = define_name(pdf)
+        if name in names:
+            logger.warning(f"Ignorando '{pdf}': já existe um documento com o nome '{name}' no lote.")
+            continue
+
+        names.add(name)
+        documents.append(pdf)
+
+    return documents
+
+# Ações cujo resultado vai para o markdown (reescrito a cada execução); as imagens ficam na própria pasta.
+MARKDOWN_ACTIONS = {"text", "summary"}
+
+def requested_actions(extract_text: bool, extract_img: bool, extract_sum: bool) -> Set[str]:
+    """Nomes das ações pedidas, como gravados no registro de conclusão."""
+    return {action for action, wanted in (("text", extract_text), ("images", extract_img), ("summary", extract_sum)) if wanted}
+
+def done_path(filename: str) -> str:
+    """Caminho do registro de conclusão do documento, ao lado do markdown."""
+    return os.path.join(MARKDOWN_DIR, f"{filename}.done.json")
+
+def read_done(filename: str) -> Dict:
+    """Registro de conclusão do documento (caminho e ações concluídas), ou None."""
+    try:
+        with open(done_path(filename), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def is_done(pdf_path: Path, actions: Set[str]) -> bool:
+    """Verifica se as ações pedidas já foram concluídas para este PDF (e não para outro com o mesmo nome)."""
+    filename = define_name(pdf_path)
+    done = read_done(filename)
+    if done is None or done.get("path") != abs_path(pdf_path) or not actions <= set(done.get("actions", ())):
+        return False
+
+    return not actions & MARKDOWN_ACTIONS or os.path.exists(markdown_path(filename))
+
+def mark_done(result: Dict, actions: Set[str]):
+    """
+    Registra as ações concluídas do documento. O markdown é reescrito a cada execução: texto e resumo
+    valem os da última que o gravou; as imagens anteriores continuam valendo.
+    """
+    previous = read_done(result["filename"])
+    done = set(actions)
+    if previous is not None and previous.get("path") == result["path"]:
+        kept = set(previous.get("actions", ()))
+        done |= kept - MARKDOWN_ACTIONS if actions & MARKDOWN_ACTIONS else kept
+
+    write_atomic(done_path(result["filename"]), json.dumps({"path": result["path"], "actions": sorted(done)}, ensure_ascii=False))
+
+def extract_document(pdf_path: Union[str, PdfSource], extract_text: bool, extract_img: bool, extract_sum: bool, image_name: str = None, cache: ResultCache = None, config: SummaryConfig = None, top_k: int = 10, image_config: ImageConfig = None, ocr_config: OcrConfig = None, index: bool = False, dedup: bool = False, use_mmap: bool = False) -> Dict:
+    """
+    Executa a etapa de CPU (texto, estrutura e imagens) de um documento, dado pelo caminho (lido
+    direto ou, com use_mmap, mapeado em memória) ou por um PdfSource já em memória.
+    """
+    source = pdf_path if isinstance(pdf_path, PdfSource) else PdfSource.from_path(pdf_path, use_mmap)
+    filename = source.name
+    name_image = image_name or f"{filename}_imagem"
+    hits, misses = (cache.hits, cache.misses) if cache else (0, 0)
+    start = time.perf_counter()
+
+    doc = source.open()
+    try:
+        with profiler.stage("extract_stage", document=source.location):
+            result = extract_stage(
+                doc,
+                source.path,
+                extract_text,
+                extract_img,
+                extract_sum,
+                name_image,
+                filename,
+                cache=cache,
+                config=config,
+                top_k=top_k,
+                image_config=image_config,
+                ocr_config=ocr_config,
+                index=index,
+                dedup=dedup,
+                source=source
+            )
+    finally:
+        doc.close()
+        # Os PdfSource recebidos prontos continuam com quem os criou.
+        if source is not pdf_path:
+            source.close()
+
+    result["path"] = source.location
+    result["filename"] = filename
+    # O cache roda em outro processo: os contadores voltam junto com o resultado.
+    result["cache_hits"] = cache.hits - hits if cache else 0
+    result["cache_misses"] = cache.misses - misses if cache else 0
+    result["record"] = build_record(result, result["metadata"], extract_img, time.perf_counter() - start)
+    if result["metadata"] is not None:
+        result["metadata"] = format_output(result["metadata"], show=False)
+
+    return result
+
+def finish_document(result: Dict, summarize: bool, config: SummaryConfig = None, cache: ResultCache = None, duplicates: DuplicateIndex = None) -> Dict:
+    """Executa a etapa da LLM (se pedida, e se não houver um documento quase idêntico já resumido) e grava o markdown do documento."""
+    summa = None
+    seconds = None
+    try:
+        if summarize:
+            start = time.perf_counter()
+            if not reuse_duplicate(result, duplicates, config):
+                # Um quase idêntico sendo resumido agora em outra thread: espera o resumo dele.
+                pending = claim_summary(result, duplicates, config)
+                if pending is not None:
+                    follow_duplicate(result, duplicates, pending, pending["future"].result())
+            with profiler.stage("summary_stage", document=result["path"]):
+                summa = summary_stage(result, config, cache)
+            seconds = time.perf_counter() - start
+            result["summary"] = summa
+        finish_record(result["record"], summa, seconds, result.get("duplicate_of"))
+        register_document(result, duplicates, config, summa)
+    finally:
+        release_summary(result, duplicates, summa)
+
+    if result["metadata"] or summa:
+        with profiler.stage("make_markdown", trace=False):
+            make_markdown(summarize=summa, metadata=result["metadata"], filename=result["filename"])
+
+    return result
+
+def run_batch(documents: List[Path], extract_text: bool, extract_img: bool, extract_sum: bool, image_name: str = None, extract_jobs: int = 1, llm_jobs: int = 1, resume: bool = True, config: SummaryConfig = None, cache: ResultCache = None, top_k: int = 10, image_config: ImageConfig = None, ocr_config: OcrConfig = None, output: OutputConfig = None, index: SearchIndex = None, duplicates: DuplicateIndex = None, use_mmap: bool = False) -> Dict:
+    """
+    Processa os documentos com limites separados para extração (CPU) e resumo (LLM). Com index, cada
+    documento concluído entra no índice de busca; com duplicates, os documentos quase idênticos a um
+    já resumido reaproveitam o resumo; com use_mmap, os PDFs são mapeados em memória.
+    """
+    stats = {"docs": 0, "pages": 0, "failures": 0, "skipped": 0, "duplicates": 0, "elapsed": 0.0}
+    cache = cache or ResultCache(enabled=False)
+    writer = RecordWriter(output or OutputConfig(), "lote")
+    start = time.perf_counter()
+
+    actions = requested_actions(extract_text, extract_img, extract_sum)
+    pending = []
+    for pdf in documents:
+        if resume and is_done(pdf, actions):
+            logger.debug(f"Saídas completas encontradas, pulando: {pdf}")
+            stats["skipped"] += 1
+        else:
+            pending.append(pdf)
+
+    logger.info(f"Processando {len(pending)} documentos ({stats['skipped']} já concluídos).")
+
+    def done(result):
+        stats["docs"] += 1
+        stats["pages"] += result["page_count"]
+        writer.add(result["record"])
+        mark_done(result, actions)
+        if index is not None:
+            index.add(result, result["record"]["summary"])
+        logger.info(f"Documento concluído: {result['path']}")
+
+    def failed(pdf, error):
+        stats["failures"] += 1
+        logger.error(f"Falha ao processar '{pdf}' - {error}")
+
+    def submit(cpu_pool, pdf):
+        return submit_profiled(cpu_pool, extract_document, str(pdf), extract_text, extract_img, extract_sum, image_name, cache, config, top_k, image_config, ocr_config, index is not None, duplicates is not None, use_mmap)
+
+    def extracted(result):
+        cache.hits += result["cache_hits"]
+        cache.misses += result["cache_misses"]
+
+    with writer, ProcessPoolExecutor(max_workers=extract_jobs) as cpu_pool:
+        if extract_sum and config and config.use_async:
+            asyncio.run(schedule_async(cpu_pool, pending, submit, extracted, done, failed, llm_jobs, config, cache, duplicates))
+        else:
+            schedule_threads(cpu_pool, pending, submit, extracted, done, failed, extract_sum, llm_jobs, config, cache, duplicates)
+
+    stats["elapsed"] = time.perf_counter() - start
+    logger.info(cache.stats())
+    if index is not None:
+        logger.info(index.stats())
+    if duplicates is not None:
+        stats["duplicates"] = duplicates.reused
+        logger.info(duplicates.stats())
+
+    return stats
+
+def schedule_threads(cpu_pool, pending, submit, extracted, done, failed, extract_sum, llm_jobs, config, cache, duplicates=None):
+    """Encadeia a extração (processos) e o resumo (threads) de cada documento."""
+    with ThreadPoolExecutor(max_workers=llm_jobs) as llm_pool:
+        extract_futures = {submit(cpu_pool, pdf): pdf for pdf in pending}
+        llm_futures = {}
+
+        for future in as_completed(extract_futures):
+            pdf = extract_futures[future]
+            try:
+                result = collect_profiled(future, future.result(), document=str(pdf))
+            except Exception as e:
+                failed(pdf, e)
+                continue
+
+            extracted(result)
+
+            if extract_sum:
+                llm_futures[llm_pool.submit(finish_document, result, True, config, cache, duplicates)] = pdf
+                continue
+
+            try:
+                done(finish_document(result, False, config, duplicates=duplicates))
+            except Exception as e:
+                failed(pdf, e)
+
+        for future in as_completed(llm_futures):
+            pdf = llm_futures[future]
+            try:
+                done(future.result())
+            except Exception as e:
+                failed(pdf, e)
+
+async def schedule_async(cpu_pool, pending, submit, extracted, done, failed, llm_jobs, config, cache, duplicates=None):
+    """Encadeia a extração (processos) e o resumo pelo cliente assíncrono, com limite global de requisições."""
+    from src.llm.async_client import AsyncLLMSession, asummarize_text
+
+    session = AsyncLLMSession(max_in_flight=llm_jobs, timeout=config.request_timeout, retries=config.retries, model=config.model)
+
+    async with session:
+        async def process(pdf):
+            try:
+                future = submit(cpu_pool, pdf)
+                result = collect_profiled(future, await asyncio.wrap_future(future), document=str(pdf))
+                extracted(result)
+
+                start = time.perf_counter()
+                summa = None
+                try:
+                    if not reuse_duplicate(result, duplicates, config):
+                        # Um quase idêntico extraído antes e ainda sendo resumido: espera o resumo dele.
+                        pending = claim_summary(result, duplicates, config)
+                        if pending is not None:
+                            follow_duplicate(result, duplicates, pending, await asyncio.wrap_future(pending["future"]))
+                    summa = result["summary"]
+                    if summa is None:
+                        summa = await asummarize_text(session, result["text"], config, result["titles"], cache)
+                        cache.put("summary", result["summary_key"], summa)
+                    finish_record(result["record"], summa, time.perf_counter() - start, result.get("duplicate_of"))
+                    register_document(result, duplicates, config, summa)
+                finally:
+                    release_summary(result, duplicates, summa)
+
+                make_markdown(summarize=summa, metadata=result["metadata"], filename=result["filename"])
+                done(result)
+            except Exception as e:
+                failed(pdf, e)
+
+        await asyncio.gather(*(process(pdf) for pdf in pending))
+
+    logger.info(f"Cliente assíncrono: {session.requests} requisições, {session.failures} falhas.")
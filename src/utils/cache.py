@@ -0,0 +1,196 @@
+import hashlib, json, logging, os
+from typing import Any
+from src.llm.prompts import prompt_hash
+from src.utils.spool import TextSpool, spool_file, iter_lines
+
+logger = logging.getLogger(__name__)
+
+# Incrementar sempre que a extração mudar o formato ou o conteúdo dos resultados.
+EXTRACTOR_VERSION = "5"
+
+CACHE_DIR = "output/cache"
+
+# Extensões das entradas do cache: valores em JSON e textos completos dos documentos.
+ENTRY_EXTENSIONS = (".json", ".txt")
+
+def file_hash(path: str) -> str:
+    """Calcula o hash do conteúdo do arquivo em blocos."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+class ResultCache:
+    """Cache em disco, endereçado pelo conteúdo do PDF, com descarte LRU por tamanho."""
+
+    def __init__(self, directory: str = CACHE_DIR, max_mb: int = 512, enabled: bool = True, refresh: bool = False):
+        self.directory = directory
+        self.max_bytes = max_mb * 1024 * 1024
+        self.enabled = enabled
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_args(cls, args) -> "ResultCache":
+        """Monta o cache a partir dos argumentos da CLI."""
+        return cls(
+            max_mb=getattr(args, "cache_size", 512),
+            enabled=not getattr(args, "no_cache", False),
+            refresh=getattr(args, "refresh", False)
+        )
+
+    def key(self, *parts: str) -> str:
+        """Gera a chave a partir das partes que identificam o resultado."""
+        return hashlib.sha256("\0".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+    def document_key(self, pdf_path: str, digest: str = None) -> str:
+        """Chave dos resultados de extração: conteúdo do PDF (ou o hash dele, já calculado) e versão do extrator."""
+        if not self.enabled:
+            return None
+
+        return self.key(digest or file_hash(pdf_path), EXTRACTOR_VERSION)
+
+    def summary_key(self, document_key: str, config) -> str:
+        """Chave do resumo: documento, modelo, prompts, preparo do texto e parâmetros dos trechos."""
+        if not self.enabled:
+            return None
+
+        return self.key(self.text_key(document_key, config), config.model.identity(), prompt_hash(), config.chunk_tokens, config.chunk_overlap, config.fan_out)
+
+    def text_key(self, document_key: str, config) -> str:
+        """Chave do texto preparado para a LLM: documento e parâmetros da limpeza e do orçamento."""
+        if not self.enabled:
+            return None
+
+        return self.key(document_key, "text", config.compress, config.token_budget, config.reference_lines)
+
+    def llm_key(self, kind: str, text: str, model) -> str:
+        """Chave de uma chamada à LLM: modelo, prompts, tipo do prompt e texto enviado."""
+        if not self.enabled:
+            return None
+
+        return self.key(model.identity(), prompt_hash(), kind, text)
+
+    def path(self, kind: str, key: str, extension: str = ".json") -> str:
+        """Caminho do arquivo de uma entrada do cache."""
+        return os.path.join(self.directory, kind, f"{key}{extension}")
+
+    def lookup(self, kind: str, key: str, extension: str = ".json") -> str:
+        """Caminho da entrada, se ela puder ser usada; contabiliza a falta caso contrário."""
+        if not self.enabled or key is None:
+            return None
+
+        path = self.path(kind, key, extension)
+        if self.refresh or not os.path.exists(path):
+            self.misses += 1
+            logger.debug(f"Cache ({kind}): falta para {key[:12]}.")
+            return None
+
+        return path
+
+    def get(self, kind: str, key: str) -> Any:
+        """Retorna o valor guardado ou None, contabilizando acertos e faltas."""
+        path = self.lookup(kind, key)
+        if path is None:
+            return None
+
+        try:
+            with open(path, encoding="utf-8") as f:
+                value = json.load(f)
+            # Atualiza o horário de acesso usado no descarte LRU.
+            os.utime(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Entrada de cache inválida, ignorando: {path} - {e}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        logger.debug(f"Cache ({kind}): acerto para {key[:12]}.")
+        return value
+
+    def put(self, kind: str, key: str, value: Any):
+        """Guarda o valor e descarta as entradas menos usadas se o limite for excedido."""
+        if not self.enabled or key is None or value is None:
+            return
+
+        path = self.path(kind, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+        self.evict()
+
+    def get_text(self, key: str) -> TextSpool:
+        """Retorna o texto completo guardado (lido em blocos) ou None."""
+        path = self.lookup("text", key, ".txt")
+        if path is None:
+            return None
+
+        try:
+            text = spool_file(path)
+            os.utime(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Entrada de cache inválida, ignorando: {path} - {e}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        logger.debug(f"Cache (text): acerto para {key[:12]}.")
+        return text
+
+    def put_text(self, key: str, text: TextSpool):
+        """Guarda o texto completo linha a linha, sem montá-lo em memória."""
+        if not self.enabled or key is None or text is None:
+            return
+
+        path = self.path("text", key, ".txt")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            f.writelines(iter_lines(text))
+        os.replace(tmp_path, path)
+
+        self.evict()
+
+    def evict(self):
+        """Remove as entradas acessadas há mais tempo até caber no limite de tamanho."""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(ENTRY_EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            logger.debug(f"Cache: entrada descartada {path}")
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> str:
+        """Resumo dos acertos e faltas do cache."""
+        if not self.enabled:
+            return "Cache desativado."
+
+        return f"Cache: {self.hits} acertos, {self.misses} faltas."
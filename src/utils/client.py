@@ -0,0 +1,32 @@
+import json, logging
+from typing import Dict
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+logger = logging.getLogger(__name__)
+
+def request_json(url: str, body: Dict = None, timeout: float = 30) -> Dict:
+    """Faz a requisição ao servidor e devolve a resposta em JSON."""
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    request = Request(url, data=data, headers={"Content-Type": "application/json"})
+
+    try:
+        with urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except HTTPError as e:
+        detail = json.loads(e.read() or b"{}").get("error", e.reason)
+        raise ValueError(f"[ERROR]: Servidor recusou a requisição ({e.code}): {detail}")
+    except URLError as e:
+        raise ValueError(f"[ERROR]: Não foi possível conectar ao servidor {url}: {e.reason}")
+
+def submit_job(server: str, job: Dict) -> Dict:
+    """Envia um job ao servidor e retorna o identificador e o estado inicial."""
+    return request_json(f"{server.rstrip('/')}/jobs", job)
+
+def wait_job(server: str, job_id: str, poll: float = 30) -> Dict:
+    """Aguarda o job terminar usando consultas longas."""
+    while True:
+        job = request_json(f"{server.rstrip('/')}/jobs/{job_id}?wait={poll}", timeout=poll + 30)
+        if job["status"] in ("done", "failed"):
+            return job
+        logger.debug(f"Job {job_id[:8]} em andamento: {job['status']}")
@@ -0,0 +1,31 @@
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=None)
+def get_console():
+    """Retorna o console do rich compartilhado, importado apenas no primeiro uso."""
+    from rich.console import Console
+    return Console()
+
+def print_summary(summary: str):
+    """Imprime o resumo no console."""
+    logger.debug("Imprimindo o resumo gerado pela LLM.")
+
+    get_console().print(make_panel(summary))
+
+def make_panel(summary: str):
+    """Monta o painel do resumo exibido no console."""
+    from rich.panel import Panel
+    from rich.markdown import Markdown
+    from rich import box
+
+    return Panel(
+        Markdown(summary),
+        title="[bold yellow]Resumo do PDF[/]",
+        subtitle="[bold yellow]Fim do Resumo[/]",
+        box = box.ROUNDED,
+        border_style="green",
+        padding=(1, 2)
+    )
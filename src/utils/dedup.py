@@ -0,0 +1,269 @@
+import hashlib, logging, os, sqlite3, struct, threading, time
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+from src.utils.validator import abs_path
+
+logger = logging.getLogger(__name__)
+
+DUPLICATES_PATH = "output/duplicates.sqlite"
+
+# Similaridade (Jaccard estimado) a partir da qual um documento reaproveita o resumo de outro.
+THRESHOLD = 0.85
+
+# Palavras por trecho comparado (shingle).
+SHINGLE = 3
+
+# Posições da assinatura MinHash, divididas em faixas para a busca LSH: dois documentos viram
+# candidatos quando todas as posições de ao menos uma faixa coincidem.
+SIGNATURE_SIZE = 128
+BANDS = 16
+ROWS = SIGNATURE_SIZE // BANDS
+
+MASK = (1 << 64) - 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    filename TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bands (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    doc_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bands_bucket ON bands (band, bucket);
+CREATE INDEX IF NOT EXISTS bands_doc ON bands (doc_id);
+CREATE TABLE IF NOT EXISTS summaries (
+    doc_id INTEGER NOT NULL,
+    variant TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    PRIMARY KEY (doc_id, variant)
+);
+"""
+
+def hash64(data: bytes) -> int:
+    """Hash estável de 64 bits (o hash() do Python muda a cada processo)."""
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+def minhash_signature(pages: List[str]) -> Optional[List[int]]:
+    """
+    Assinatura MinHash das palavras do documento (as de index_tokens, por página), em trechos de
+    SHINGLE palavras. Usa uma única função de hash dividida em SIGNATURE_SIZE faixas (one permutation
+    hashing), com as faixas vazias preenchidas pela seguinte; None se o documento não tem palavras.
+    """
+    words = " ".join(pages).split()
+    if not words:
+        return None
+
+    bins = [None] * SIGNATURE_SIZE
+    for start in range(max(1, len(words) - SHINGLE + 1)):
+        value = hash64(" ".join(words[start:start + SHINGLE]).encode("utf-8"))
+        position, value = value % SIGNATURE_SIZE, value // SIGNATURE_SIZE
+        if bins[position] is None or value < bins[position]:
+            bins[position] = value
+
+    # Documentos curtos deixam faixas vazias: copia a próxima preenchida, deslocada pela distância.
+    signature = []
+    for position in range(SIGNATURE_SIZE):
+        for distance in range(SIGNATURE_SIZE):
+            value = bins[(position + distance) % SIGNATURE_SIZE]
+            if value is not None:
+                signature.append((value + (distance << 57)) & MASK)
+                break
+
+    return signature
+
+def similarity(first: List[int], second: List[int]) -> float:
+    """Jaccard estimado entre os trechos de dois documentos: fração de posições iguais."""
+    return sum(a == b for a, b in zip(first, second)) / SIGNATURE_SIZE
+
+def band_buckets(signature: List[int]) -> List[int]:
+    """Chave de cada faixa da assinatura, como inteiro com sinal (o INTEGER do SQLite)."""
+    return [
+        int.from_bytes(hashlib.blake2b(struct.pack(f"{ROWS}Q", *signature[band * ROWS:(band + 1) * ROWS]), digest_size=8).digest(), "big", signed=True)
+        for band in range(BANDS)
+    ]
+
+def summary_variant(config) -> str:
+    """Identifica o modelo, os prompts e o preparo do texto: só resumos gerados do mesmo jeito são reaproveitados."""
+    from src.llm.prompts import prompt_hash
+
+    parts = (config.model.identity(), prompt_hash(), config.compress, config.token_budget, config.reference_lines, config.chunk_tokens, config.chunk_overlap, config.fan_out)
+    return hashlib.sha256("\0".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+def open_duplicates(args) -> "DuplicateIndex":
+    """Abre o índice de duplicatas se pedido na CLI (--dedup)."""
+    if not getattr(args, "dedup", False):
+        return None
+
+    return DuplicateIndex(getattr(args, "dedup_path", None) or DUPLICATES_PATH, getattr(args, "dedup_threshold", THRESHOLD))
+
+class DuplicateIndex:
+    """
+    Índice LSH das assinaturas MinHash dos documentos processados, em SQLite, com os resumos gerados.
+    Um documento quase idêntico a outro já resumido (revisão, cópia com marca d'água, o mesmo artigo
+    de outro repositório) reaproveita o resumo no lugar de chamar a LLM.
+    """
+
+    def __init__(self, path: str = DUPLICATES_PATH, threshold: float = THRESHOLD, readonly: bool = False):
+        self.path = path
+        self.threshold = threshold
+        if readonly:
+            if not os.path.exists(path):
+                raise ValueError(f"[ERROR]: Índice de duplicatas não encontrado: {abs_path(path)} (gere-o com --dedup).")
+            self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(SCHEMA)
+        # No servidor e no lote, os resumos terminam em threads diferentes.
+        self.lock = threading.Lock()
+        self.reused = 0
+        # Resumos em andamento nesta execução: caminho -> (nome, variante, assinatura, futuro do resumo).
+        self.in_flight = {}
+
+    def candidates(self, signature: List[int]) -> List[tuple]:
+        """Documentos que compartilham ao menos uma faixa com a assinatura: (id, caminho, nome, assinatura)."""
+        buckets = band_buckets(signature)
+        where = " OR ".join(["(b.band = ? AND b.bucket = ?)"] * BANDS)
+        rows = self.conn.execute(
+            f"SELECT DISTINCT d.id, d.path, d.filename, d.signature FROM bands AS b JOIN documents AS d ON d.id = b.doc_id WHERE {where}",
+            [value for band, bucket in enumerate(buckets) for value in (band, bucket)]
+        ).fetchall()
+
+        return [(doc_id, path, filename, unpack(blob)) for doc_id, path, filename, blob in rows]
+
+    def match(self, path: str, signature: List[int], variant: str) -> Optional[Dict]:
+        """Documento já resumido (com a mesma variante) mais semelhante acima do limiar, com o resumo."""
+        with self.lock:
+            best = None
+            for doc_id, other, filename, other_signature in self.candidates(signature):
+                score = similarity(signature, other_signature)
+                if other == path or score < self.threshold or (best and score <= best["similarity"]):
+                    continue
+                row = self.conn.execute("SELECT summary FROM summaries WHERE doc_id = ? AND variant = ?", (doc_id, variant)).fetchone()
+                if row:
+                    best = {"path": other, "filename": filename, "similarity": round(score, 3), "summary": row[0]}
+
+        if best:
+            self.count_reuse(best)
+        return best
+
+    def count_reuse(self, best: Dict):
+        """Conta e registra no log o resumo reaproveitado."""
+        self.reused += 1
+        logger.info(f"Documento quase idêntico a '{best['filename']}' (similaridade {best['similarity']:.2f}): resumo reaproveitado sem chamar a LLM.")
+
+    def claim(self, path: str, filename: str, signature: List[int], variant: str) -> Optional[Dict]:
+        """
+        Marca o resumo do documento como em andamento. Se um documento quase idêntico (com a mesma
+        variante) já está sendo resumido, não marca nada e retorna ele, com o futuro do resumo.
+        """
+        with self.lock:
+            best = None
+            for other, (filename_other, variant_other, signature_other, future) in self.in_flight.items():
+                score = similarity(signature, signature_other)
+                if other == path or variant_other != variant or score < self.threshold or (best and score <= best["similarity"]):
+                    continue
+                best = {"path": other, "filename": filename_other, "similarity": round(score, 3), "future": future}
+
+            if best is None:
+                self.in_flight[path] = (filename, variant, signature, Future())
+
+        return best
+
+    def release(self, path: str, summary: str = None):
+        """Conclui o resumo em andamento do documento: quem espera por ele recebe o resumo (None se falhou)."""
+        with self.lock:
+            entry = self.in_flight.pop(path, None)
+
+        if entry is not None:
+            entry[3].set_result(summary)
+
+    def add(self, path: str, filename: str, fingerprint: str, signature: List[int], variant: str = None, summary: str = None):
+        """Grava (ou substitui) a assinatura do documento e, se houver, o resumo gerado."""
+        with self.lock, self.conn:
+            row = self.conn.execute("SELECT id, fingerprint FROM documents WHERE path = ?", (path,)).fetchone()
+            if row and row[1] == fingerprint:
+                doc_id = row[0]
+            else:
+                if row:
+                    self.conn.execute("DELETE FROM documents WHERE id = ?", (row[0],))
+                    self.conn.execute("DELETE FROM bands WHERE doc_id = ?", (row[0],))
+                    self.conn.execute("DELETE FROM summaries WHERE doc_id = ?", (row[0],))
+                doc_id = self.conn.execute(
+                    "INSERT INTO documents (path, filename, fingerprint, signature, updated) VALUES (?, ?, ?, ?, ?)",
+                    (path, filename, fingerprint, struct.pack(f"{SIGNATURE_SIZE}Q", *signature), time.time())
+                ).lastrowid
+                self.conn.executemany("INSERT INTO bands (band, bucket, doc_id) VALUES (?, ?, ?)", ((band, bucket, doc_id) for band, bucket in enumerate(band_buckets(signature))))
+
+            if summary and variant:
+                self.conn.execute("INSERT OR REPLACE INTO summaries (doc_id, variant, summary) VALUES (?, ?, ?)", (doc_id, variant, summary))
+
+    def clusters(self) -> List[Dict]:
+        """Grupos de documentos quase idênticos (similaridade acima do limiar), do maior para o menor."""
+        with self.lock:
+            documents = {doc_id: (path, filename, unpack(blob)) for doc_id, path, filename, blob in self.conn.execute("SELECT id, path, filename, signature FROM documents")}
+            buckets = self.conn.execute("SELECT group_concat(doc_id) FROM bands GROUP BY band, bucket HAVING COUNT(*) > 1").fetchall()
+
+        parent = {doc_id: doc_id for doc_id in documents}
+
+        def root(doc_id):
+            while parent[doc_id] != doc_id:
+                parent[doc_id] = parent[parent[doc_id]]
+                doc_id = parent[doc_id]
+            return doc_id
+
+        scores = {}
+        for (members,) in buckets:
+            ids = sorted(set(int(doc_id) for doc_id in members.split(",")))
+            for index, first in enumerate(ids):
+                for second in ids[index + 1:]:
+                    if (first, second) in scores:
+                        continue
+                    scores[first, second] = similarity(documents[first][2], documents[second][2])
+                    if scores[first, second] >= self.threshold:
+                        parent[root(second)] = root(first)
+
+        groups = {}
+        for doc_id in documents:
+            groups.setdefault(root(doc_id), []).append(doc_id)
+
+        clusters = []
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            members.sort()
+            # Menor similaridade entre os pares do grupo comparados (candidatos de alguma faixa).
+            lowest = min((scores[first, second] for i, first in enumerate(members) for second in members[i + 1:] if (first, second) in scores), default=None)
+            clusters.append({
+                "similarity": round(lowest, 3) if lowest is not None else None,
+                "documents": [{"path": documents[doc_id][0], "filename": documents[doc_id][1]} for doc_id in members],
+            })
+
+        return sorted(clusters, key=lambda cluster: len(cluster["documents"]), reverse=True)
+
+    def stats(self) -> str:
+        """Resumo do índice para o log."""
+        documents = self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        return f"Duplicatas: {self.reused} resumos reaproveitados; {documents} documentos em {abs_path(self.path)}"
+
+    def close(self):
+        """Fecha a conexão com o índice."""
+        self.conn.close()
+
+    def __enter__(self) -> "DuplicateIndex":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def unpack(blob: bytes) -> List[int]:
+    """Assinatura gravada no banco."""
+    return list(struct.unpack(f"{SIGNATURE_SIZE}Q", blob))
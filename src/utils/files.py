@@ -1,34 +1,31 @@
-from typing import Dict
+from typing import Dict, Iterable, Iterator
 import fitz, os, logging
-from rich.table import Table
-from rich import box
-from rich.console import Console
 from src.utils.validator import abs_path
+from src.utils.console import get_console
+from src.utils.profiler import profiler
 
-console = Console()
 logger = logging.getLogger(__name__)
 
+MARKDOWN_DIR = "output/markdown"
+
 def open_pdf(pdf_path: str) -> fitz.Document:
     """Abre o PDF utilizando o pymupdf."""
     logger.debug(f"Abrindo o PDF: {pdf_path}")
     return fitz.open(pdf_path)
 
-def get_text(doc: fitz.Document) -> str :
-    """Extrai o texto que será resumido."""
-    logger.debug("Extraindo texto do documento.")
-    full_text = ""
-    try:
-        for page in doc:
-            full_text += page.get_text() + "\n"
-        return full_text
-    except Exception as e:
-        logger.error(f"Ocorreu um erro extraindo o texto do documento - {e}")   
+def iter_text(doc: fitz.Document) -> Iterator[str]:
+    """Produz o texto do documento página a página."""
+    for page in doc:
+        yield page.get_text() + "\n"
 
-def format_output(metadata: Dict) -> str:
+def format_output(metadata: Dict, show: bool = True) -> str:
     """Constroi a saída dos dados extraidos do pdf."""
     logger.debug("Formatando a saída dos metadados extraidos.")
 
-    top_10, sections = console_print(metadata)
+    if show:
+        top_10, sections = console_print(metadata)
+    else:
+        top_10, sections = format_lists(metadata)
 
     markdown_output = (
         "## Dados Extraídos\n\n"
@@ -39,7 +36,7 @@ def format_output(metadata: Dict) -> str:
         f"| **Vocabulário Único** | {metadata['num_voc']} |\n"
         f"| **Tamanho (KB)** | {metadata['size_kb']:.2f} |\n\n"
         
-        "### Top 10 Palavras\n"
+        f"### Top {metadata.get('top_k', 10)} Palavras\n"
         f"{top_10}\n\n"
         
         "### Estrutura de Seções\n"
@@ -52,6 +49,8 @@ def console_print(metadata: Dict):
     """Imprime no console os metadados extraidos do PDF."""
 
     logger.debug("Formatando a saída dos metadados extraidos.")
+    from rich.table import Table
+    from rich import box
     
     table = Table(title="Metadados Extraídos do PDF", box=box.ROUNDED, show_header=True, header_style="bold magenta")
 
@@ -63,50 +62,82 @@ def console_print(metadata: Dict):
     table.add_row("Número de Vocabulário", str(metadata['num_voc']))
     table.add_row("Tamanho (KB)", f"{metadata['size_kb']:.2f}")
     
-    top_10 = ", ".join([f"{word} ({count})" for word, count in metadata['top_10']])
-    table.add_row("Top 10 Palavras", top_10)
-
-    sections = "\n".join([f"• {t}" for t in metadata['titles']])
+    top_10, sections = format_lists(metadata)
+    table.add_row(f"Top {metadata.get('top_k', 10)} Palavras", top_10)
     table.add_row("Seções", sections)
 
-    console.print(table)
+    get_console().print(table)
 
     return top_10, sections
 
-def pixmap(pdf: str, xref: str, name_image: str, image_index: int, page_index: int, dir: str) -> str:
-    """Cria o Pixmap, converte para RGB, salva a imagem no diretorio."""
-    logger.debug(f"Salvando imagem xref {xref} da página {page_index}.")
-    output_dir = f"output/imagens/{dir}"
-    os.makedirs(output_dir, exist_ok=True)
-    
-    try:
-        pix = fitz.Pixmap(pdf, xref) 
-
-        if pix.n - pix.alpha > 3: 
-            pix = fitz.Pixmap(fitz.csRGB, pix)
+def format_lists(metadata: Dict):
+    """Formata as palavras mais citadas e as seções do PDF."""
+    top_10 = ", ".join([f"{word} ({count})" for word, count in metadata['top_10']])
+    sections = "\n".join([f"• {t}" for t in metadata['titles']])
 
-        file_path = os.path.join(output_dir, f"{name_image}_pg{page_index}_img{image_index}.png")
-        pix.save(file_path)
-        logger.debug(f"Imagem salva: {file_path}")
-        pix = None
-    except Exception as e:
-        logger.error(f"Falha ao salvar imagem xref {xref}: {e}")
+    return top_10, sections
 
-    return abs_path(output_dir)
+def markdown_path(filename: str, directory: str = MARKDOWN_DIR) -> str:
+    """Caminho do arquivo markdown gerado para o documento."""
+    return os.path.join(directory, f"{filename}.md")
 
-def make_markdown(summarize: str = None, metadata: str = None, filename: str = None):
+def make_markdown(summarize: str = None, metadata: str = None, filename: str = None, directory: str = MARKDOWN_DIR):
     """Cria o arquivo markdown com os dados extraidos e/ou resumo."""
     logger.debug(f"Criando arquivo markdown: {filename}.md")
-    path = f"output/markdown/{filename}.md"
-    os.makedirs("output/markdown", exist_ok=True)
-    markdown = open(path, "w", encoding="utf-8-sig")
+    path = markdown_path(filename, directory)
+    os.makedirs(directory, exist_ok=True)
+
+    # Escreve em um arquivo temporário e renomeia: o markdown só existe quando está completo.
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8-sig") as markdown:
+        if summarize != None:
+            markdown.write(summarize + "\n\n")
+        if metadata != None:
+            markdown.write(metadata + "\n\n")
+
+    os.replace(tmp_path, path)
+    profiler.count("markdown_bytes_written", os.path.getsize(path))
 
     path = abs_path(path)
     logger.info(f"Arquivo markdown criado em: {path}")
 
-    if summarize != None:
-        markdown.write(summarize + "\n\n")
-    if metadata != None:
-        markdown.write(metadata + "\n\n")
-    
-    markdown.close()
\ No newline at end of file
+def stream_markdown(tokens: Iterable[str], filename: str, metadata: str = None) -> Iterator[str]:
+    """
+    Grava o resumo no markdown à medida que os tokens chegam e os repassa adiante. O arquivo é escrito
+    em um temporário, renomeado só quando o resumo termina: uma falha da LLM no meio não deixa um
+    markdown truncado. Os espaços nas pontas são removidos como no resumo guardado no cache, para
+    que o markdown seja igual ao gerado sem streaming.
+    """
+    logger.debug(f"Transmitindo resumo para o arquivo markdown: {filename}.md")
+    path = markdown_path(filename)
+    os.makedirs(MARKDOWN_DIR, exist_ok=True)
+
+    tmp_path = f"{path}.tmp"
+    complete = False
+    try:
+        with open(tmp_path, "w", encoding="utf-8-sig") as markdown:
+            started = False
+            # Espaços no fim do que já chegou: só são gravados se vier mais texto depois deles.
+            pending = ""
+            for token in tokens:
+                text = token if started else token.lstrip()
+                started = started or bool(text)
+                body = pending + text
+                stripped = body.rstrip()
+                markdown.write(stripped)
+                markdown.flush()
+                pending = body[len(stripped):]
+                yield token
+
+            markdown.write("\n\n")
+            if metadata != None:
+                markdown.write(metadata + "\n\n")
+
+        os.replace(tmp_path, path)
+        complete = True
+    finally:
+        if not complete and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    profiler.count("markdown_bytes_written", os.path.getsize(path))
+    logger.info(f"Arquivo markdown criado em: {abs_path(path)}")
@@ -0,0 +1,150 @@
+import hashlib, logging, os, sqlite3, threading, time
+from typing import Dict, List
+from src.utils.text import index_tokens
+from src.utils.validator import abs_path
+
+logger = logging.getLogger(__name__)
+
+INDEX_PATH = "output/index.sqlite"
+
+# Identificador de cada linha do índice: documento nos bits altos e página nos baixos (0 é o resumo).
+PAGE_BITS = 20
+
+# Pesos do BM25 por coluna: texto da página, títulos das seções e resumo.
+WEIGHTS = (1.0, 3.0, 2.0)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    filename TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    summary_hash TEXT,
+    page_count INTEGER NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS postings USING fts5(body, titles, summary, tokenize="unicode61 remove_diacritics 2");
+"""
+
+def summary_hash(summary: str) -> str:
+    """Impressão digital do resumo indexado, para não reindexar um documento sem mudanças."""
+    return hashlib.sha256(summary.encode("utf-8")).hexdigest()[:16] if summary else None
+
+def open_index(args) -> "SearchIndex":
+    """Abre o índice de busca se pedido na CLI (--index)."""
+    if not getattr(args, "index", False):
+        return None
+
+    return SearchIndex(getattr(args, "index_path", None) or INDEX_PATH)
+
+class SearchIndex:
+    """
+    Índice invertido do corpus em SQLite FTS5, com uma linha por página (texto e títulos das seções)
+    e uma pelo resumo de cada documento. Os textos já chegam tokenizados por index_tokens, com as
+    mesmas regras da contagem de palavras; o documento é substituído quando o PDF ou o resumo mudam.
+    """
+
+    def __init__(self, path: str = INDEX_PATH, readonly: bool = False):
+        self.path = path
+        if readonly:
+            if not os.path.exists(path):
+                raise ValueError(f"[ERROR]: Índice de busca não encontrado: {abs_path(path)} (gere-o com --index).")
+            self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(SCHEMA)
+            # A ordenação por "rank" usa o BM25 com os pesos das colunas e é otimizada pelo FTS5.
+            self.conn.execute("INSERT INTO postings (postings, rank) VALUES ('rank', ?)", (f"bm25({', '.join(map(str, WEIGHTS))})",))
+            self.conn.commit()
+        # No servidor, os documentos terminam em threads diferentes.
+        self.lock = threading.Lock()
+        self.added = 0
+        self.skipped = 0
+
+    def add(self, result: Dict, summary: str = None):
+        """Indexa um documento concluído a partir do resultado da extração (campos "index" e "fingerprint")."""
+        entry = result.get("index")
+        if entry is None:
+            return
+
+        with self.lock:
+            self.write(result["path"], result["filename"], result["fingerprint"], entry, summary)
+
+    def write(self, path: str, filename: str, fingerprint: str, entry: Dict, summary: str = None):
+        """Substitui as linhas do documento, a menos que o PDF e o resumo sejam os já indexados."""
+        digest = summary_hash(summary)
+        row = self.conn.execute("SELECT id, fingerprint, summary_hash FROM documents WHERE path = ?", (path,)).fetchone()
+        if row and row[1] == fingerprint and (row[2] == digest or summary is None):
+            self.skipped += 1
+            logger.debug(f"Documento já indexado, sem mudanças: {path}")
+            return
+
+        pages, titles = entry["pages"], entry["titles"]
+        with self.conn:
+            if row:
+                doc_id = row[0]
+                self.conn.execute("DELETE FROM postings WHERE rowid BETWEEN ? AND ?", (doc_id << PAGE_BITS, ((doc_id + 1) << PAGE_BITS) - 1))
+                self.conn.execute(
+                    "UPDATE documents SET filename = ?, fingerprint = ?, summary_hash = ?, page_count = ?, updated = ? WHERE id = ?",
+                    (filename, fingerprint, digest, len(pages), time.time(), doc_id)
+                )
+            else:
+                doc_id = self.conn.execute(
+                    "INSERT INTO documents (path, filename, fingerprint, summary_hash, page_count, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                    (path, filename, fingerprint, digest, len(pages), time.time())
+                ).lastrowid
+
+            base = doc_id << PAGE_BITS
+            if summary:
+                self.conn.execute("INSERT INTO postings (rowid, body, titles, summary) VALUES (?, '', '', ?)", (base, " ".join(index_tokens(summary))))
+            self.conn.executemany(
+                "INSERT INTO postings (rowid, body, titles, summary) VALUES (?, ?, ?, '')",
+                ((base + number, body, " ".join(index_tokens(title or ""))) for number, (body, title) in enumerate(zip(pages, titles), start=1) if body or title)
+            )
+
+        self.added += 1
+        logger.debug(f"Documento indexado ({len(pages)} páginas): {path}")
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """Páginas (e resumos) mais relevantes para a consulta, ordenadas pelo BM25."""
+        terms = list(dict.fromkeys(index_tokens(query)))
+        if not terms:
+            return []
+
+        # Qualquer termo casa; o BM25 favorece as páginas com mais termos e termos mais raros.
+        match = " OR ".join(f'"{term}"' for term in terms)
+        with self.lock:
+            rows = self.conn.execute(
+                f"""
+                SELECT p.rowid, p.rank, p.excerpt, d.path, d.filename
+                FROM (
+                    SELECT rowid, rank, snippet(postings, -1, '«', '»', '…', 12) AS excerpt
+                    FROM postings WHERE postings MATCH ? ORDER BY rank LIMIT ?
+                ) AS p JOIN documents AS d ON d.id = p.rowid >> {PAGE_BITS}
+                ORDER BY p.rank
+                """,
+                (match, limit)
+            ).fetchall()
+
+        return [
+            {"path": path, "filename": filename, "page": rowid & ((1 << PAGE_BITS) - 1) or None, "score": round(-score, 4), "snippet": snippet}
+            for rowid, score, snippet, path, filename in rows
+        ]
+
+    def stats(self) -> str:
+        """Resumo do índice para o log."""
+        documents = self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        return f"Índice de busca: {documents} documentos ({self.added} indexados, {self.skipped} sem mudanças) em {abs_path(self.path)}"
+
+    def close(self):
+        """Fecha a conexão com o índice."""
+        self.conn.close()
+
+    def __enter__(self) -> "SearchIndex":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,188 @@
+import json, logging, os, threading, time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List
+from src.utils.validator import abs_path
+
+logger = logging.getLogger(__name__)
+
+# Versão do esquema dos registros; muda quando campos são removidos ou mudam de significado.
+RECORD_VERSION = 1
+
+OUTPUT_DIR = "output/json"
+
+# Formatos estruturados gravados junto com o markdown.
+FORMATS = ("json", "jsonl", "parquet")
+
+@dataclass
+class OutputConfig:
+    """Saídas estruturadas e exibição no console."""
+    # Formatos gravados além do markdown: "json" (um arquivo por documento), "jsonl" e "parquet" (um por execução).
+    formats: tuple = ()
+    # Não exibe tabelas, painéis nem animações do rich no console.
+    quiet: bool = False
+
+    @classmethod
+    def from_args(cls, args, **overrides) -> "OutputConfig":
+        """Monta a configuração a partir dos argumentos da CLI."""
+        values = {
+            "formats": tuple(getattr(args, "output_format", None) or cls.formats),
+            "quiet": getattr(args, "quiet", cls.quiet),
+        }
+        values.update(overrides)
+
+        return cls(**values)
+
+def read_manifest(filename: str) -> List[Dict]:
+    """Imagens gravadas do documento (arquivo, xref e páginas, a partir de 1), lidas do manifesto."""
+    path = f"output/imagens/{filename}/manifest.json"
+    try:
+        with open(path, encoding="utf-8") as f:
+            images = json.load(f).get("images", [])
+    except (OSError, ValueError):
+        return []
+
+    return [{"file": image["file"], "xref": image["xref"], "pages": [page + 1 for page in image["pages"]]} for image in images]
+
+def build_record(result: Dict, metadata: Dict = None, images: bool = False, extract_seconds: float = None) -> Dict:
+    """
+    Registro estruturado do documento a partir do resultado da extração (com o caminho absoluto ou a
+    origem em memória em "path") e dos metadados (antes da formatação em markdown). O resumo e o tempo da LLM entram depois, em finish_record.
+    """
+    metadata = metadata or {}
+    record = {
+        "schema": RECORD_VERSION,
+        "path": result["path"],
+        "filename": result["filename"],
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "page_count": result["page_count"],
+        "size_kb": metadata.get("size_kb"),
+        "num_words": metadata.get("num_words"),
+        "num_voc": metadata.get("num_voc"),
+        "top_k": metadata.get("top_k"),
+        "top_words": [{"word": word, "count": count} for word, count in metadata.get("top_10", [])],
+        "titles": metadata.get("titles", []),
+        "pages": metadata.get("pages", []),
+        "links": list(dict.fromkeys(link for page in metadata.get("pages", []) for link in page["links"])),
+        "images": read_manifest(result["filename"]) if images else [],
+        "summary": None,
+        "duplicate_of": None,
+        "budget": result.get("budget"),
+        "timings": {"extract": extract_seconds, "summary": None},
+    }
+
+    return record
+
+def finish_record(record: Dict, summary: str = None, summary_seconds: float = None, duplicate_of: Dict = None) -> Dict:
+    """Completa o registro com o resumo, o documento de origem (se reaproveitado) e o tempo da etapa da LLM."""
+    record["summary"] = summary
+    record["duplicate_of"] = duplicate_of
+    record["timings"]["summary"] = summary_seconds
+
+    return record
+
+def write_atomic(path: str, data: str):
+    """Grava o arquivo por um temporário renomeado ao final."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+class RecordWriter:
+    """
+    Grava os registros de uma execução nos formatos pedidos: JSON por documento e JSONL (uma linha
+    por documento, só acrescentada) à medida que os documentos terminam; Parquet ao final.
+    """
+
+    def __init__(self, config: OutputConfig, name: str):
+        if "parquet" in config.formats:
+            # Falha antes de processar os documentos, não só ao gravar o Parquet no final.
+            import_pyarrow()
+        self.formats = set(config.formats)
+        self.name = name
+        self.records = []
+        # No servidor, os documentos terminam em threads diferentes.
+        self.lock = threading.Lock()
+
+    def add(self, record: Dict):
+        """Grava o registro de um documento concluído."""
+        with self.lock:
+            self.write(record)
+
+    def write(self, record: Dict):
+        """Grava o registro nos formatos por documento e guarda-o para o Parquet."""
+        if "json" in self.formats:
+            path = os.path.join(OUTPUT_DIR, f"{record['filename']}.json")
+            write_atomic(path, json.dumps(record, ensure_ascii=False, indent=2))
+            logger.debug(f"Registro JSON gravado em: {path}")
+
+        if "jsonl" in self.formats:
+            path = os.path.join(OUTPUT_DIR, f"{self.name}.jsonl")
+            os.makedirs(OUTPUT_DIR, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        if "parquet" in self.formats:
+            self.records.append(record)
+
+    def close(self):
+        """Grava o Parquet com todos os registros da execução."""
+        with self.lock:
+            records, self.records = self.records, []
+        if "parquet" in self.formats and records:
+            write_parquet(records, os.path.join(OUTPUT_DIR, f"{self.name}.parquet"))
+
+        written = [fmt for fmt in FORMATS if fmt in self.formats]
+        if written:
+            logger.info(f"Registros estruturados ({', '.join(written)}) gravados em: {abs_path(OUTPUT_DIR)}")
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def import_pyarrow():
+    """Importa o pyarrow, dependência opcional usada apenas pelo formato Parquet."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ValueError("[ERROR]: O pyarrow não está instalado (pip install pyarrow).")
+
+    return pyarrow, pyarrow.parquet
+
+def record_schema(pa) -> object:
+    """Esquema Arrow dos registros, fixo para que arquivos de execuções diferentes possam ser lidos juntos."""
+    return pa.schema([
+        ("schema", pa.int32()),
+        ("path", pa.string()),
+        ("filename", pa.string()),
+        ("created", pa.string()),
+        ("page_count", pa.int32()),
+        ("size_kb", pa.float64()),
+        ("num_words", pa.int64()),
+        ("num_voc", pa.int64()),
+        ("top_k", pa.int32()),
+        ("top_words", pa.list_(pa.struct([("word", pa.string()), ("count", pa.int64())]))),
+        ("titles", pa.list_(pa.string())),
+        ("pages", pa.list_(pa.struct([("page", pa.int32()), ("titles", pa.list_(pa.string())), ("links", pa.list_(pa.string()))]))),
+        ("links", pa.list_(pa.string())),
+        ("images", pa.list_(pa.struct([("file", pa.string()), ("xref", pa.int64()), ("pages", pa.list_(pa.int32()))]))),
+        ("summary", pa.string()),
+        ("duplicate_of", pa.struct([("path", pa.string()), ("similarity", pa.float64())])),
+        ("budget", pa.struct([("tokens_before", pa.int64()), ("tokens_after", pa.int64()), ("tokens_saved", pa.int64()), ("boilerplate", pa.int32())])),
+        ("timings", pa.struct([("extract", pa.float64()), ("summary", pa.float64())])),
+    ])
+
+def write_parquet(records: List[Dict], path: str):
+    """Grava os registros em Parquet, com uma linha por documento e os campos aninhados como listas e structs."""
+    pa, pq = import_pyarrow()
+
+    start = time.perf_counter()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(pa.Table.from_pylist(records, schema=record_schema(pa)), tmp_path)
+    os.replace(tmp_path, path)
+    logger.debug(f"{len(records)} registros gravados em {path} em {time.perf_counter() - start:.2f}s.")
@@ -0,0 +1,210 @@
+import asyncio, logging
+from typing import Dict, Iterator, Optional
+from src.utils.cache import ResultCache, file_hash, EXTRACTOR_VERSION
+from src.utils.state import PageState
+from src.utils.profiler import profiler
+from src.pdf.walker import read_document
+from src.pdf.extractor import extract_metadata
+from src.pdf.image import save_images
+from src.pdf.config import ImageConfig, OcrConfig
+from src.llm.config import SummaryConfig
+from src.llm.budget import prepare_text
+from src.utils.dedup import DuplicateIndex, minhash_signature, summary_variant
+from src.utils.source import PdfSource
+from src.utils.validator import abs_path
+
+logger = logging.getLogger(__name__)
+
+def extract_stage(doc, pdf_path: str, extract_text: bool, extract_img: bool, extract_sum: bool, name_image: str, filename: str, workers: int = 1, cache: ResultCache = None, config: SummaryConfig = None, top_k: int = 10, image_config: ImageConfig = None, ocr_config: OcrConfig = None, index: bool = False, dedup: bool = False, source: PdfSource = None) -> Dict:
+    """
+    Etapa de CPU: metadados, texto e imagens, consultando o cache antes de percorrer o PDF. Com index,
+    devolve também as palavras e os títulos de cada página para o índice de busca; com dedup, a
+    assinatura MinHash dessas palavras para a detecção de documentos quase idênticos. Com source
+    (PDF em memória ou mapeado), o hash e o tamanho vêm do buffer, sem reler o arquivo.
+    """
+    cache = cache or ResultCache(enabled=False)
+    config = config or SummaryConfig()
+
+    digest = source.digest() if source is not None and (cache.enabled or index or dedup) else None
+    size = source.size if source is not None else None
+    doc_key = fingerprint = cache.document_key(pdf_path, digest)
+    if doc_key and ocr_config and ocr_config.enabled:
+        # O texto depende do OCR: resolução, idiomas e se o Tesseract está disponível.
+        from src.pdf.ocr import find_tessdata
+        doc_key = cache.key(doc_key, "ocr", ocr_config.dpi, ocr_config.language, find_tessdata())
+    summary_key = cache.summary_key(doc_key, config) if extract_sum else None
+    text_key = cache.text_key(doc_key, config)
+
+    metadata_key = cache.key(doc_key, "top_k", top_k) if doc_key else None
+    metadata = cache.get("metadata", metadata_key) if extract_text else None
+    summary = cache.get("summary", summary_key) if extract_sum else None
+    text = cache.get_text(text_key) if extract_sum and summary is None else None
+    # Os títulos de cada página acompanham o texto: os trechos do resumo são cortados nas seções.
+    titles_key = cache.key(text_key, "titles") if text_key else None
+    tokens_key = cache.key(doc_key, "tokens") if doc_key else None
+    tokens = cache.get("tokens", tokens_key) if index or dedup else None
+    budget = None
+
+    need_metadata = extract_text and metadata is None
+    need_text = extract_sum and summary is None and text is None
+    need_tokens = (index or dedup) and tokens is None
+    titles = metadata["titles"] if metadata else ()
+    if text is not None and not metadata:
+        titles = cache.get("titles", titles_key) or ()
+
+    if need_metadata or need_text or need_tokens or extract_img:
+        # O estado por página acompanha o cache: só as páginas alteradas desde a última execução são lidas.
+        # Fica associado ao caminho absoluto do PDF ou, em memória, ao hash do conteúdo.
+        location = abs_path(pdf_path) if source is None or source.path else f"memória:{digest}"
+        state = PageState(filename, location, fresh=cache.refresh) if cache.enabled else None
+
+        try:
+            with profiler.stage("read_document", pages=doc.page_count):
+                data = read_document(
+                    doc,
+                    text=need_text,
+                    titles=need_metadata or need_tokens or need_text,
+                    links=need_metadata,
+                    images=extract_img,
+                    workers=workers,
+                    words=need_metadata,
+                    state=state,
+                    ocr=ocr_config,
+                    cache=cache,
+                    tokens=need_tokens
+                )
+
+            if state is not None:
+                state.save(data["pages"])
+        finally:
+            if state is not None:
+                state.close()
+
+        if need_metadata:
+            with profiler.stage("extract_metadata"):
+                metadata = extract_metadata(doc, pdf_path, data, top_k, size)
+            cache.put("metadata", metadata_key, metadata)
+            titles = data["titles"]
+
+        if need_text:
+            # O texto guardado já é o preparado para a LLM.
+            text, budget = prepare_text(data, config)
+            cache.put_text(text_key, text)
+            cache.put("titles", titles_key, data["titles"])
+            if not metadata:
+                titles = data["titles"]
+
+        if need_tokens:
+            tokens = {"pages": data["tokens"], "titles": data["titles"]}
+            cache.put("tokens", tokens_key, tokens)
+
+        if extract_img:
+            with profiler.stage("save_images"):
+                save_images(doc, data["images"], name_image, filename, image_config, data.get("reused", ()))
+
+    return {
+        "page_count": doc.page_count,
+        "metadata": metadata,
+        "text": text,
+        "titles": titles,
+        "summary": summary,
+        "summary_key": summary_key,
+        "budget": budget,
+        # O PDF é identificado pelo conteúdo, como no cache (com ou sem ele), para reindexar só o que mudou.
+        "fingerprint": fingerprint or cache.key(digest or file_hash(pdf_path), EXTRACTOR_VERSION) if index or dedup else None,
+        "index": tokens if index else None,
+        "signature": minhash_signature(tokens["pages"]) if dedup else None,
+    }
+
+def reuse_duplicate(result: Dict, duplicates: DuplicateIndex, config: SummaryConfig) -> bool:
+    """
+    Antes da LLM: se um documento quase idêntico já foi resumido, usa o resumo dele (com uma nota da
+    origem) e marca o resultado em "duplicate_of". Retorna se o resumo foi reaproveitado.
+    """
+    if duplicates is None or result["summary"] is not None or result.get("signature") is None:
+        return False
+
+    match = duplicates.match(result["path"], result["signature"], summary_variant(config))
+    if match is None:
+        return False
+
+    use_duplicate(result, match, match["summary"])
+    return True
+
+def use_duplicate(result: Dict, match: Dict, summary: str):
+    """Usa o resumo do documento quase idêntico, com uma nota da origem, e marca o resultado em "duplicate_of"."""
+    result["duplicate_of"] = {"path": match["path"], "similarity": match["similarity"]}
+    result["summary"] = f"> Resumo reaproveitado de '{match['filename']}', documento quase idêntico (similaridade {match['similarity']:.2f}).\n\n{summary}"
+
+def claim_summary(result: Dict, duplicates: DuplicateIndex, config: SummaryConfig) -> Optional[Dict]:
+    """
+    Depois do reuse_duplicate, para documentos resumidos ao mesmo tempo: marca o resumo como em
+    andamento ou, se um quase idêntico já está sendo resumido, retorna ele com o futuro do resumo.
+    """
+    if duplicates is None or result["summary"] is not None or result.get("signature") is None:
+        return None
+
+    return duplicates.claim(result["path"], result["filename"], result["signature"], summary_variant(config))
+
+def follow_duplicate(result: Dict, duplicates: DuplicateIndex, pending: Dict, summary: str) -> bool:
+    """Usa o resumo do documento que estava em andamento; se ele falhou, o documento é resumido normalmente."""
+    if summary is None:
+        return False
+
+    duplicates.count_reuse(pending)
+    use_duplicate(result, pending, summary)
+    return True
+
+def release_summary(result: Dict, duplicates: DuplicateIndex, summary: str = None):
+    """Conclui o resumo marcado por claim_summary, depois de gravado pelo register_document."""
+    if duplicates is not None:
+        duplicates.release(result["path"], summary)
+
+def register_document(result: Dict, duplicates: DuplicateIndex, config: SummaryConfig, summary: str = None):
+    """Depois da LLM: grava a assinatura do documento e o resumo gerado (não o reaproveitado)."""
+    if duplicates is None or result.get("signature") is None:
+        return
+
+    original = summary if not result.get("duplicate_of") else None
+    duplicates.add(result["path"], result["filename"], result["fingerprint"], result["signature"], summary_variant(config) if original else None, original)
+
+def summary_stage(result: Dict, config: SummaryConfig = None, cache: ResultCache = None) -> str:
+    """Etapa da LLM: reaproveita o resumo em cache ou gera um novo."""
+    if result["summary"] is not None:
+        logger.debug("Resumo reaproveitado do cache.")
+        return result["summary"]
+
+    if config and config.use_async:
+        summa = asyncio.run(run_async_summary(result, config, cache))
+    else:
+        from src.llm.summarize import summarize_text
+        summa = summarize_text(result["text"], config, result["titles"], cache)
+
+    if cache:
+        cache.put("summary", result["summary_key"], summa)
+
+    return summa
+
+def stream_summary_stage(result: Dict, config: SummaryConfig = None, cache: ResultCache = None) -> Iterator[str]:
+    """Etapa da LLM em modo streaming: repassa os tokens e guarda o resumo completo no cache."""
+    if result["summary"] is not None:
+        logger.debug("Resumo reaproveitado do cache.")
+        yield result["summary"]
+        return
+
+    from src.llm.summarize import stream_summary
+
+    parts = []
+    for token in stream_summary(result["text"], config, result["titles"], cache):
+        parts.append(token)
+        yield token
+
+    if cache:
+        cache.put("summary", result["summary_key"], "".join(parts).strip())
+
+async def run_async_summary(result: Dict, config: SummaryConfig, cache: ResultCache = None) -> str:
+    """Resume um documento pelo cliente assíncrono, enviando os trechos de forma concorrente."""
+    from src.llm.async_client import AsyncLLMSession, asummarize_text
+
+    async with AsyncLLMSession.from_config(config) as session:
+        return await asummarize_text(session, result["text"], config, result["titles"], cache)
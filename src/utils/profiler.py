@@ -0,0 +1,218 @@
+import json, logging, os, threading, time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = "output/profile"
+
+class Profiler:
+    """
+    Temporizadores e contadores por etapa. Desativado, cada chamada só verifica uma flag; ativado
+    (--profile), acumula o tempo de cada etapa, os contadores e um evento por etapa para o trace JSONL.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Descarta as medições acumuladas."""
+        self.started = time.time()
+        self.stages = {}
+        self.counters = Counter()
+        self.events = []
+
+    def enable(self):
+        """Ativa a coleta (também usado como initializer dos processos trabalhadores)."""
+        self.enabled = True
+
+    @contextmanager
+    def stage(self, name: str, trace: bool = True, **fields):
+        """Mede o bloco como uma etapa; com trace=False só acumula (etapas por página)."""
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - start, trace, fields)
+
+    def add_stage(self, name: str, seconds: float, trace: bool = True, fields: Dict = None):
+        """Registra a duração de uma etapa."""
+        with self.lock:
+            calls, total, slowest = self.stages.get(name, (0, 0.0, 0.0))
+            self.stages[name] = (calls + 1, total + seconds, max(slowest, seconds))
+            if trace:
+                self.events.append({"type": "stage", "name": name, "time": round(time.time(), 6), "seconds": round(seconds, 6), **(fields or {})})
+
+    def count(self, name: str, value: int = 1):
+        """Soma ao contador (páginas, spans, imagens, bytes, tokens)."""
+        if self.enabled:
+            with self.lock:
+                self.counters[name] += value
+
+    def drain(self) -> Dict:
+        """Retorna e descarta as medições do processo atual, para enviá-las ao processo principal."""
+        if not self.enabled:
+            return None
+
+        with self.lock:
+            snapshot = {"stages": self.stages, "counters": dict(self.counters), "events": self.events}
+            self.stages, self.counters, self.events = {}, Counter(), []
+
+        return snapshot
+
+    def merge(self, snapshot: Dict, **fields):
+        """Incorpora as medições de um processo trabalhador."""
+        if not snapshot:
+            return
+
+        with self.lock:
+            for name, (calls, total, slowest) in snapshot["stages"].items():
+                old_calls, old_total, old_slowest = self.stages.get(name, (0, 0.0, 0.0))
+                self.stages[name] = (old_calls + calls, old_total + total, max(old_slowest, slowest))
+            self.counters.update(snapshot["counters"])
+            self.events.extend({**event, **fields} for event in snapshot["events"])
+
+    def summary(self) -> Dict:
+        """Etapas e contadores acumulados."""
+        return {
+            "elapsed": round(time.time() - self.started, 6),
+            "stages": {name: {"calls": calls, "seconds": round(total, 6), "max": round(slowest, 6)} for name, (calls, total, slowest) in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+    def write_trace(self, name: str) -> str:
+        """Grava os eventos e o resumo final em output/profile/<name>.jsonl."""
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"{name}.jsonl")
+
+        with open(path, "w", encoding="utf-8") as f:
+            for event in self.events:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+            f.write(json.dumps({"type": "summary", **self.summary()}, ensure_ascii=False) + "\n")
+
+        return path
+
+    def print_report(self):
+        """Imprime a tabela de etapas e contadores."""
+        from rich.table import Table
+        from rich import box
+        from src.utils.console import get_console
+
+        summary = self.summary()
+        table = Table(
+            title="Perfil da Execução",
+            caption="Etapas em processos ou threads paralelos podem somar mais que 100%.",
+            box=box.ROUNDED,
+            show_header=True,
+            header_style="bold magenta"
+        )
+
+        table.add_column("Etapa", style="cyan", no_wrap=True)
+        table.add_column("Chamadas", justify="right")
+        table.add_column("Total (s)", justify="right")
+        table.add_column("Máx. (s)", justify="right")
+        table.add_column("% do tempo", justify="right")
+
+        elapsed = summary["elapsed"] or 1e-9
+        for name, stage in sorted(summary["stages"].items(), key=lambda item: -item[1]["seconds"]):
+            table.add_row(name, str(stage["calls"]), f"{stage['seconds']:.3f}", f"{stage['max']:.3f}", f"{stage['seconds'] / elapsed:.1%}")
+
+        get_console().print(table)
+
+        if summary["counters"]:
+            counters = Table(title="Contadores", box=box.ROUNDED, show_header=True, header_style="bold magenta")
+            counters.add_column("Contador", style="cyan", no_wrap=True)
+            counters.add_column("Valor", justify="right")
+            for name, value in sorted(summary["counters"].items()):
+                counters.add_row(name, f"{value:,}".replace(",", "."))
+            get_console().print(counters)
+
+profiler = Profiler()
+
+@contextmanager
+def capture(kind: str, name: str):
+    """Captura o perfil de CPU do bloco com cProfile (.prof) ou pyinstrument (.html), se pedido."""
+    if kind is None:
+        yield
+        return
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+
+    if kind == "cprofile":
+        import cProfile
+        path = os.path.join(PROFILE_DIR, f"{name}.prof")
+        cpu = cProfile.Profile()
+        cpu.enable()
+        try:
+            yield
+        finally:
+            cpu.disable()
+            cpu.dump_stats(path)
+    elif kind == "pyinstrument":
+        try:
+            from pyinstrument import Profiler as SamplingProfiler
+        except ImportError:
+            raise ValueError("[ERROR]: O pyinstrument não está instalado (pip install pyinstrument).")
+        path = os.path.join(PROFILE_DIR, f"{name}.html")
+        cpu = SamplingProfiler()
+        cpu.start()
+        try:
+            yield
+        finally:
+            cpu.stop()
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(cpu.output_html())
+    else:
+        raise ValueError(f"[ERROR]: Perfilador desconhecido: {kind}")
+
+    logger.info(f"Perfil de CPU gravado em: {os.path.abspath(path)}")
+
+def run_profiled(func, args, name: str, trace: bool, cpu: str = None):
+    """Executa a ação com a instrumentação ligada e grava a tabela, o trace e o perfil de CPU."""
+    if trace:
+        profiler.enable()
+        profiler.reset()
+
+    with capture(cpu, name):
+        with profiler.stage("total"):
+            func(args)
+
+    if trace:
+        path = profiler.write_trace(name)
+        profiler.print_report()
+        logger.info(f"Trace da execução gravado em: {os.path.abspath(path)}")
+
+def worker_call(func, *args, **kwargs):
+    """Executa func em um processo trabalhador e devolve o resultado junto com as medições do processo."""
+    profiler.enable()
+    # Com fork, o trabalhador herda as medições do processo principal: só as próprias devem voltar.
+    profiler.reset()
+
+    return func(*args, **kwargs), profiler.drain()
+
+def submit_profiled(executor, func, *args, **kwargs):
+    """Envia func ao pool; com a coleta ativa, as medições do trabalhador voltam junto com o resultado."""
+    if not profiler.enabled:
+        return executor.submit(func, *args, **kwargs)
+
+    future = executor.submit(worker_call, func, *args, **kwargs)
+    future.profiled = True
+
+    return future
+
+def collect_profiled(future, value, **fields):
+    """Separa o resultado de um future enviado com submit_profiled, incorporando as medições do trabalhador."""
+    if not getattr(future, "profiled", False):
+        return value
+
+    value, snapshot = value
+    profiler.merge(snapshot, **fields)
+
+    return value
@@ -0,0 +1,307 @@
+import json, logging, os, threading, time, uuid
+from collections import OrderedDict
+from dataclasses import replace
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import urlparse, parse_qs
+from src.utils.batch import extract_document, finish_document
+from src.utils.cache import ResultCache
+from src.utils.profiler import submit_profiled, collect_profiled
+from src.utils.validator import abs_path
+from src.utils.files import markdown_path
+from src.utils.output import OutputConfig, RecordWriter
+from src.utils.index import SearchIndex
+from src.utils.dedup import DuplicateIndex
+from src.llm.config import SummaryConfig
+from src.pdf.config import ImageConfig, OcrConfig
+
+logger = logging.getLogger(__name__)
+
+# Jobs aguardando ou em execução aceitos antes de recusar novos pedidos (HTTP 503).
+MAX_PENDING = 256
+
+# Jobs concluídos mantidos para consulta; os mais antigos são descartados.
+MAX_FINISHED = 1000
+
+# Tempo máximo de espera de uma consulta com ?wait=S.
+MAX_WAIT = 60
+
+def warm_up() -> int:
+    """Tarefa vazia que só força a criação do processo trabalhador (com o PyMuPDF já importado)."""
+    return os.getpid()
+
+class JobQueue:
+    """Fila de jobs do servidor: extração em processos, resumo em threads e contadores para as métricas."""
+
+    def __init__(self, extract_jobs: int = 1, llm_jobs: int = 1, config: SummaryConfig = None, cache: ResultCache = None, image_config: ImageConfig = None, ocr_config: OcrConfig = None, output: OutputConfig = None, index: SearchIndex = None, duplicates: DuplicateIndex = None, use_mmap: bool = False):
+        self.extract_jobs = extract_jobs
+        self.llm_jobs = llm_jobs
+        self.config = config or SummaryConfig()
+        self.cache = cache or ResultCache(enabled=False)
+        self.image_config = image_config or ImageConfig()
+        self.ocr_config = ocr_config or OcrConfig()
+        self.writer = RecordWriter(output or OutputConfig(), "servidor")
+        self.index = index
+        self.duplicates = duplicates
+        self.use_mmap = use_mmap
+        self.cpu_pool = ProcessPoolExecutor(max_workers=extract_jobs)
+        self.llm_pool = ThreadPoolExecutor(max_workers=llm_jobs)
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.counts = {"queued": 0, "extracting": 0, "summarizing": 0, "done": 0, "failed": 0}
+        self.latencies = []
+
+    def warm(self, summarize: bool = True):
+        """Cria os processos de extração e, se pedido, a cadeia da LLM antes do primeiro job."""
+        pids = {future.result() for future in [self.cpu_pool.submit(warm_up) for _ in range(self.extract_jobs)]}
+        logger.debug(f"Processos de extração prontos: {sorted(pids)}")
+
+        if summarize:
+            from src.llm.model import make_prompt, make_partial_prompt
+            # Com small_model, os documentos curtos e os longos usam modelos diferentes.
+            for model in {self.config.model.route(0), self.config.model.route(float("inf"))}:
+                make_prompt(model)
+                make_partial_prompt(model)
+            logger.debug("Cadeias da LLM prontas.")
+
+    def pending(self) -> int:
+        """Jobs ainda não concluídos."""
+        return self.counts["queued"] + self.counts["extracting"] + self.counts["summarizing"]
+
+    def set_status(self, job: Dict, status: str):
+        """Atualiza o estado do job e os contadores."""
+        with self.lock:
+            self.counts[job["status"]] -= 1
+            self.counts[status] += 1
+            job["status"] = status
+
+            if status in ("done", "failed"):
+                job["finished"] = time.time()
+                self.latencies.append(job["finished"] - job["created"])
+                self.latencies = self.latencies[-MAX_FINISHED:]
+                job["event"].set()
+
+    def submit(self, request: Dict) -> Dict:
+        """Valida o pedido e coloca o job na fila."""
+        path = request.get("path")
+        if not path or not os.path.isfile(path) or not str(path).lower().endswith(".pdf"):
+            raise ValueError(f"[ERROR]: PDF não encontrado: {path}")
+
+        actions = {action: bool(request.get(action)) for action in ("text", "image", "summarize")}
+        if not any(actions.values()):
+            raise ValueError("[ERROR]: Nenhuma ação especificada (text, image ou summarize).")
+
+        top_k = int(request.get("top_k") or 10)
+        if top_k < 1:
+            raise ValueError(f"[ERROR]: top_k precisa ser maior que zero: {top_k}")
+
+        # O job pode pedir outro modelo do mesmo backend, no lugar do roteamento configurado.
+        config = self.config
+        if request.get("model"):
+            config = replace(config, model=replace(config.model, name=str(request["model"]), small_model=None))
+
+        with self.lock:
+            if self.pending() >= MAX_PENDING:
+                raise OverflowError(f"[ERROR]: Fila cheia ({MAX_PENDING} jobs pendentes).")
+
+            job = {
+                "id": uuid.uuid4().hex,
+                "status": "queued",
+                "path": os.path.abspath(path),
+                "actions": actions,
+                "model": request.get("model"),
+                "created": time.time(),
+                "finished": None,
+                "result": None,
+                "error": None,
+                "event": threading.Event(),
+            }
+            self.jobs[job["id"]] = job
+            self.counts["queued"] += 1
+            self.prune()
+
+        future = submit_profiled(
+            self.cpu_pool,
+            extract_document,
+            job["path"],
+            actions["text"],
+            actions["image"],
+            actions["summarize"],
+            request.get("image_name"),
+            self.cache,
+            config,
+            top_k,
+            self.image_config,
+            self.ocr_config,
+            self.index is not None,
+            self.duplicates is not None,
+            self.use_mmap
+        )
+        self.set_status(job, "extracting")
+        future.add_done_callback(lambda f: self.extracted(job, f, config))
+        logger.info(f"Job {job['id'][:8]} recebido: {job['path']}")
+
+        return job
+
+    def extracted(self, job: Dict, future, config: SummaryConfig):
+        """Recebe o resultado da extração e agenda a etapa da LLM e a gravação do markdown."""
+        try:
+            result = collect_profiled(future, future.result(), document=job["path"])
+        except Exception as e:
+            self.fail(job, e)
+            return
+
+        self.cache.hits += result["cache_hits"]
+        self.cache.misses += result["cache_misses"]
+
+        if job["actions"]["summarize"]:
+            self.set_status(job, "summarizing")
+        self.llm_pool.submit(self.finish, job, result, config)
+
+    def finish(self, job: Dict, result: Dict, config: SummaryConfig):
+        """Executa o resumo (se pedido), grava o markdown e guarda o resultado do job."""
+        try:
+            finish_document(result, job["actions"]["summarize"], config, self.cache, self.duplicates)
+        except Exception as e:
+            self.fail(job, e)
+            return
+
+        job["result"] = {
+            "filename": result["filename"],
+            "page_count": result["page_count"],
+            "metadata": result["metadata"],
+            "summary": result["summary"] if job["actions"]["summarize"] else None,
+            "markdown": abs_path(markdown_path(result["filename"])) if result["metadata"] or result["summary"] else None,
+            "images": abs_path(f"output/imagens/{result['filename']}") if job["actions"]["image"] else None,
+            "duplicate_of": result.get("duplicate_of"),
+            "record": result["record"],
+        }
+        self.writer.add(result["record"])
+        if self.index is not None:
+            self.index.add(result, result["record"]["summary"])
+        self.set_status(job, "done")
+        logger.info(f"Job {job['id'][:8]} concluído em {job['finished'] - job['created']:.2f}s.")
+
+    def fail(self, job: Dict, error: Exception):
+        """Marca o job como falho."""
+        job["error"] = str(error)
+        self.set_status(job, "failed")
+        logger.error(f"Job {job['id'][:8]} falhou - {error}")
+
+    def prune(self):
+        """Descarta os jobs concluídos mais antigos além do limite."""
+        finished = [key for key, job in self.jobs.items() if job["status"] in ("done", "failed")]
+        for key in finished[:max(0, len(finished) - MAX_FINISHED)]:
+            del self.jobs[key]
+
+    def describe(self, job: Dict) -> Dict:
+        """Representação do job para a API."""
+        return {key: value for key, value in job.items() if key != "event"}
+
+    def metrics(self) -> Dict:
+        """Contadores da fila, latências dos jobs e do cache."""
+        with self.lock:
+            latencies = sorted(self.latencies)
+            counts = dict(self.counts)
+
+        def percentile(p):
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3) if latencies else None
+
+        return {
+            "uptime": round(time.time() - self.started, 1),
+            "jobs": counts,
+            "latency": {"p50": percentile(0.50), "p95": percentile(0.95), "max": round(latencies[-1], 3) if latencies else None},
+            "workers": {"extract": self.extract_jobs, "llm": self.llm_jobs},
+            "cache": {"hits": self.cache.hits, "misses": self.cache.misses},
+        }
+
+    def shutdown(self):
+        """Encerra os pools, aguardando os jobs em andamento."""
+        self.cpu_pool.shutdown(wait=True)
+        self.llm_pool.shutdown(wait=True)
+        self.writer.close()
+        if self.index is not None:
+            logger.info(self.index.stats())
+            self.index.close()
+        if self.duplicates is not None:
+            logger.info(self.duplicates.stats())
+            self.duplicates.close()
+
+def make_handler(queue: JobQueue):
+    """Cria a classe que atende às requisições HTTP usando a fila informada."""
+
+    class JobHandler(BaseHTTPRequestHandler):
+        """API local: POST /jobs, GET /jobs/<id>[?wait=S], GET /health e GET /metrics."""
+
+        def log_message(self, format, *args):
+            logger.debug(f"HTTP {self.address_string()} - {format % args}")
+
+        def send_json(self, status: int, body: Dict):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+
+            if url.path == "/health":
+                self.send_json(200, {"status": "ok", "pending": queue.pending()})
+            elif url.path == "/metrics":
+                self.send_json(200, queue.metrics())
+            elif url.path.startswith("/jobs/"):
+                job = queue.jobs.get(url.path[len("/jobs/"):])
+                if job is None:
+                    self.send_json(404, {"error": "Job não encontrado."})
+                    return
+
+                try:
+                    wait = float(parse_qs(url.query).get("wait", ["0"])[0])
+                except ValueError:
+                    self.send_json(400, {"error": "O parâmetro wait deve ser um número de segundos."})
+                    return
+
+                if wait > 0:
+                    job["event"].wait(min(wait, MAX_WAIT))
+                self.send_json(200, queue.describe(job))
+            else:
+                self.send_json(404, {"error": "Rota não encontrada."})
+
+        def do_POST(self):
+            if urlparse(self.path).path != "/jobs":
+                self.send_json(404, {"error": "Rota não encontrada."})
+                return
+
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if not isinstance(request, dict):
+                    raise ValueError("[ERROR]: O corpo do pedido deve ser um objeto JSON.")
+                job = queue.submit(request)
+            except OverflowError as e:
+                self.send_json(503, {"error": str(e)})
+                return
+            except (ValueError, TypeError) as e:
+                self.send_json(400, {"error": str(e)})
+                return
+
+            self.send_json(202, queue.describe(job))
+
+    return JobHandler
+
+def serve(host: str, port: int, queue: JobQueue):
+    """Atende à API até ser interrompido."""
+    server = ThreadingHTTPServer((host, port), make_handler(queue))
+    server.daemon_threads = True
+    logger.info(f"Servidor pronto em http://{host}:{server.server_port} ({queue.extract_jobs} processos de extração, {queue.llm_jobs} chamadas à LLM).")
+
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        queue.shutdown()
+        logger.info("Servidor encerrado.")
@@ -0,0 +1,88 @@
+import hashlib, logging, mmap, os, sys
+from pathlib import Path
+from typing import Optional, Union
+import fitz
+from src.utils.cache import file_hash
+from src.utils.validator import abs_path, define_name
+
+logger = logging.getLogger(__name__)
+
+# Nome dos documentos lidos da entrada padrão (-p -).
+STDIN_NAME = "stdin"
+
+class PdfSource:
+    """
+    Origem do PDF: caminho em disco, bytes em memória (entrada padrão, downloads, filas) ou arquivo
+    mapeado em memória. O conteúdo em memória é repassado ao PyMuPDF e ao hash do cache como um
+    memoryview, sem cópias nem arquivos temporários; o tamanho vem do próprio buffer.
+    """
+
+    def __init__(self, name: str, path: Optional[str] = None, data: Union[bytes, bytearray, mmap.mmap] = None, size: int = None):
+        self.name = name
+        self.path = path
+        self.data = data
+        self.view = memoryview(data) if data is not None else None
+        self.size = len(self.view) if self.view is not None else size
+        self.digest_value = None
+
+    @classmethod
+    def from_path(cls, path: Union[str, Path], use_mmap: bool = False) -> "PdfSource":
+        """PDF em disco; com use_mmap, o arquivo é mapeado em memória em vez de lido pelo PyMuPDF."""
+        path = str(path)
+        if not use_mmap:
+            return cls(define_name(Path(path)), path, size=os.stat(path).st_size)
+
+        with open(path, "rb") as f:
+            # O mapa continua válido depois que o arquivo é fechado.
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(define_name(Path(path)), path, mapped)
+
+    @classmethod
+    def from_bytes(cls, data: Union[bytes, bytearray, memoryview], name: str = "documento") -> "PdfSource":
+        """PDF já em memória, recebido pela API em Python."""
+        return cls(name, data=data)
+
+    @classmethod
+    def from_stdin(cls, name: str = STDIN_NAME) -> "PdfSource":
+        """PDF lido da entrada padrão (-p -)."""
+        data = sys.stdin.buffer.read()
+        if not data:
+            raise ValueError("[ERROR]: Nenhum dado recebido pela entrada padrão.")
+
+        return cls(name, data=data)
+
+    @property
+    def location(self) -> str:
+        """Identificação do documento nos registros e índices: o caminho absoluto ou a origem em memória."""
+        return abs_path(self.path) if self.path else f"memória:{self.name}"
+
+    def open(self) -> fitz.Document:
+        """Abre o PDF; com o caminho junto do buffer, os processos trabalhadores ainda podem reabri-lo."""
+        logger.debug(f"Abrindo o PDF: {self.path or self.name} ({'memória' if self.view is not None else 'disco'})")
+        if self.view is None:
+            return fitz.open(self.path)
+        if self.path:
+            return fitz.open(self.path, stream=self.view)
+
+        return fitz.open(stream=self.view, filetype="pdf")
+
+    def digest(self) -> str:
+        """Hash do conteúdo, calculado uma vez (o do cache para arquivos em disco)."""
+        if self.digest_value is None:
+            self.digest_value = hashlib.sha256(self.view).hexdigest() if self.view is not None else file_hash(self.path)
+        return self.digest_value
+
+    def close(self):
+        """Libera o buffer e o mapa em memória; os documentos abertos dele precisam estar fechados."""
+        if self.view is not None:
+            self.view.release()
+            self.view = None
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.data = None
+
+    def __enter__(self) -> "PdfSource":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,133 @@
+import logging, os, tempfile, weakref
+from typing import Iterable, Iterator, Union
+
+logger = logging.getLogger(__name__)
+
+# Caracteres mantidos em memória antes de o texto ir para um arquivo temporário.
+SPOOL_CHARS = 1024 * 1024
+
+# Caracteres lidos do arquivo por vez ao percorrer as linhas.
+BLOCK_CHARS = 256 * 1024
+
+class TextSpool:
+    """
+    Texto completo do documento gravado página a página: fica em memória até max_chars e, a partir
+    daí, em um arquivo temporário, removido quando o objeto é descartado. Pode ser enviado a outro
+    processo (pickle), que passa a ser o dono do arquivo.
+    """
+
+    def __init__(self, max_chars: int = SPOOL_CHARS):
+        self.max_chars = max_chars
+        self.parts = []
+        self.chars = 0
+        self.path = None
+        self.file = None
+        self.cleanup = None
+
+    def write(self, text: str):
+        """Acrescenta um pedaço ao final do texto."""
+        self.chars += len(text)
+
+        if self.path is None:
+            self.parts.append(text)
+            if self.chars > self.max_chars:
+                self.spill()
+            return
+
+        self.file.write(text)
+
+    def spill(self):
+        """Passa o texto em memória para o arquivo temporário."""
+        fd, self.path = tempfile.mkstemp(prefix="pdf_cli_", suffix=".txt")
+        self.file = os.fdopen(fd, "w", encoding="utf-8", newline="")
+        self.cleanup = weakref.finalize(self, remove_file, self.path)
+        self.file.writelines(self.parts)
+        self.parts = []
+        logger.debug(f"Texto com mais de {self.max_chars} caracteres, gravado em: {self.path}")
+
+    def flush(self):
+        """Garante que tudo o que foi escrito já está no arquivo."""
+        if self.file is not None and not self.file.closed:
+            self.file.flush()
+
+    def __len__(self) -> int:
+        return self.chars
+
+    def read(self) -> str:
+        """Texto completo em uma única string (só quando realmente necessário)."""
+        if self.path is None:
+            return "".join(self.parts)
+
+        self.flush()
+        with open(self.path, encoding="utf-8", newline="") as f:
+            return f.read()
+
+    def __iter__(self) -> Iterator[str]:
+        """Linhas do texto (com as quebras), como str.splitlines(keepends=True), lendo o arquivo aos blocos."""
+        if self.path is None:
+            yield from "".join(self.parts).splitlines(keepends=True)
+            return
+
+        self.flush()
+        with open(self.path, encoding="utf-8", newline="") as f:
+            rest = ""
+            while True:
+                block = f.read(BLOCK_CHARS)
+                if not block:
+                    break
+                # A última linha do bloco pode continuar no próximo (inclusive um "\r" seguido de "\n").
+                lines = (rest + block).splitlines(keepends=True)
+                rest = lines.pop()
+                yield from lines
+
+            if rest:
+                yield rest
+
+    def __getstate__(self):
+        if self.path is None:
+            return {"max_chars": self.max_chars, "text": "".join(self.parts)}
+
+        # O arquivo passa a pertencer a quem receber o objeto.
+        self.file.close()
+        self.cleanup.detach()
+
+        return {"max_chars": self.max_chars, "path": self.path, "chars": self.chars}
+
+    def __setstate__(self, state):
+        self.__init__(state["max_chars"])
+
+        if "path" in state:
+            self.path = state["path"]
+            self.chars = state["chars"]
+            self.file = open(self.path, "a", encoding="utf-8", newline="")
+            self.cleanup = weakref.finalize(self, remove_file, self.path)
+        else:
+            self.write(state["text"])
+
+def remove_file(path: str):
+    """Remove o arquivo temporário do texto."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def spool_text(parts: Iterable[str], max_chars: int = SPOOL_CHARS) -> TextSpool:
+    """Grava os pedaços em um TextSpool."""
+    spool = TextSpool(max_chars)
+    for part in parts:
+        spool.write(part)
+
+    return spool
+
+def spool_file(path: str, max_chars: int = SPOOL_CHARS) -> TextSpool:
+    """Lê um arquivo de texto em blocos para um TextSpool."""
+    with open(path, encoding="utf-8", newline="") as f:
+        return spool_text(iter(lambda: f.read(BLOCK_CHARS), ""), max_chars)
+
+def as_text(text: Union[str, TextSpool]) -> str:
+    """Texto completo, aceitando str ou TextSpool."""
+    return text if isinstance(text, str) else text.read()
+
+def iter_lines(text: Union[str, TextSpool]) -> Iterator[str]:
+    """Linhas do texto com as quebras, aceitando str ou TextSpool."""
+    return iter(text.splitlines(keepends=True)) if isinstance(text, str) else iter(text)
@@ -0,0 +1,144 @@
+import hashlib, json, logging, os
+from typing import Dict, List, Tuple
+from src.utils.cache import EXTRACTOR_VERSION
+
+logger = logging.getLogger(__name__)
+
+def state_name(filename: str, location: str) -> str:
+    """Nome dos arquivos de estado: o do documento mais um hash do caminho absoluto (ou da origem em memória)."""
+    return f"{filename}.{hashlib.sha1(location.encode('utf-8')).hexdigest()[:12]}"
+
+def state_path(filename: str) -> str:
+    """Caminho do arquivo de estado, ao lado do markdown do documento."""
+    return f"output/markdown/{filename}.state.json"
+
+def text_path(filename: str) -> str:
+    """Caminho do arquivo com o texto das páginas, ao lado do estado."""
+    return f"output/markdown/{filename}.state.txt"
+
+def load_state(filename: str) -> Tuple[List[Dict], object]:
+    """
+    Carrega os resultados por página da execução anterior e o arquivo com o texto delas, já aberto;
+    lista vazia e None se não houver estado válido.
+    """
+    path = state_path(filename)
+    if not os.path.exists(path):
+        return [], None
+
+    # O texto é aberto antes do estado: o save troca o texto primeiro, então o tamanho conferido abaixo é o
+    # do mesmo arquivo que será lido depois, mesmo que outro processo grave o estado no meio do caminho.
+    try:
+        reader = open(text_path(filename), "rb")
+    except FileNotFoundError:
+        reader = None
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Estado inválido, ignorando: {path} - {e}")
+        state = {}
+
+    if state.get("version") != EXTRACTOR_VERSION:
+        if state:
+            logger.debug(f"Estado de outra versão do extrator, ignorando: {path}")
+        if reader is not None:
+            reader.close()
+        return [], None
+
+    pages = state.get("pages", [])
+
+    # Se o texto não corresponde ao estado, as páginas são relidas.
+    text_size = os.fstat(reader.fileno()).st_size if reader is not None else None
+    if text_size != state.get("text_size"):
+        for page in pages:
+            page.pop("text_at", None)
+        if reader is not None:
+            reader.close()
+            reader = None
+
+    return pages, reader
+
+class PageState:
+    """
+    Estado por página de um documento. Os resultados pequenos (impressão digital, títulos, links e
+    imagens) ficam em JSON; o texto das páginas vai para um arquivo à parte, escrito à medida que as
+    páginas chegam e lido de volta só para as páginas reaproveitadas.
+    """
+
+    def __init__(self, filename: str, location: str, fresh: bool = False):
+        # Dois PDFs com o mesmo nome em pastas diferentes têm estados separados.
+        self.filename = state_name(filename, location)
+        self.pages, self.reader = ([], None) if fresh else load_state(self.filename)
+        self.tmp_path = f"{text_path(filename)}.{os.getpid()}.tmp"
+        self.writer = None
+
+    def previous(self, index: int) -> Dict:
+        """Resultado da página na execução anterior, ou None."""
+        return self.pages[index] if index < len(self.pages) else None
+
+    def read_text(self, page: Dict) -> str:
+        """Texto de uma página reaproveitada, lido do arquivo anterior."""
+        if "text" in page:
+            return page["text"]
+
+        offset, length = page["text_at"]
+        self.reader.seek(offset)
+        return self.reader.read(length).decode("utf-8")
+
+    def keep_text(self, page: Dict, text: str):
+        """Grava o texto da página no novo arquivo e guarda só a posição dele no estado."""
+        if self.writer is None:
+            os.makedirs(os.path.dirname(self.tmp_path), exist_ok=True)
+            self.writer = open(self.tmp_path, "wb")
+
+        data = text.encode("utf-8")
+        page.pop("text", None)
+        page["text_at"] = [self.writer.tell(), len(data)]
+        self.writer.write(data)
+
+    def save(self, pages: List[Dict]):
+        """Grava os resultados por página e o texto correspondente."""
+        path = state_path(self.filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # O arquivo anterior só é lido durante a passada: fechado antes de ser trocado (no Windows,
+        # um arquivo aberto não pode ser substituído).
+        self.close_reader()
+
+        if self.writer is not None:
+            text_size = self.writer.tell()
+            self.writer.close()
+            self.writer = None
+            os.replace(self.tmp_path, text_path(self.filename))
+        else:
+            # Sem texto nesta execução: as páginas reaproveitadas continuam apontando para o arquivo anterior.
+            text_size = os.path.getsize(text_path(self.filename)) if os.path.exists(text_path(self.filename)) else None
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": EXTRACTOR_VERSION, "text_size": text_size, "pages": pages}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+        logger.debug(f"Estado por página gravado em: {path}")
+
+    def close_reader(self):
+        """Fecha o arquivo de texto da execução anterior."""
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+
+    def close(self):
+        """Fecha os arquivos de texto e descarta o novo se o estado não foi gravado."""
+        self.close_reader()
+
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+            os.remove(self.tmp_path)
+
+    def __enter__(self) -> "PageState":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,5 +1,6 @@
 import re, fitz, unicodedata, logging
-from typing import Dict
+from functools import partial
+from typing import Dict, Iterable, List, Tuple
 from collections import Counter
 
 logger = logging.getLogger(__name__)
@@ -36,6 +37,11 @@ SECTION_KEYWORDS = [
 
 SECTION_REGEX = re.compile("|".join(SECTION_KEYWORDS), re.IGNORECASE)
 
+WORD_REGEX = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+# Acentos soltos e hífen que as regras do sanitize_latex_text juntam à letra vizinha.
+LATEX_JOINERS = frozenset("¸˜´`^ˆ~-")
+
 
 def is_latex_pdf(doc: fitz.Document) -> bool:
     """Detecta arquivos feitos com latex"""
@@ -62,67 +68,275 @@ def normalize_text(text: str) -> str:
     
     return text
 
-# TODO Usar ocr (Tesseract 3) para ler os PDF.
-def sanitize_latex_text(text: str) -> str:
+ASCII_LETTERS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ")
+
+# Mesmo intervalo da classe [a-zA-ZÀ-ÿ].
+LATIN_LETTERS = ASCII_LETTERS | frozenset(map(chr, range(ord("À"), ord("ÿ") + 1)))
+
+HYPHENATION_REGEX = re.compile(r'-\n\s*(?=[a-zA-ZÀ-ÿ])')
+
+def join_after_letter(match: re.Match, repl: str) -> str:
+    """Equivale a (?<=[a-zA-Z]) antes do padrão, mas só é verificado nas ocorrências do padrão."""
+    start = match.start()
+    if start and match.string[start - 1] in ASCII_LETTERS:
+        return repl
+
+    return match.group()
+
+def join_hyphenation(text: str) -> str:
+    r"""
+    Junta palavras hifenizadas na quebra de linha, com o mesmo resultado de
+    re.sub(r'([a-zA-ZÀ-ÿ])-(\n\s*)([a-zA-ZÀ-ÿ])', r'\1\3', text), mas buscando a partir do hífen.
     """
-    Corrige artefatos comuns de PDFs gerados por LaTeX (acentos separados,
-    hifenização de quebra de linha, ligaduras quebradas).
+    # Posição da letra que fechou a última junção: ela não pode abrir a próxima.
+    last_letter = -1
+
+    def join(match: re.Match) -> str:
+        nonlocal last_letter
+        start = match.start()
+        if start - 1 > last_letter and match.string[start - 1] in LATIN_LETTERS:
+            last_letter = match.end()
+            return ""
+
+        return match.group()
+
+    return HYPHENATION_REGEX.sub(join, text)
+
+# Regras do sanitize_latex_text, na ordem em que são aplicadas: substituições literais (trecho, troca),
+# expressões regulares (padrão, troca, trechos) e funções (função, trechos). Os trechos são aqueles dos
+# quais toda ocorrência depende: se nenhum aparece no texto, a etapa é pulada.
+LATEX_RULES = [
+    (" ̧c", "ç"), ("¸c", "ç"), (" ¸", "¸"),
+
+    (re.compile(r'([cCaAoO])\s+([¸~^´`])'), r'\1\2', list("¸~^´`")),
+
+    ("c¸", "ç"),   ("C¸", "Ç"),
+    ("a˜", "ã"),   ("A˜", "Ã"),
+    ("o˜", "õ"),   ("O˜", "Õ"),
+    ("˜a", "ã"),   ("˜o", "õ"),
+
+    ("´a", "á"),   ("´A", "Á"),
+    ("´e", "é"),   ("´E", "É"),
+    ("´i", "í"),   ("´I", "Í"),
+    ("´o", "ó"),   ("´O", "Ó"),
+    ("´u", "ú"),   ("´U", "Ú"),
+
+    ("a´", "á"),   ("e´", "é"),   ("i´", "í"),
+    ("o´", "ó"),   ("u´", "ú"),
+
+    ("^a", "â"),   ("^e", "ê"),   ("´ı", "í"),
+    ("^o", "ô"),   ("ç˜", "çã"),
+
+    ("`a", "à"),   ("`A", "À"),   ("ˆe", "ê"),
+
+    ("’", "'"),    ("”", '"'),    ("“", '"'),
+
+    (re.compile(r'\s+ç'), lambda m: join_after_letter(m, "ç"), ["ç"]),
+    (re.compile(r'ç\s+(?=[a-zA-Z])'), r'ç', ["ç"]),
+
+    (join_hyphenation, ["-\n"]),
+]
+
+def literal_conflict(first: tuple, second: tuple) -> bool:
     """
-    logger.debug("Sanitizando texto LaTeX.")
-    text = text.replace(" ̧c", "ç").replace("¸c", "ç").replace(" ¸", "¸")
+    Verifica se duas substituições literais (first antes de second) não podem ser feitas
+    na mesma passada sem mudar o resultado da aplicação em sequência.
+    """
+    (bad_a, good_a), (bad_b, _) = first, second
 
-    text = re.sub(r'([cCaAoO])\s+([¸~^´`])', r'\1\2', text)
+    # Uma contém a outra, ou second termina onde first começa: a busca da esquerda para a direita pegaria second antes.
+    if bad_a in bad_b or bad_b in bad_a:
+        return True
+    if any(bad_b.endswith(bad_a[:i]) for i in range(1, len(bad_a))):
+        return True
 
-    replacements = {
-        "c¸": "ç",   "C¸": "Ç",
-        "a˜": "ã",   "A˜": "Ã",
-        "o˜": "õ",   "O˜": "Õ",
-        "˜a": "ã",   "˜o": "õ",
-        
-        "´a": "á",   "´A": "Á",
-        "´e": "é",   "´E": "É",
-        "´i": "í",   "´I": "Í",
-        "´o": "ó",   "´O": "Ó",
-        "´u": "ú",   "´U": "Ú",
-        
-        "a´": "á",   "e´": "é",   "i´": "í",   "o´": "ó",   "u´": "ú",
+    # O resultado de first pode formar uma ocorrência de second com os vizinhos.
+    return any(char in bad_b for char in good_a)
+
+def compile_latex_rules(rules: list) -> list:
+    """
+    Agrupa as substituições literais consecutivas que não interferem entre si em uma única
+    expressão regular com alternativas, mantendo a ordem das demais etapas.
+    Retorna as etapas como (trechos, função).
+    """
+    steps = []
+    group = []
 
-        "^a": "â",   "^e": "ê",   "´ı": "í",   "^o": "ô",   "ç˜": "çã",
-        
-        "`a": "à",   "`A": "À",   "´i": "í",   "ˆe": "ê",
+    def flush():
+        if group:
+            mapping = dict(group)
+            pattern = re.compile("|".join(re.escape(bad) for bad in sorted(mapping, key=len, reverse=True)))
+            # Toda regra literal tem um acento solto ou aspa: se nenhum aparece no texto, a etapa é pulada.
+            gates = sorted({char for bad in mapping for char in bad if not (char.isascii() and char.isalnum() or char.isspace())})
+            steps.append((gates, partial(pattern.sub, lambda m: mapping[m.group()])))
+            group.clear()
 
-        "’": "'",    "”": '"',    "“": '"',
-    }
+    for rule in rules:
+        if callable(rule[0]):
+            flush()
+            steps.append((rule[1], rule[0]))
+        elif len(rule) == 3:
+            flush()
+            pattern, repl, gates = rule
+            steps.append((gates, partial(pattern.sub, repl)))
+        else:
+            if any(literal_conflict(previous, rule) for previous in group):
+                flush()
+            group.append(rule)
 
-    for bad, good in replacements.items():
-        text = text.replace(bad, good)
+    flush()
 
-    text = re.sub(r'(?<=[a-zA-Z])\s+ç', r'ç', text)
-    text = re.sub(r'ç\s+(?=[a-zA-Z])', r'ç', text)
+    return steps
 
-    text = re.sub(r'([a-zA-ZÀ-ÿ])-(\n\s*)([a-zA-ZÀ-ÿ])', r'\1\3', text)
+LATEX_STEPS = compile_latex_rules(LATEX_RULES)
+
+def sanitize_latex_text(text: str) -> str:
+    """
+    Corrige artefatos comuns de PDFs gerados por LaTeX (acentos separados,
+    hifenização de quebra de linha, ligaduras quebradas).
+    """
+    logger.debug("Sanitizando texto LaTeX.")
+    for gates, step in LATEX_STEPS:
+        if any(gate in text for gate in gates):
+            text = step(text)
 
     return text
 
-def count_words(text: str, is_latex: bool):
+def count_words(text: str, is_latex: bool, top_k: int = 10):
     """Retira Stopwords e retorna o número de palavras geral, únicas e mais citadas no texto."""
     logger.debug("Contando palavras no texto.")
+    counter = WordCounter(is_latex)
+    counter.update(text)
+
+    return counter.result(top_k)
+
+def index_tokens(text: str, is_latex: bool = False) -> List[str]:
+    """Palavras do texto como a contagem as vê (sanitizadas, normalizadas, minúsculas e sem stopwords), em ordem."""
     if is_latex:
         text = sanitize_latex_text(text)
-        logger.debug("Texto sanitizado para LaTeX.")
-    
-    text = normalize_text(text)    
 
-    text = re.findall(r"[^\W\d_]+", text.lower(), re.UNICODE)
+    return index_words(WORD_REGEX.findall(normalize_text(text).lower()))
+
+def index_words(words: Iterable[str]) -> List[str]:
+    """Descarta as palavras de uma letra e as stopwords, como a contagem faz no final."""
+    return [word for word in words if len(word) > 1 and word not in STOPWORDS]
+
+class WordCounter:
+    """Conta palavras de forma incremental (página a página), mantendo em memória apenas o vocabulário."""
+
+    # Sem um ponto de corte seguro, o texto pendente é contado mesmo assim ao passar deste tamanho.
+    MAX_PENDING = 1024 * 1024
+
+    def __init__(self, is_latex: bool = False):
+        self.is_latex = is_latex
+        self.counts = Counter()
+        self.pending = ""
+
+    def update(self, text: str) -> Tuple[List[str], List[str]]:
+        """
+        Consome mais um pedaço do texto; o final que ainda pode se juntar ao próximo fica pendente.
+        Retorna as palavras contadas nesta chamada, na ordem do texto, separadas entre as que vieram
+        do texto pendente dos pedaços anteriores e as demais.
+        """
+        buffer = self.pending + text
+        cut = self.safe_cut(buffer)
+
+        if cut == 0:
+            if len(buffer) < self.MAX_PENDING:
+                self.pending = buffer
+                return [], []
+            cut = len(buffer)
+
+        pending = self.pending
+        self.pending = buffer[cut:]
+        words = self.consume(buffer[:cut])
+        # Uma palavra juntada pela sanitização na fronteira fica com o pedaço em que começou.
+        carried = len(self.split(pending)) if pending and not pending.isspace() else 0
+        return words[:carried], words[carried:]
+
+    def flush(self) -> List[str]:
+        """Conta o texto pendente e retorna as palavras dele."""
+        words = self.consume(self.pending) if self.pending else []
+        self.pending = ""
+        return words
+
+    def safe_cut(self, text: str) -> int:
+        """
+        Retorna a posição de um espaço em que cortar o texto não altera a contagem: nenhuma
+        palavra, normalização ou regra do sanitize_latex_text atravessa esse ponto.
+        """
+        pos = len(text)
+        while pos > 0:
+            pos -= 1
+            if not text[pos].isspace() or pos == 0 or text[pos - 1].isspace():
+                continue
 
-    filter_words = [w for w in text if w not in STOPWORDS and len(w) > 1]
+            if not self.is_latex or is_latex_boundary(text[pos - 1]):
+                return pos
 
-    num_words = len(filter_words)
-    vocabulary = set(filter_words)
-    num_voc = len(vocabulary)
-    top_10 = Counter(filter_words).most_common(10)
+        return 0
 
-    return num_words, num_voc, top_10
+    def split(self, text: str) -> List[str]:
+        """Sanitiza, normaliza e separa as palavras de um pedaço do texto."""
+        if self.is_latex:
+            text = sanitize_latex_text(text)
+
+        return WORD_REGEX.findall(normalize_text(text).lower())
+
+    def consume(self, text: str) -> List[str]:
+        """Sanitiza, normaliza e conta as palavras de um pedaço completo do texto."""
+        words = self.split(text)
+        # Conta tudo em C e descarta as stopwords só no final: a ordem de inserção (desempate do top-k) se mantém.
+        self.counts.update(words)
+        return words
+
+    def result(self, top_k: int = 10):
+        """Conta o texto pendente e retorna o total de palavras, o vocabulário e as mais citadas."""
+        self.flush()
+
+        for word in [w for w in self.counts if len(w) < 2 or w in STOPWORDS]:
+            del self.counts[word]
+
+        num_words = sum(self.counts.values())
+        num_voc = len(self.counts)
+        top = self.counts.most_common(top_k)
+
+        return num_words, num_voc, top
+
+DIGITS_REGEX = re.compile(r"\d+")
+
+def edge_key(line: str) -> str:
+    """Normaliza uma linha de cabeçalho ou rodapé: espaços, caixa e números (de página, datas) não importam."""
+    return DIGITS_REGEX.sub("#", " ".join(line.split()).lower())
+
+class EdgeCounter:
+    """Conta as primeiras e últimas linhas de cada página para identificar cabeçalhos e rodapés repetidos."""
+
+    # Linhas não vazias consideradas no topo e no pé de cada página.
+    EDGE_LINES = 3
+
+    # Linhas mais longas que isto não são tratadas como cabeçalho ou rodapé.
+    MAX_LENGTH = 160
+
+    def __init__(self):
+        self.counts = Counter()
+        self.pages = 0
+
+    def update(self, text: str):
+        """Registra as bordas de mais uma página."""
+        lines = [line for line in text.splitlines() if line.strip()]
+        edges = lines[:self.EDGE_LINES] + lines[-self.EDGE_LINES:]
+        self.counts.update({edge_key(line) for line in edges if len(line) <= self.MAX_LENGTH})
+        self.pages += 1
+
+    def boilerplate(self, min_share: float = 0.5, min_pages: int = 3) -> set:
+        """Linhas normalizadas presentes nas bordas de pelo menos min_share das páginas."""
+        threshold = max(min_pages, self.pages * min_share)
+        return {key for key, count in self.counts.items() if count >= threshold}
+
+def is_latex_boundary(char: str) -> bool:
+    """Verifica se o caractere antes de um espaço não participa de nenhuma regra do sanitize_latex_text."""
+    return not (char.isalpha() or char in LATEX_JOINERS or unicodedata.combining(char))
 
 def get_urls(links: Dict) -> Dict:
     """Extrai apenas as urls do texto."""
@@ -133,8 +347,6 @@ def get_urls(links: Dict) -> Dict:
 
 def search_section_keywords(text: str) -> str:
     """Procura por palavras-chave de seções no texto."""
-    logger.debug("Procurando palavras-chave de seções no texto.")
-    
     clean_text = text.strip()
 
     if len(clean_text.split()) > 3:
@@ -1,4 +1,4 @@
-import argparse, logging, os
+import argparse, glob, logging, os
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -13,9 +13,64 @@ def validate_str(value: str="") -> str:
     
     return clean_str
 
+def validate_positive_int(value: str) -> int:
+    """Valida se o valor é um inteiro maior que zero."""
+    logger.debug(f"Validando inteiro positivo: {value}")
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"[Erro]: '{value}' não é um número inteiro.")
+
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"[Erro]: o valor precisa ser maior que zero. Você forneceu '{number}'.")
+
+    return number
+
+def validate_non_negative_int(value: str) -> int:
+    """Valida se o valor é um inteiro maior ou igual a zero."""
+    logger.debug(f"Validando inteiro não negativo: {value}")
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"[Erro]: '{value}' não é um número inteiro.")
+
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"[Erro]: o valor não pode ser negativo. Você forneceu '{number}'.")
+
+    return number
+
+def validate_ratio(value: str) -> float:
+    """Valida se o valor é um número entre 0 e 1."""
+    logger.debug(f"Validando proporção: {value}")
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"[Erro]: '{value}' não é um número.")
+
+    if not 0 <= number <= 1:
+        raise argparse.ArgumentTypeError(f"[Erro]: o valor precisa estar entre 0 e 1. Você forneceu '{number}'.")
+
+    return number
+
+def validate_non_negative_float(value: str) -> float:
+    """Valida se o valor é um número maior ou igual a zero."""
+    logger.debug(f"Validando número não negativo: {value}")
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"[Erro]: '{value}' não é um número.")
+
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"[Erro]: o valor não pode ser negativo. Você forneceu '{number}'.")
+
+    return number
+
 def validate_path(value: str) -> Path:
-    """Valiida se o caminho existe, se é um arquivo e se é um pdf."""
+    """Valiida se o caminho existe, se é um arquivo e se é um pdf ("-" indica a entrada padrão)."""
     logger.debug(f"Validando caminho do arquivo: {value}")
+    if value == "-":
+        return value
+
     path = Path(value)
 
     if not path.exists():
@@ -29,6 +84,19 @@ def validate_path(value: str) -> Path:
     
     return path
 
+def validate_source(value: str) -> str:
+    """Valida a origem do lote: diretório, padrão glob ou arquivo de manifesto."""
+    logger.debug(f"Validando origem do lote: {value}")
+    path = Path(value)
+
+    if path.exists():
+        return value
+
+    if glob.has_magic(value) and glob.glob(value, recursive=True):
+        return value
+
+    raise argparse.ArgumentTypeError(f"[Erro]: nenhum diretório, arquivo ou padrão corresponde a '{value}'.")
+
 def define_name(pdf_path: Path) -> str:
     """Define o nome do arquivo sem extensão."""
     logger.debug(f"Definindo nome do arquivo para: {pdf_path.stem}")
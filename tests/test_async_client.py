@@ -0,0 +1,141 @@
+"""
+Cliente assíncrono da LLM contra um servidor local que imita o /api/generate do Ollama: limite de
+requisições simultâneas, timeout (--llm_timeout) e novas tentativas com espera crescente em erros 5xx.
+"""
+import asyncio, json, threading, time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+from src.llm.async_client import AsyncLLMSession, asummarize_text
+from src.llm.config import ModelConfig, SummaryConfig
+from src.llm.summarize import summarize_text
+
+class StubOllama(ThreadingHTTPServer):
+    """Servidor que responde ao /api/generate em NDJSON, com atraso e falhas 503 configuráveis."""
+    daemon_threads = True
+
+    def __init__(self, delay: float = 0.0, failures: int = 0):
+        super().__init__(("127.0.0.1", 0), GenerateHandler)
+        self.delay = delay
+        self.failures = failures
+        self.requests = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+class GenerateHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def send_body(self, status: int, body: bytes, content_type: str = "application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        if self.path != "/api/generate":
+            self.send_body(404, b"{}")
+            return
+
+        with server.lock:
+            server.requests += 1
+            if server.failures > 0:
+                server.failures -= 1
+                failed = True
+            else:
+                failed = False
+                server.in_flight += 1
+                server.peak = max(server.peak, server.in_flight)
+
+        if failed:
+            self.send_body(503, json.dumps({"error": "servidor ocupado"}).encode())
+            return
+
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+
+        lines = [
+            {"model": body["model"], "created_at": "2024-01-01T00:00:00Z", "response": "Resumo ", "done": False},
+            {"model": body["model"], "created_at": "2024-01-01T00:00:00Z", "response": "do stub", "done": True, "done_reason": "stop"},
+        ]
+        if body.get("stream", True):
+            self.send_body(200, b"".join(json.dumps(line).encode() + b"\n" for line in lines), "application/x-ndjson")
+        else:
+            self.send_body(200, json.dumps(dict(lines[-1], response="Resumo do stub")).encode())
+
+@pytest.fixture
+def stub(request):
+    """Sobe o servidor simulado em uma porta livre; parâmetros vêm de @pytest.mark.stub(...)."""
+    marker = request.node.get_closest_marker("stub")
+    server = StubOllama(**(marker.kwargs if marker else {}))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def make_session(stub: StubOllama, **kwargs) -> AsyncLLMSession:
+    return AsyncLLMSession(model=ModelConfig(backend="ollama", name="stub", host=stub.url), **kwargs)
+
+async def invoke_many(session: AsyncLLMSession, texts):
+    async with session:
+        return await session.invoke_many("partial", texts)
+
+@pytest.mark.stub(delay=0.2)
+def test_in_flight_limit(stub):
+    session = make_session(stub, max_in_flight=2)
+    results = asyncio.run(invoke_many(session, [f"trecho {i}" for i in range(6)]))
+
+    assert results == ["Resumo do stub"] * 6
+    assert stub.requests == 6
+    assert stub.peak == 2
+
+@pytest.mark.stub(delay=2.0)
+def test_timeout(stub):
+    session = make_session(stub, timeout=0.3, retries=0)
+    start = time.perf_counter()
+    with pytest.raises(ValueError, match="após 1 tentativas"):
+        asyncio.run(invoke_many(session, ["trecho"]))
+
+    assert time.perf_counter() - start < 1.5
+    assert session.failures == 1
+
+@pytest.mark.stub(failures=2)
+def test_retry_with_backoff(stub):
+    session = make_session(stub, retries=2, backoff=0.1)
+    start = time.perf_counter()
+    results = asyncio.run(invoke_many(session, ["trecho"]))
+
+    assert results == ["Resumo do stub"]
+    assert stub.requests == 3
+    assert session.failures == 2
+    # Esperas de 0.1s e 0.2s entre as tentativas.
+    assert time.perf_counter() - start >= 0.3
+
+@pytest.mark.stub(failures=5)
+def test_retries_exhausted(stub):
+    session = make_session(stub, retries=1, backoff=0.01)
+    with pytest.raises(ValueError, match="após 2 tentativas"):
+        asyncio.run(invoke_many(session, ["trecho"]))
+
+    assert stub.requests == 2
+
+def test_sync_and_async_share_the_map_reduce_plan():
+    text = "".join(f"Seção {i}\n" + "palavra " * 300 + "\n" for i in range(12))
+    config = SummaryConfig(model=ModelConfig(backend="mock"), chunk_tokens=200, fan_out=3, max_concurrency=2)
+
+    async def run():
+        async with AsyncLLMSession.from_config(config) as session:
+            return await asummarize_text(session, text, config)
+
+    assert asyncio.run(run()) == summarize_text(text, config)
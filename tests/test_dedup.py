@@ -0,0 +1,48 @@
+"""
+Detecção de duplicatas no lote: um documento quase idêntico a outro que ainda está sendo resumido
+espera por aquele resumo no lugar de chamar a LLM.
+"""
+import os, shutil, threading, time
+from concurrent.futures import ThreadPoolExecutor
+import src.utils.batch as batch
+from src.utils.batch import extract_document, finish_document
+from src.utils.dedup import DuplicateIndex
+from src.llm.config import ModelConfig, SummaryConfig
+
+PDF = os.path.join(os.path.dirname(__file__), os.pardir, "pdf_exemplos", "Manuscript.pdf")
+
+def test_near_duplicates_in_flight_share_one_summary(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = SummaryConfig(model=ModelConfig(backend="mock"))
+    calls = []
+    lock = threading.Lock()
+
+    def slow_summary(result, config=None, cache=None):
+        if result["summary"] is not None:
+            return result["summary"]
+        with lock:
+            calls.append(result["filename"])
+        time.sleep(0.3)
+        return "Resumo da LLM"
+
+    monkeypatch.setattr(batch, "summary_stage", slow_summary)
+
+    paths = []
+    for name in ("original.pdf", "copia.pdf", "outra_copia.pdf"):
+        shutil.copy(PDF, tmp_path / name)
+        paths.append(str(tmp_path / name))
+    results = [extract_document(path, False, False, True, config=config, dedup=True) for path in paths]
+
+    with DuplicateIndex(str(tmp_path / "duplicates.sqlite")) as duplicates:
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            finished = list(pool.map(lambda result: finish_document(result, True, config, duplicates=duplicates), results))
+
+        assert len(calls) == 1
+        assert duplicates.reused == 2
+        assert not duplicates.in_flight
+
+    leader = next(result for result in finished if not result.get("duplicate_of"))
+    for result in finished:
+        assert result["summary"].endswith("Resumo da LLM")
+        if result is not leader:
+            assert result["duplicate_of"]["path"] == leader["path"]
@@ -0,0 +1,99 @@
+"""
+Equivalência do sanitize_latex_text compilado (substituições literais agrupadas por
+compile_latex_rules) com a implementação antiga, aplicada regra a regra: fuzzing em textos
+aleatórios com os caracteres das regras e o texto dos PDFs LaTeX de pdf_exemplos/.
+"""
+import glob, os, random, re
+import fitz
+import pytest
+from src.utils.text import LATEX_RULES, compile_latex_rules, literal_conflict, is_latex_pdf, sanitize_latex_text
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def legacy_sanitize_latex_text(text: str) -> str:
+    """Implementação anterior de sanitize_latex_text, mantida como referência."""
+    text = text.replace(" ̧c", "ç").replace("¸c", "ç").replace(" ¸", "¸")
+
+    text = re.sub(r'([cCaAoO])\s+([¸~^´`])', r'\1\2', text)
+
+    replacements = {
+        "c¸": "ç",   "C¸": "Ç",
+        "a˜": "ã",   "A˜": "Ã",
+        "o˜": "õ",   "O˜": "Õ",
+        "˜a": "ã",   "˜o": "õ",
+
+        "´a": "á",   "´A": "Á",
+        "´e": "é",   "´E": "É",
+        "´i": "í",   "´I": "Í",
+        "´o": "ó",   "´O": "Ó",
+        "´u": "ú",   "´U": "Ú",
+
+        "a´": "á",   "e´": "é",   "i´": "í",   "o´": "ó",   "u´": "ú",
+
+        "^a": "â",   "^e": "ê",   "´ı": "í",   "^o": "ô",   "ç˜": "çã",
+
+        "`a": "à",   "`A": "À",   "´i": "í",   "ˆe": "ê",
+
+        "’": "'",    "”": '"',    "“": '"',
+    }
+
+    for bad, good in replacements.items():
+        text = text.replace(bad, good)
+
+    text = re.sub(r'(?<=[a-zA-Z])\s+ç', r'ç', text)
+    text = re.sub(r'ç\s+(?=[a-zA-Z])', r'ç', text)
+
+    text = re.sub(r'([a-zA-ZÀ-ÿ])-(\n\s*)([a-zA-ZÀ-ÿ])', r'\1\3', text)
+
+    return text
+
+
+def fuzz(cases: int, seed: int) -> int:
+    """Gera textos aleatórios com os caracteres das regras e conta as divergências."""
+    rng = random.Random(seed)
+    alphabet = sorted({char for rule in LATEX_RULES if isinstance(rule[0], str) for char in "".join(rule)})
+    alphabet += list("aeiouAEIOUcCçxzZ1-éÀÿ× \n\t") + ["̧", "-\n"]
+
+    failures = 0
+    for _ in range(cases):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 24)))
+        expected = legacy_sanitize_latex_text(text)
+        result = sanitize_latex_text(text)
+        if expected != result:
+            failures += 1
+            if failures <= 5:
+                print(f"Divergência: {text!r}: {expected!r} != {result!r}")
+
+    return failures
+
+@pytest.mark.parametrize("seed", range(4))
+def test_fuzz_equivalence(seed):
+    assert fuzz(5000, seed) == 0
+
+def test_latex_pdfs():
+    checked = 0
+    for pdf in sorted(glob.glob(os.path.join(ROOT, "pdf_exemplos", "*.pdf"))):
+        with fitz.open(pdf) as doc:
+            if not is_latex_pdf(doc):
+                continue
+            pages = [page.get_text() + "\n" for page in doc]
+
+        checked += 1
+        assert sanitize_latex_text("".join(pages)) == legacy_sanitize_latex_text("".join(pages))
+        for page in pages:
+            assert sanitize_latex_text(page) == legacy_sanitize_latex_text(page)
+
+    assert checked, "nenhum PDF LaTeX em pdf_exemplos/"
+
+def test_conflicting_literals_stay_in_order():
+    # "b" dentro de "ab" e o resultado de "x" formando "xy": cada par precisa de passadas separadas.
+    assert literal_conflict(("ab", "1"), ("b", "2"))
+    assert literal_conflict(("a", "x"), ("xy", "3"))
+    assert not literal_conflict(("´a", "á"), ("´e", "é"))
+
+    steps = compile_latex_rules([("´a", "á"), ("´e", "é"), ("ab", "1"), ("b", "2")])
+    assert len(steps) == 2
+    text = "´a´eab b"
+    for _, step in steps:
+        text = step(text)
+    assert text == "áé1 2"